@@ -0,0 +1 @@
+"""Shared building blocks for the Delhi AQI dashboard (model loading, inference, logging)."""
@@ -0,0 +1,209 @@
+"""Headless HTTP inference API (ASGI, Starlette) serving the same artifacts as the dashboard.
+
+Run it with ``python -m aqi.api --workers 4`` (or ``uvicorn aqi.api:app``), or
+with ``python -m aqi.serve --kind api`` for workers sharing one mapped model.
+
+Endpoints:
+    GET  /health          model version, uptime and micro-batcher counters
+    GET  /metrics         per-stage latency histograms (Prometheus text format)
+    POST /predict         {"PM2.5": .., "PM10": .., "NO2": .., "SO2": .., "CO": .., "Ozone": ..}
+                          or {"features": [6 numbers]}
+    POST /predict/batch   {"rows": [ {...} | [6 numbers], ... ]}
+
+Single requests that arrive within ``AQI_BATCH_WAIT_MS`` of each other are
+merged into one ``predict_proba`` call by ``MicroBatcher``.  Repeated inputs
+are answered from ``aqi.prediction_cache`` without entering the queue.
+"""
+import argparse
+import asyncio
+import contextlib
+import math
+import os
+import time
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, PlainTextResponse
+from starlette.routing import Route
+
+from aqi.features import FEATURES
+from aqi.inference import cached_result, engine, predict_cached, to_matrix
+from aqi.metrics import timings
+from aqi.prediction_cache import prediction_cache
+from aqi.registry import get_label_encoder, model_version
+
+MAX_BATCH = int(os.environ.get("AQI_MAX_BATCH", "256"))
+BATCH_WAIT_MS = float(os.environ.get("AQI_BATCH_WAIT_MS", "2"))
+MAX_ROWS_PER_REQUEST = int(os.environ.get("AQI_MAX_ROWS", "100000"))
+
+
+class MicroBatcher:
+    """Collect concurrent single-row requests and score them together."""
+
+    def __init__(self, max_batch=MAX_BATCH, wait_ms=BATCH_WAIT_MS):
+        self.max_batch = max_batch
+        self.wait = wait_ms / 1000
+        self.queue = None
+        self.task = None
+        self.batches = 0
+        self.rows = 0
+
+    async def start(self):
+        self.queue = asyncio.Queue()
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self.task
+
+    async def submit(self, row):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((row, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [await self.queue.get()]
+            deadline = loop.time() + self.wait
+            while len(pending) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    pending.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            X = to_matrix([row for row, _ in pending])
+            try:
+                # sklearn releases the GIL for most of predict; keep the event loop free meanwhile
+                results = await loop.run_in_executor(None, predict_cached, X)
+            except Exception as e:  # fail every waiter of this batch, keep serving
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.batches += 1
+            self.rows += len(pending)
+            for (_, future), result in zip(pending, results):
+                if not future.done():
+                    future.set_result(result)
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "rows": self.rows,
+            "avg_batch_size": round(self.rows / self.batches, 2) if self.batches else 0.0,
+            "queued": self.queue.qsize() if self.queue is not None else 0,
+        }
+
+
+batcher = MicroBatcher()
+started_at = time.time()
+
+
+def _number(name, value):
+    value = float(value)
+    if not math.isfinite(value):
+        raise ValueError(f"{name} must be a finite number, got {value}")
+    return value
+
+
+def _parse_row(payload):
+    if isinstance(payload, dict) and "features" in payload:
+        payload = payload["features"]
+    if isinstance(payload, dict):
+        missing = [name for name in FEATURES if name not in payload]
+        if missing:
+            raise ValueError(f"missing field(s): {', '.join(missing)}")
+        return [_number(name, payload[name]) for name in FEATURES]
+    if isinstance(payload, (list, tuple)) and len(payload) == len(FEATURES):
+        return [_number(name, v) for name, v in zip(FEATURES, payload)]
+    raise ValueError(f"expected an object with {', '.join(FEATURES)} or a list of {len(FEATURES)} numbers")
+
+
+async def _json(request):
+    try:
+        return await request.json()
+    except ValueError:
+        raise ValueError("request body must be valid JSON")
+
+
+async def health(request):
+    return JSONResponse({
+        "status": "ok",
+        "model_version": model_version(),
+        "uptime_s": round(time.time() - started_at, 1),
+        "pid": os.getpid(),
+        "batcher": batcher.stats(),
+        "prediction_cache": prediction_cache.stats(),
+    })
+
+
+async def metrics(request):
+    return PlainTextResponse(timings.to_prometheus(), media_type="text/plain; version=0.0.4")
+
+
+async def predict(request):
+    try:
+        row = _parse_row(await _json(request))
+    except (ValueError, TypeError) as e:
+        return JSONResponse({"error": str(e)}, status_code=422)
+    result = cached_result(row)
+    if result is None:
+        result = await batcher.submit(row)
+    return JSONResponse(result)
+
+
+async def predict_batch(request):
+    try:
+        payload = await _json(request)
+        rows = payload.get("rows") if isinstance(payload, dict) else payload
+        if not isinstance(rows, list) or not rows:
+            raise ValueError("expected {\"rows\": [...]} with at least one row")
+        if len(rows) > MAX_ROWS_PER_REQUEST:
+            raise ValueError(f"too many rows ({len(rows)} > {MAX_ROWS_PER_REQUEST})")
+        X = to_matrix([_parse_row(row) for row in rows])
+    except (ValueError, TypeError) as e:
+        return JSONResponse({"error": str(e)}, status_code=422)
+    results = await asyncio.get_running_loop().run_in_executor(None, predict_cached, X)
+    return JSONResponse({"results": results})
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    # Load artifacts before accepting traffic so the first request isn't slow
+    engine(1)
+    get_label_encoder()
+    await batcher.start()
+    yield
+    await batcher.stop()
+
+
+app = Starlette(
+    routes=[
+        Route("/health", health, methods=["GET"]),
+        Route("/metrics", metrics, methods=["GET"]),
+        Route("/predict", predict, methods=["POST"]),
+        Route("/predict/batch", predict_batch, methods=["POST"]),
+    ],
+    lifespan=lifespan,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Delhi AQI inference API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    uvicorn.run("aqi.api:app", host=args.host, port=args.port, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
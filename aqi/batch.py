@@ -0,0 +1,135 @@
+"""Score uploaded CSV/Parquet files of pollutant readings in vectorized chunks.
+
+The file is streamed chunk by chunk with typed columns (``aqi.dataset``: CSV
+chunks or Parquet record batches; paths on disk go through the Arrow cache),
+each chunk goes through a single ``predict_proba`` call, and the scored chunks
+are written straight into the output buffer, so memory stays proportional to
+``chunk_size`` rather than to the upload.
+"""
+import io
+
+import numpy as np
+
+from aqi.cpcb import compute as cpcb_compute
+from aqi.dataset import FEATURE_DTYPES
+from aqi.dataset import iter_readings as _iter_readings
+from aqi.features import FEATURES
+from aqi.inference import engine
+from aqi.labels import risk_badges
+from aqi.registry import get_label_encoder, get_regressor
+
+CHUNK_SIZE = 50_000
+OUTPUT_DTYPES = {
+    "AQI Category": "string",
+    "Confidence": "float64",
+    "Main Pollutant": "string",
+    "Risk Level": "string",
+    "Risk Emoji": "string",
+    "Predicted AQI": "float64",
+    "CPCB AQI": "float64",
+    "CPCB Category": "string",
+    "Dominant Pollutant": "string",
+}
+OUTPUT_COLUMNS = list(OUTPUT_DTYPES)
+
+
+def iter_readings(source, name="", chunk_size=CHUNK_SIZE):
+    """Yield DataFrame chunks from a CSV or Parquet path/file object.
+
+    Only the pollutant columns are typed; anything else in the upload (dates,
+    station names, a reported AQI) passes through as pandas reads it.
+    """
+    return _iter_readings(source, name, chunk_size, dtypes=FEATURE_DTYPES)
+
+
+def score_chunk(df, model=None, label_encoder=None, regressor=None):
+    """Return ``df`` with category, confidence, main pollutant, risk and AQI columns added.
+
+    Without ``model`` the chunk is classified by ``aqi.inference.engine``, so
+    ``AQI_MODEL_VARIANT`` and ``AQI_SHARED_FOREST`` apply as they do online.
+    """
+    label_encoder = label_encoder if label_encoder is not None else get_label_encoder()
+
+    X = df[FEATURES].to_numpy(dtype=np.float32)
+    valid = ~np.isnan(X).any(axis=1)
+    out = df.copy()
+    out["AQI Category"] = None
+    out["Confidence"] = np.nan
+    if valid.any():
+        estimator = model if model is not None else engine(int(valid.sum()))
+        proba = estimator.predict_proba(X[valid])
+        best = proba.argmax(axis=1)
+        labels = label_encoder.inverse_transform(estimator.classes_[best])
+        main_pollutant, risk, emoji = risk_badges(labels, X[valid])
+        out.loc[valid, "AQI Category"] = labels
+        out.loc[valid, "Confidence"] = proba[np.arange(len(best)), best].round(4)
+        out.loc[valid, "Main Pollutant"] = main_pollutant
+        out.loc[valid, "Risk Level"] = risk
+        out.loc[valid, "Risk Emoji"] = emoji
+        if regressor is not None:
+            out.loc[valid, "Predicted AQI"] = np.clip(regressor.predict(X[valid]), 0, 500).round()
+    # breakpoint formula: no model, and it copes with missing pollutants itself
+    cpcb = cpcb_compute(X)
+    out["CPCB AQI"] = cpcb["aqi"]
+    out["CPCB Category"] = cpcb["category"]
+    out["Dominant Pollutant"] = cpcb["dominant"]
+    return out.reindex(columns=list(df.columns) + OUTPUT_COLUMNS)
+
+
+def iter_scored(source, name="", chunk_size=CHUNK_SIZE):
+    label_encoder, regressor = get_label_encoder(), get_regressor()
+    for chunk in iter_readings(source, name, chunk_size):
+        yield score_chunk(chunk, label_encoder=label_encoder, regressor=regressor)
+
+
+def output_dtypes(scored):
+    """One dtype per column of the scored output, fixed from the first chunk.
+
+    Parquet needs the same schema for every row group, but a later chunk can
+    infer differently (a column that was all empty, ints that gained a gap),
+    so known columns get their declared dtype, other numbers float64, and
+    anything else (including columns still empty here) nullable strings.
+    """
+    dtypes = {}
+    for name, dtype in scored.dtypes.items():
+        if name in OUTPUT_DTYPES or name in FEATURE_DTYPES:
+            dtypes[name] = OUTPUT_DTYPES.get(name) or FEATURE_DTYPES[name]
+        elif scored[name].isna().all():
+            dtypes[name] = "string"
+        elif dtype.kind in "iuf":
+            dtypes[name] = "float64"
+        elif dtype.kind == "b":
+            dtypes[name] = "boolean"
+        elif dtype.kind == "M":
+            dtypes[name] = dtype
+        else:
+            dtypes[name] = "string"
+    return dtypes
+
+
+def score_file(source, name="", fmt="csv", chunk_size=CHUNK_SIZE):
+    """Score a whole upload and return (output bytes, rows scored, category counts)."""
+    buf = io.BytesIO()
+    rows = 0
+    counts = {}
+    writer = dtypes = schema = None
+    for scored in iter_scored(source, name, chunk_size):
+        for category, n in scored["AQI Category"].value_counts().items():
+            counts[category] = counts.get(category, 0) + int(n)
+        if fmt == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            if dtypes is None:
+                dtypes = output_dtypes(scored)
+            table = pa.Table.from_pandas(scored.astype(dtypes), schema=schema, preserve_index=False)
+            if writer is None:
+                schema = table.schema
+                writer = pq.ParquetWriter(buf, schema)
+            writer.write_table(table)
+        else:
+            scored.to_csv(buf, header=rows == 0, index=False)
+        rows += len(scored)
+    if writer is not None:
+        writer.close()
+    return buf.getvalue(), rows, counts
@@ -0,0 +1,173 @@
+"""Static images used by the dashboard, rendered to encoded bytes and cached.
+
+Rendering uses matplotlib's object API (``Figure``), not ``pyplot``, so
+concurrent sessions don't share global figure state.
+"""
+import io
+
+from aqi.metrics import timed
+from aqi.render_cache import render_cache
+
+POLLUTANTS = ["PM2.5", "PM10", "NO₂", "SO₂", "CO", "Ozone"]
+
+# Reference data
+historical_avg = {
+    "PM2.5": 90,
+    "PM10": 160,
+    "NO₂": 35,
+    "SO₂": 12,
+    "CO": 1.0,
+    "Ozone": 25
+}
+
+who_limits = {
+    "PM2.5": 25,
+    "PM10": 50,
+    "NO₂": 40,
+    "SO₂": 20,
+    "CO": 4.0,
+    "Ozone": 50
+}
+
+
+@timed("qr_render")
+def render_qr_png(url, size=300):
+    import qrcode
+    from PIL import Image
+
+    # Generate QR Code with high box_size for clarity
+    qr = qrcode.QRCode(version=1, box_size=10, border=4)
+    qr.add_data(url)
+    qr.make(fit=True)
+
+    # Create and resize image for laptop viewing
+    img = qr.make_image(fill_color="black", back_color="white").convert("RGB")
+    img = img.resize((size, size), Image.LANCZOS)  # Clear and sharp
+
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def qr_png(url, size=300):
+    """PNG bytes of the QR code for ``url``; rendered once per process per (url, size)."""
+    return render_cache.get_or_render(("qr", url, size), render_qr_png, url, size)
+
+
+@timed("chart_render")
+def render_comparison_chart(your_values, theme="light", fmt="png"):
+    import pandas as pd
+    import seaborn as sns
+    from matplotlib.figure import Figure
+
+    df_compare = pd.DataFrame({
+        "Pollutant": POLLUTANTS,
+        "Your Input": list(your_values),
+        "Delhi Avg": [historical_avg[p] for p in POLLUTANTS],
+        "WHO Limit": [who_limits[p] for p in POLLUTANTS]
+    })
+
+    # Melt DataFrame for seaborn
+    df_melt = df_compare.melt(id_vars="Pollutant", var_name="Type", value_name="Value")
+
+    fg, bg = ("white", "#0E1117") if theme == "dark" else ("black", "white")
+    fig = Figure(figsize=(10, 5), facecolor=bg)
+    ax = fig.subplots()
+    ax.set_facecolor(bg)
+    sns.barplot(data=df_melt, x="Pollutant", y="Value", hue="Type", ax=ax)
+    ax.set_title("📉 Your Pollution Levels vs Delhi Avg vs WHO Safe Limits", color=fg)
+    ax.set_ylabel("Concentration", color=fg)
+    ax.set_xlabel("Pollutant", color=fg)
+    ax.tick_params(colors=fg)
+    ax.grid(axis="y")
+
+    buf = io.BytesIO()
+    fig.savefig(buf, format=fmt, bbox_inches="tight", facecolor=bg)
+    return buf.getvalue()
+
+
+def comparison_chart(your_values, theme="light", fmt="png"):
+    """Encoded "Your levels vs Delhi avg vs WHO" bar chart, cached on (values, theme, format)."""
+    key = ("compare", tuple(float(v) for v in your_values), theme, fmt)
+    return render_cache.get_or_render(key, render_comparison_chart, your_values, theme, fmt)
+
+
+@timed("chart_render")
+def render_aqi_heatmap(matrix, title, theme="light", fmt="png"):
+    import seaborn as sns
+    from matplotlib.figure import Figure
+
+    fg, bg = ("white", "#0E1117") if theme == "dark" else ("black", "white")
+    fig = Figure(figsize=(12, 4.5), facecolor=bg)
+    ax = fig.subplots()
+    ax.set_facecolor(bg)
+    sns.heatmap(
+        matrix, ax=ax, cmap="RdYlGn_r", vmin=0, vmax=500, linewidths=0.3, linecolor=bg,
+        xticklabels=range(1, 32),
+        yticklabels=["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"],
+        cbar_kws={"label": "AQI"},
+    )
+    ax.set_title(title, color=fg)
+    ax.set_xlabel("Day of month", color=fg)
+    ax.tick_params(colors=fg)
+    ax.collections[0].colorbar.ax.tick_params(colors=fg)
+    ax.collections[0].colorbar.ax.yaxis.label.set_color(fg)
+
+    buf = io.BytesIO()
+    fig.savefig(buf, format=fmt, bbox_inches="tight", facecolor=bg)
+    return buf.getvalue()
+
+
+def aqi_heatmap(history, year="All", theme="light", fmt="png"):
+    """Month x day mean-AQI heatmap for ``year`` of an ``aqi.history.History``, cached per data version."""
+    key = ("heatmap", history.version, year, theme, fmt)
+    title = f"Mean daily AQI ({'all years' if year == 'All' else year})"
+    return render_cache.get_or_render(key, render_aqi_heatmap, history.heatmap(year), title, theme, fmt)
+
+
+# CPCB category colours, mildest first (matches aqi.whatif.CATEGORIES)
+CATEGORY_COLORS = ["#009966", "#a3c853", "#ffde33", "#ff9933", "#cc0033", "#7e0023"]
+
+
+@timed("chart_render")
+def render_decision_surface(sweep, theme="light", fmt="png"):
+    from matplotlib.colors import ListedColormap
+    from matplotlib.figure import Figure
+    from matplotlib.patches import Patch
+
+    from aqi.features import DISPLAY_NAMES, FEATURES
+    from aqi.whatif import CATEGORIES
+
+    fg, bg = ("white", "#0E1117") if theme == "dark" else ("black", "white")
+    two_d = sweep.y_feature is not None
+    fig = Figure(figsize=(9, 6 if two_d else 2.2), facecolor=bg)
+    ax = fig.subplots()
+    ax.set_facecolor(bg)
+    x, y = sweep.x_values, sweep.y_values
+    extent = [x[0], x[-1], y[0], y[-1]] if two_d else [x[0], x[-1], 0, 1]
+    ax.imshow(sweep.codes, origin="lower", aspect="auto", extent=extent, interpolation="nearest",
+              cmap=ListedColormap(CATEGORY_COLORS), vmin=-0.5, vmax=len(CATEGORIES) - 0.5)
+
+    # the fixed vector's own position
+    fx = sweep.fixed[FEATURES.index(sweep.x_feature)]
+    fy = sweep.fixed[FEATURES.index(sweep.y_feature)] if two_d else 0.5
+    ax.plot([fx], [fy], marker="X", markersize=12, color=fg, markeredgecolor=bg)
+
+    ax.set_xlabel(DISPLAY_NAMES[FEATURES.index(sweep.x_feature)], color=fg)
+    if two_d:
+        ax.set_ylabel(DISPLAY_NAMES[FEATURES.index(sweep.y_feature)], color=fg)
+    else:
+        ax.set_yticks([])
+    ax.tick_params(colors=fg)
+    present = sorted(set(sweep.codes.ravel().tolist()))
+    ax.legend(handles=[Patch(color=CATEGORY_COLORS[i], label=CATEGORIES[i]) for i in present],
+              loc="upper left", bbox_to_anchor=(1.01, 1), frameon=False, labelcolor=fg)
+
+    buf = io.BytesIO()
+    fig.savefig(buf, format=fmt, bbox_inches="tight", facecolor=bg)
+    return buf.getvalue()
+
+
+def decision_surface(sweep, theme="light", fmt="png"):
+    """Category map of an ``aqi.whatif.Sweep``, cached on the sweep's key."""
+    return render_cache.get_or_render(("surface", sweep.key, theme, fmt), render_decision_surface, sweep, theme, fmt)
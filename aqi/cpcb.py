@@ -0,0 +1,121 @@
+"""CPCB National AQI from pollutant concentrations, vectorized over any number of rows.
+
+Each pollutant's sub-index is piecewise linear between the breakpoints below
+(concentration -> index 0, 50, 100, 200, 300, 400, 500).  The band of every
+value is found with one ``np.searchsorted`` per pollutant, and the overall
+AQI is the largest sub-index.  Like the published scale, the result is capped
+at 500.  Following CPCB, an AQI needs at least three pollutants, one of them
+PM2.5 or PM10; rows with fewer get NaN.
+
+CO and ozone are officially 8-hour averages and the others 24-hour averages.
+Daily means are used for all of them here, as in ``final_datasett.csv``.
+Unlike the model, this needs no artifacts, so the dashboard and batch jobs
+can always show it.
+
+    python -m aqi.cpcb            # agreement with the AQI column of final_datasett.csv, throughput
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+from aqi.features import FEATURES
+from aqi.labels import aqi_band
+
+INDEX = np.array([0, 50, 100, 200, 300, 400, 500], dtype=float)
+
+# concentration at each INDEX point (µg/m³, CO in mg/m³); the last point extends
+# the open-ended Severe band with its predecessor's width
+BREAKPOINTS = {
+    "PM2.5": [0, 30, 60, 90, 120, 250, 380],
+    "PM10": [0, 50, 100, 250, 350, 430, 510],
+    "NO2": [0, 40, 80, 180, 280, 400, 520],
+    "SO2": [0, 40, 80, 380, 800, 1600, 2400],
+    "CO": [0, 1.0, 2.0, 10, 17, 34, 51],
+    "Ozone": [0, 50, 100, 168, 208, 748, 1288],
+}
+MAX_AQI = 500.0
+MIN_POLLUTANTS = 3
+
+
+def _matrix(X):
+    if hasattr(X, "columns"):  # DataFrame with feature columns
+        X = X[FEATURES].to_numpy(dtype=float)
+    return np.atleast_2d(np.asarray(X, dtype=float))
+
+
+def sub_index(values, breakpoints, index=INDEX):
+    """Sub-index of one pollutant for an array of concentrations (NaN stays NaN)."""
+    c = np.asarray(breakpoints, dtype=float)
+    values = np.asarray(values, dtype=float)
+    band = np.clip(np.searchsorted(c, values, side="left"), 1, len(c) - 1)
+    lo, hi = c[band - 1], c[band]
+    out = index[band - 1] + (values - lo) * (index[band] - index[band - 1]) / (hi - lo)
+    return np.minimum(np.maximum(out, 0.0), index[-1])
+
+
+def sub_indices(X):
+    """(n, 6) sub-indices in ``FEATURES`` order."""
+    X = _matrix(X)
+    return np.column_stack([sub_index(X[:, i], BREAKPOINTS[name]) for i, name in enumerate(FEATURES)])
+
+
+def compute(X):
+    """Overall AQI, category and dominant pollutant for an (n, 6) matrix or a DataFrame.
+
+    Returns a dict of arrays: ``aqi`` (float, NaN where not computable, rounded
+    like the published index), ``category`` and ``dominant`` (object arrays,
+    None where the AQI is NaN) and ``sub_indices`` (n, 6).
+    """
+    sub = sub_indices(X)
+    valid = ~np.isnan(sub)
+    pm = valid[:, FEATURES.index("PM2.5")] | valid[:, FEATURES.index("PM10")]
+    ok = pm & (valid.sum(axis=1) >= MIN_POLLUTANTS)
+    filled = np.where(valid, sub, -np.inf)
+    top = filled.argmax(axis=1)
+    aqi = np.where(ok, np.ceil(np.minimum(filled[np.arange(len(top)), top], MAX_AQI)), np.nan)
+    category = np.full(len(aqi), None, dtype=object)
+    category[ok] = aqi_band(aqi[ok])
+    dominant = np.full(len(aqi), None, dtype=object)
+    dominant[ok] = np.asarray(FEATURES, dtype=object)[top[ok]]
+    return {"aqi": aqi, "category": category, "dominant": dominant, "sub_indices": sub}
+
+
+def compute_row(values):
+    """``compute`` for one 6-value reading -> (aqi, category, dominant pollutant)."""
+    result = compute([values])
+    aqi = result["aqi"][0]
+    return (None if np.isnan(aqi) else int(aqi)), result["category"][0], result["dominant"][0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare computed CPCB AQI with final_datasett.csv")
+    parser.add_argument("--data", default=None)
+    parser.add_argument("--rows", type=int, default=2_000_000, help="rows for the throughput check")
+    args = parser.parse_args()
+
+    from aqi.dataset import load_frame
+    from aqi.registry import BASE_DIR
+
+    frame = load_frame(args.data or os.path.join(BASE_DIR, "final_datasett.csv"), columns=FEATURES + ["AQI"]).dropna()
+    result = compute(frame)
+    truth = frame["AQI"].to_numpy(dtype=float)
+    err = result["aqi"] - truth
+    print(f"rows: {len(frame)}")
+    print(f"MAE vs AQI column: {np.nanmean(np.abs(err)):.1f}, median abs error: {np.nanmedian(np.abs(err)):.1f}")
+    print(f"category agreement: {(result['category'] == aqi_band(truth)).mean():.3f}")
+    names, counts = np.unique(result["dominant"].astype(str), return_counts=True)
+    print("dominant pollutant:", {str(n): int(c) for n, c in zip(names, counts)})
+
+    X = np.random.default_rng(0).uniform(0, 500, size=(args.rows, len(FEATURES)))
+    t0 = time.perf_counter()
+    compute(X)
+    seconds = time.perf_counter() - t0
+    print(f"{args.rows:,} rows in {seconds:.2f}s ({args.rows / seconds:,.0f} rows/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
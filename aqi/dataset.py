@@ -0,0 +1,183 @@
+"""Typed, chunked reading of pollutant datasets with a memory-mapped Arrow cache.
+
+CSV (or Parquet) files are read in ``chunk_rows`` pieces with explicit
+compact dtypes (float32 pollutants, small nullable ints for the calendar
+columns), and their columns are validated once, on the first chunk.  The first
+time a file on disk is read, each chunk is also appended to an uncompressed
+Arrow IPC file in ``.data_cache/``.  Later reads memory-map that file:
+loading is near zero-copy, and iterating touches one record batch at a time,
+so memory stays bounded by the chunk size, not the file size.  The cache is
+keyed on path, size and mtime, and an edited file gets a fresh cache.
+
+History (``aqi.history``), training (``aqi.train``) and batch scoring
+(``aqi.batch``) all read through this module.
+"""
+import glob
+import hashlib
+import os
+import tempfile
+
+from aqi.features import FEATURES
+from aqi.registry import BASE_DIR
+
+CACHE_DIR = os.environ.get("AQI_DATA_CACHE", os.path.join(BASE_DIR, ".data_cache"))
+CHUNK_ROWS = int(os.environ.get("AQI_CHUNK_ROWS", "100000"))
+
+FEATURE_DTYPES = {name: "float32" for name in FEATURES}
+# the training extract's layout; nullable ints so gaps don't force float64/object columns
+DTYPES = {
+    "Date": "Int8",
+    "Month": "Int8",
+    "Year": "Int16",
+    "Holidays_Count": "Int8",
+    "Days": "Int8",
+    "AQI": "Int16",
+    **FEATURE_DTYPES,
+}
+
+
+def check_columns(columns, required=FEATURES):
+    missing = [c for c in required if c not in columns]
+    if missing:
+        raise ValueError(f"Missing required column(s): {', '.join(missing)}. Expected {', '.join(required)}.")
+
+
+def is_parquet(name):
+    return str(name).lower().endswith((".parquet", ".pq"))
+
+
+def read_csv_chunks(source, chunk_rows=CHUNK_ROWS, columns=None, required=FEATURES, dtypes=DTYPES):
+    """Typed DataFrame chunks from a CSV path or file object; columns are validated on the first chunk only.
+
+    Columns not in ``dtypes`` are left to pandas' inference.
+    """
+    import pandas as pd
+
+    usecols = (lambda c: c in columns) if columns else None
+    with pd.read_csv(source, chunksize=chunk_rows, dtype=dtypes, usecols=usecols) as reader:
+        for i, chunk in enumerate(reader):
+            if i == 0:
+                check_columns(chunk.columns, required)
+            yield chunk
+
+
+def read_parquet_chunks(source, chunk_rows=CHUNK_ROWS, columns=None, required=FEATURES, dtypes=DTYPES):
+    import pyarrow.parquet as pq
+
+    parquet = pq.ParquetFile(source)
+    check_columns(parquet.schema_arrow.names, required)
+    for batch in parquet.iter_batches(batch_size=chunk_rows, columns=columns):
+        yield _typed(batch.to_pandas(), dtypes)
+
+
+def _typed(df, dtypes=DTYPES):
+    # int8 coming back from Arrow already matches "Int8" (no nulls) - don't copy it into a masked array
+    casts = {c: t for c, t in dtypes.items() if c in df.columns and str(df[c].dtype).lower() != t.lower()}
+    return df.astype(casts) if casts else df
+
+
+def cache_path(path, cache_dir=CACHE_DIR):
+    st = os.stat(path)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    key = hashlib.sha256(os.path.abspath(path).encode()).hexdigest()[:8]
+    return os.path.join(cache_dir, f"{stem}-{key}-{st.st_size}-{st.st_mtime_ns}.arrow")
+
+
+def ensure_cache(path, chunk_rows=CHUNK_ROWS, cache_dir=CACHE_DIR):
+    """Arrow IPC copy of ``path`` (converted chunk by chunk on first use); returns its path."""
+    target = cache_path(path, cache_dir)
+    if os.path.exists(target):
+        return target
+
+    import pyarrow as pa
+
+    os.makedirs(cache_dir, exist_ok=True)
+    chunks = read_parquet_chunks(path, chunk_rows) if is_parquet(path) else read_csv_chunks(path, chunk_rows)
+    # unique per call: threads of one process may convert the same file at once, and the last rename wins
+    fd, tmp = tempfile.mkstemp(dir=cache_dir, prefix=os.path.basename(target) + ".", suffix=".tmp")
+    os.close(fd)
+    writer = schema = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+            if writer is None:
+                schema = table.schema
+                writer = pa.ipc.new_file(tmp, schema)
+            writer.write_table(table, max_chunksize=chunk_rows)
+        if writer is None:  # header only
+            import pandas as pd
+
+            empty = pd.read_csv(path, nrows=0, dtype=DTYPES) if not is_parquet(path) else pd.read_parquet(path)
+            writer = pa.ipc.new_file(tmp, pa.Table.from_pandas(empty, preserve_index=False).schema)
+        writer.close()
+        writer = None
+        os.replace(tmp, target)
+    finally:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+    # older caches of the same file (it changed since) are dead weight
+    prefix = target.rsplit("-", 2)[0]
+    for stale in glob.glob(f"{prefix}-*.arrow"):
+        if stale != target:
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+    return target
+
+
+def load_table(path, columns=None):
+    """Whole dataset as a ``pyarrow.Table`` backed by the memory-mapped cache (no copy)."""
+    import pyarrow as pa
+
+    reader = pa.ipc.open_file(pa.memory_map(ensure_cache(path)))
+    check_columns(reader.schema.names)
+    table = reader.read_all()
+    return table.select(columns) if columns else table
+
+
+def load_frame(path, columns=None):
+    """Whole dataset as a typed DataFrame; the float32 pollutant columns are views of the mapped cache."""
+    return _typed(load_table(path, columns).to_pandas(split_blocks=True))
+
+
+def iter_chunks(path, chunk_rows=CHUNK_ROWS, columns=None):
+    """DataFrames of at most ``chunk_rows`` rows from the cached file; one is materialized at a time.
+
+    The cache's record batches are sized when it is written, by whichever call
+    converts the file first, so a smaller ``chunk_rows`` later slices them
+    (zero-copy) but a larger one does not merge them.
+    """
+    import pyarrow as pa
+
+    reader = pa.ipc.open_file(pa.memory_map(ensure_cache(path, chunk_rows)))
+    check_columns(reader.schema.names)
+    for i in range(reader.num_record_batches):
+        batch = reader.get_batch(i)
+        if columns:
+            batch = batch.select(columns)
+        for start in range(0, batch.num_rows, chunk_rows):
+            yield _typed(batch.slice(start, chunk_rows).to_pandas(split_blocks=True))
+
+
+def iter_readings(source, name="", chunk_rows=CHUNK_ROWS, dtypes=None):
+    """Chunks from a path (served from the Arrow cache) or an uploaded file object (streamed, not cached).
+
+    ``dtypes`` replaces the training layout ``DTYPES`` for files that only
+    need some columns typed (``aqi.batch`` uploads); such reads skip the cache,
+    which is written with ``DTYPES``.
+    """
+    if isinstance(source, (str, os.PathLike)) and dtypes is None:
+        yield from iter_chunks(os.fspath(source), chunk_rows)
+        return
+    dtypes = DTYPES if dtypes is None else dtypes
+    if isinstance(source, (str, os.PathLike)):
+        name = name or os.fspath(source)
+    name = name or getattr(source, "name", "")
+    if is_parquet(name):
+        yield from read_parquet_chunks(source, chunk_rows, dtypes=dtypes)
+    else:
+        yield from read_csv_chunks(source, chunk_rows, dtypes=dtypes)
@@ -0,0 +1,109 @@
+"""SHAP explanations backed by one ``TreeExplainer`` per model version.
+
+Building the explainer walks every tree of the forest, so it is done once per
+loaded model (see ``aqi.registry``) instead of on every button click.  Per-row
+results are memoized in a small LRU, so the preset scenarios and repeated
+inputs are free after the first request, and batches are explained in a single
+vectorized ``shap_values`` call for whatever rows are not cached yet.
+
+``TreeExplainer`` needs the sklearn estimator, so this is the one place an
+``aqi.serve`` worker still ``joblib.load``s the model instead of using the
+shared forest.  Nothing here runs at import or startup: a worker pays for the
+model the first time it is asked for an explanation.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from aqi.features import DISPLAY_NAMES
+from aqi.metrics import timed
+from aqi.registry import MODEL_FILE, registry
+
+MAX_CACHED_ROWS = 1024
+
+
+class ExplanationService:
+    def __init__(self, model, version, max_cached_rows=MAX_CACHED_ROWS):
+        import shap  # heavy; only needed once an explanation is requested
+
+        self.version = version
+        self.explainer = shap.TreeExplainer(model, feature_names=DISPLAY_NAMES)
+        self.feature_names = DISPLAY_NAMES
+        self.expected_value = np.atleast_1d(np.asarray(self.explainer.expected_value, dtype=float))
+        self.max_cached_rows = max_cached_rows
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(row):
+        return tuple(float(v) for v in row)
+
+    def explain(self, X):
+        """SHAP values for every row of ``X`` -> array of shape (n_rows, n_features, n_classes)."""
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        keys = [self._key(row) for row in X]
+        out = [None] * len(keys)
+        missing = []
+        with self._lock:
+            for i, key in enumerate(keys):
+                cached = self._cache.get(key)
+                if cached is None:
+                    missing.append(i)
+                else:
+                    self._cache.move_to_end(key)
+                    out[i] = cached
+            self.hits += len(keys) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            with timed("shap"):
+                values = np.asarray(self.explainer.shap_values(X[missing], check_additivity=False))
+            if values.ndim == 2:  # single-output model -> add a class axis
+                values = values[:, :, np.newaxis]
+            with self._lock:
+                for i, row_values in zip(missing, values):
+                    out[i] = row_values
+                    self._cache[keys[i]] = row_values
+                while len(self._cache) > self.max_cached_rows:
+                    self._cache.popitem(last=False)
+        return np.stack(out)
+
+    def explain_row(self, row, class_index=0):
+        """(contributions, base value) for one input row and one class."""
+        values = self.explain([row])[0]
+        return values[:, class_index], self.expected_value[class_index]
+
+    def warm(self, rows):
+        """Precompute explanations (e.g. for preset scenarios) in one batch."""
+        rows = list(rows)
+        if rows:
+            self.explain(rows)
+
+    def stats(self):
+        return {
+            "version": self.version,
+            "cached_rows": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+_services = {}
+_services_lock = threading.Lock()
+
+
+def get_explanation_service():
+    """Explanation service for the currently loaded model, rebuilt only when the model changes."""
+    artifact = registry.get(MODEL_FILE)
+    service = _services.get(artifact.version)
+    if service is None:
+        with _services_lock:
+            service = _services.get(artifact.version)
+            if service is None:
+                service = ExplanationService(artifact.obj, artifact.version)
+                _services.clear()  # drop explainers of replaced models
+                _services[artifact.version] = service
+    return service
@@ -0,0 +1,4 @@
+"""Feature order expected by ``aqi_rf_model.joblib`` and how the UI labels it."""
+
+FEATURES = ["PM2.5", "PM10", "NO2", "SO2", "CO", "Ozone"]
+DISPLAY_NAMES = ["PM2.5", "PM10", "NO₂", "SO₂", "CO", "Ozone"]
@@ -0,0 +1,381 @@
+"""Flat NumPy inference engine for the scikit-learn random forest.
+
+``compile_forest`` exports every tree of ``aqi_rf_model.joblib`` into shared
+node arrays (feature, threshold, left/right child, per-class leaf
+probability).  Traversal advances every (row, tree) pair one level per
+vectorized step and drops pairs from the active set as soon as they reach a
+leaf, so there is no per-tree or per-row Python dispatch.  This removes the
+sklearn per-call overhead (single rows are ~30x faster); for very large
+single-threaded batches sklearn's Cython traversal is still quicker, which
+is why ``aqi.inference`` only routes small batches here by default.
+
+Results match ``model.predict_proba`` bit for bit: inputs are cast to
+float32 like sklearn does, leaf values are normalized the same way, and
+per-tree probabilities are accumulated in tree order.  A NaN feature goes
+to the child sklearn recorded for missing values (``missing_go_to_left``).  With ``n_threads > 1``
+tree groups are traversed in parallel (NumPy releases the GIL) but the final
+accumulation still runs in tree order, so parity is kept.
+
+    python -m aqi.forest export   # write aqi_rf_model.compiled/ next to the joblib file
+    python -m aqi.forest check    # parity against the sklearn model (exit 1 on mismatch)
+    python -m aqi.forest share    # export into $AQI_SHARED_FOREST/<version>/ for aqi.serve workers
+
+With ``AQI_SHARED_FOREST`` set (``aqi.serve`` does this), ``get_compiled_forest``
+memory-maps the arrays from ``$AQI_SHARED_FOREST/<model version>/`` instead of
+compiling them, so every worker on the box shares one copy in the page cache
+and none of them has to ``joblib.load`` the model just to predict.  The first
+process to need a version that isn't exported yet writes it under a file lock.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from aqi.registry import BASE_DIR, MODEL_FILE, registry
+
+COMPILED_DIR = os.path.join(BASE_DIR, "aqi_rf_model.compiled")
+CHUNK_ROWS = 8192
+SMALL_BATCH_PAIRS = 2048
+ARRAYS = ("feature", "threshold", "left", "right", "value", "roots", "missing_left")
+OPTIONAL = ("missing_left",)
+DERIVED = ("children", "is_leaf")  # saved too, so mapped forests don't build private copies
+SHARED_DIR = os.environ.get("AQI_SHARED_FOREST")
+
+
+class CompiledForest:
+    def __init__(self, feature, threshold, left, right, value, roots, classes, max_depth, n_features, version=None,
+                 x_scale=None, value_scale=1.0, children=None, is_leaf=None, missing_left=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.missing_left = missing_left  # per node: a NaN feature goes left (None: exported before this existed)
+        self.classes_ = classes
+        self.max_depth = int(max_depth)
+        self.n_features_in_ = int(n_features)
+        self.n_estimators = len(roots)
+        self.version = version
+        # quantized variants (aqi.variants): integer thresholds compare against round-down scaled
+        # inputs, and integer leaf values are multiplied back by value_scale
+        self.x_scale = None if x_scale is None else np.asarray(x_scale, dtype=np.float64)
+        self.value_scale = float(value_scale)
+        # interleaved [left, right] so a step is one gather: children[2 * node + went_right]
+        self.children = np.stack([left, right], axis=1).ravel() if children is None else children
+        self.is_leaf = np.asarray(left) == np.arange(len(left)) if is_leaf is None else is_leaf
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in ARRAYS if getattr(self, name) is not None)
+
+    def _went_right(self, flat_x, missing, idx, node):
+        went_right = np.take(flat_x, idx) > np.take(self.threshold, node)
+        if missing is not None:
+            nan = np.take(missing, idx)
+            went_right[nan] = ~self.missing_left[node[nan]].astype(bool)
+        return went_right
+
+    def _leaves(self, X, trees, missing=None):
+        """Leaf index reached by every row of ``X`` in each tree of ``trees`` -> (n_rows, len(trees)).
+
+        ``missing`` is a flat mask of NaN inputs (None when there are none).
+        """
+        n, n_trees = len(X), len(trees)
+        flat_x = X.ravel()
+        leaves = np.broadcast_to(self.roots[trees], (n, n_trees)).ravel().copy()
+        if n * n_trees <= SMALL_BATCH_PAIRS:
+            # tiny batches: a fixed max_depth walk (leaves loop on themselves) beats compaction overhead
+            row_offset = np.repeat(np.arange(n) * X.shape[1], n_trees)
+            for _ in range(self.max_depth):
+                went_right = self._went_right(flat_x, missing, row_offset + np.take(self.feature, leaves), leaves)
+                leaves = np.take(self.children, 2 * leaves + went_right)
+            return leaves.reshape(n, n_trees)
+
+        # active (row, tree) pairs: position in ``leaves``, current node, offset of the row in flat_x
+        pos = np.flatnonzero(~self.is_leaf[leaves])
+        node = leaves[pos]
+        row_offset = (pos // n_trees) * X.shape[1]
+        while len(pos):
+            went_right = self._went_right(flat_x, missing, row_offset + np.take(self.feature, node), node)
+            node = np.take(self.children, 2 * node + went_right)
+            done = np.take(self.is_leaf, node)
+            if done.any():
+                leaves[pos[done]] = node[done]
+                keep = ~done
+                pos, node, row_offset = pos[keep], node[keep], row_offset[keep]
+        return leaves.reshape(n, n_trees)
+
+    def _prepare(self, X):
+        if self.x_scale is None:
+            return np.ascontiguousarray(X, dtype=np.float32)
+        info = np.iinfo(self.threshold.dtype)
+        scaled = np.floor(np.nan_to_num(np.asarray(X, dtype=np.float64)) * self.x_scale)  # NaNs use ``missing``
+        return np.ascontiguousarray(np.clip(scaled, info.min, info.max).astype(self.threshold.dtype))
+
+    def apply(self, X, n_threads=1):
+        X = np.asarray(X)
+        if X.ndim == 1:
+            X = X[np.newaxis, :]
+        missing = np.isnan(X)
+        missing = missing.ravel() if missing.any() else None
+        if missing is not None and self.missing_left is None:
+            raise ValueError("this forest was exported without missing-value directions; re-export it to score NaNs")
+        X = self._prepare(X)
+        trees = np.arange(self.n_estimators)
+        if n_threads <= 1 or self.n_estimators < 2:
+            return self._leaves(X, trees, missing)
+        groups = np.array_split(trees, min(n_threads, self.n_estimators))
+        with ThreadPoolExecutor(max_workers=len(groups)) as pool:
+            parts = list(pool.map(lambda g: self._leaves(X, g, missing), groups))
+        return np.concatenate(parts, axis=1)
+
+    def predict_proba(self, X, n_threads=1, chunk_rows=CHUNK_ROWS):
+        X = np.asarray(X)
+        if X.ndim == 1:
+            X = X[np.newaxis, :]
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(f"X has {X.shape[1]} features, but the forest expects {self.n_features_in_}")
+        out = np.empty((len(X), len(self.classes_)), dtype=np.float64)
+        for start in range(0, len(X), chunk_rows):
+            leaves = self.apply(X[start:start + chunk_rows], n_threads)
+            # sequential sum over the tree axis == sklearn's per-tree "+=" order
+            out[start:start + chunk_rows] = self.value[leaves].sum(axis=1, dtype=np.float64)
+        out /= self.n_estimators
+        if self.value_scale != 1.0:
+            out *= self.value_scale
+        return out
+
+    def predict(self, X, n_threads=1):
+        return self.classes_[self.predict_proba(X, n_threads).argmax(axis=1)]
+
+    def save(self, path=COMPILED_DIR):
+        os.makedirs(path, exist_ok=True)
+        for name in ARRAYS + DERIVED:
+            if getattr(self, name) is not None:
+                np.save(os.path.join(path, f"{name}.npy"), getattr(self, name))
+        np.save(os.path.join(path, "classes.npy"), self.classes_)
+        meta = {
+            "max_depth": self.max_depth,
+            "n_features": self.n_features_in_,
+            "version": self.version,
+            "x_scale": None if self.x_scale is None else self.x_scale.tolist(),
+            "value_scale": self.value_scale,
+        }
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump(meta, f)
+
+    @classmethod
+    def load(cls, path=COMPILED_DIR, mmap_mode="r"):
+        """Load exported arrays; with ``mmap_mode="r"`` they are mapped, not copied."""
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode) for name in ARRAYS
+                  if name not in OPTIONAL}
+        for name in OPTIONAL + DERIVED:  # absent in exports from older versions
+            if os.path.exists(os.path.join(path, f"{name}.npy")):
+                arrays[name] = np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode)
+        classes = np.load(os.path.join(path, "classes.npy"))
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        return cls(classes=classes, **arrays, **meta)
+
+
+def _tree_nodes(tree, depth_limit):
+    """Old node ids to keep, in pre-order, and which of them become leaves under ``depth_limit``."""
+    left, right = tree.children_left, tree.children_right
+    if depth_limit is None or depth_limit >= tree.max_depth:
+        return np.arange(tree.node_count), left == -1
+    order, cut = [], []
+    stack = [(0, 0)]
+    while stack:
+        node, depth = stack.pop()
+        order.append(node)
+        is_leaf = left[node] == -1 or depth >= depth_limit
+        cut.append(is_leaf)
+        if not is_leaf:
+            stack.append((right[node], depth + 1))
+            stack.append((left[node], depth + 1))
+    return np.asarray(order), np.asarray(cut)
+
+
+def compile_forest(model, version=None, n_trees=None, max_depth=None):
+    """Flatten a fitted ``RandomForestClassifier`` into a ``CompiledForest``.
+
+    ``n_trees`` keeps only the first trees and ``max_depth`` turns deeper nodes into
+    leaves (internal nodes already hold their class distribution); with neither, the
+    result is an exact copy of the forest.
+    """
+    if getattr(model, "n_outputs_", 1) != 1:
+        raise ValueError("only single-output forests are supported")
+    features, thresholds, lefts, rights, missing, values, roots = [], [], [], [], [], [], []
+    offset = 0
+    depth = 0
+    for estimator in model.estimators_[:n_trees]:
+        tree = estimator.tree_
+        keep, is_leaf = _tree_nodes(tree, max_depth)
+        n = len(keep)
+        renumber = np.full(tree.node_count, -1, dtype=np.int64)
+        renumber[keep] = np.arange(offset, offset + n)
+        own = np.arange(offset, offset + n, dtype=np.int32)
+
+        features.append(np.where(is_leaf, 0, tree.feature[keep]).astype(np.int32))
+        thresholds.append(np.where(is_leaf, 0.0, tree.threshold[keep]).astype(np.float64))
+        lefts.append(np.where(is_leaf, own, renumber[tree.children_left[keep]]).astype(np.int32))
+        rights.append(np.where(is_leaf, own, renumber[tree.children_right[keep]]).astype(np.int32))
+        missing.append(np.asarray(tree.missing_go_to_left)[keep].astype(np.uint8))
+
+        # same normalization as DecisionTreeClassifier.predict_proba
+        proba = tree.value[keep, 0, :len(model.classes_)].astype(np.float64)
+        normalizer = proba.sum(axis=1)[:, np.newaxis]
+        normalizer[normalizer == 0.0] = 1.0
+        values.append(proba / normalizer)
+
+        roots.append(offset)
+        depth = max(depth, min(tree.max_depth, max_depth) if max_depth is not None else tree.max_depth)
+        offset += n
+
+    return CompiledForest(
+        feature=np.concatenate(features),
+        threshold=np.concatenate(thresholds),
+        left=np.concatenate(lefts),
+        right=np.concatenate(rights),
+        missing_left=np.concatenate(missing),
+        value=np.concatenate(values),
+        roots=np.asarray(roots, dtype=np.int32),
+        classes=np.asarray(model.classes_),
+        max_depth=depth,
+        n_features=model.n_features_in_,
+        version=version,
+    )
+
+
+_compiled = {}
+_compiled_lock = threading.Lock()
+
+
+def get_compiled_forest():
+    """Compiled forest for the currently loaded model, rebuilt only when the model version changes.
+
+    With ``AQI_MODEL_VARIANT`` set this is that reduced variant (see ``aqi.variants``).
+    """
+    from aqi.variants import MODEL_VARIANT
+
+    version = registry.version(MODEL_FILE)
+    key = (version, MODEL_VARIANT)
+    forest = _compiled.get(key)
+    if forest is None:
+        with _compiled_lock:
+            forest = _compiled.get(key)
+            if forest is None:
+                if MODEL_VARIANT:
+                    from aqi.variants import load_variant
+                    forest = load_variant(MODEL_VARIANT, version)
+                elif SHARED_DIR:
+                    forest = CompiledForest.load(export_shared(version))
+                else:
+                    forest = compile_forest(registry.load(MODEL_FILE), version=version)
+                _compiled.clear()
+                _compiled[key] = forest
+    return forest
+
+
+def _complete(path):
+    return all(os.path.exists(os.path.join(path, name)) for name in ("meta.json", "missing_left.npy"))
+
+
+def export_shared(version=None, shared_dir=None):
+    """Directory holding the exported arrays of model ``version``, writing it first if needed.
+
+    The export is built in a temporary directory and renamed into place, so a
+    process never maps a half-written forest; exports of other versions are
+    removed (workers still mapping them keep their pages until they reload).
+    """
+    import shutil
+
+    from aqi.logwriter import file_lock
+
+    shared_dir = shared_dir or SHARED_DIR
+    version = version or registry.version(MODEL_FILE)
+    path = os.path.join(shared_dir, version)
+    if _complete(path):
+        return path
+    os.makedirs(shared_dir, exist_ok=True)
+    with file_lock(os.path.join(shared_dir, "export")):
+        if not _complete(path):
+            artifact = registry.get(MODEL_FILE)  # may be newer than ``version`` by now
+            version, path = artifact.version, os.path.join(shared_dir, artifact.version)
+            if not _complete(path):
+                shutil.rmtree(path, ignore_errors=True)  # exported before missing-value directions existed
+                tmp = f"{path}.{os.getpid()}.tmp"
+                compile_forest(artifact.obj, version=version).save(tmp)
+                os.replace(tmp, path)
+        for name in os.listdir(shared_dir):
+            old = os.path.join(shared_dir, name)
+            if name != version and os.path.isdir(old):
+                shutil.rmtree(old, ignore_errors=True)
+    return path
+
+
+def parity_rows(n_random=20_000, seed=0):
+    """Rows from ``final_datasett.csv`` plus random readings spanning the input widgets' range."""
+    import pandas as pd
+
+    from aqi.features import FEATURES
+
+    data = pd.read_csv(os.path.join(BASE_DIR, "final_datasett.csv"))[FEATURES].to_numpy(dtype=float)
+    rng = np.random.default_rng(seed)
+    high = np.array([1000, 1000, 1000, 1000, 50, 1000], dtype=float)
+    return np.vstack([data, rng.uniform(0, high, size=(n_random, len(FEATURES)))])
+
+
+def check_parity(model, forest, X, n_threads=1):
+    """Return a dict describing how ``forest`` compares to ``model`` on ``X``."""
+    import warnings
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # sklearn warns about missing feature names for arrays
+        expected = model.predict_proba(X)
+        expected_labels = model.predict(X)
+    got = forest.predict_proba(X, n_threads=n_threads)
+    return {
+        "rows": len(X),
+        "label_mismatches": int((forest.classes_[got.argmax(axis=1)] != expected_labels).sum()),
+        "max_abs_proba_diff": float(np.abs(got - expected).max()),
+        "identical_proba": bool(np.array_equal(got, expected)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile / verify the flat random-forest engine")
+    sub = parser.add_subparsers(dest="command", required=True)
+    exp = sub.add_parser("export", help="write the compiled node arrays")
+    exp.add_argument("--out", default=COMPILED_DIR)
+    chk = sub.add_parser("check", help="parity against the sklearn model")
+    chk.add_argument("--threads", type=int, default=1)
+    shr = sub.add_parser("share", help="export for workers started with AQI_SHARED_FOREST")
+    shr.add_argument("--dir", default=SHARED_DIR, required=SHARED_DIR is None)
+    args = parser.parse_args()
+
+    if args.command == "share":
+        path = export_shared(shared_dir=args.dir)
+        print(f"Shared forest for model {os.path.basename(path)} in {path}")
+        return 0
+
+    artifact = registry.get(MODEL_FILE)
+    forest = compile_forest(artifact.obj, version=artifact.version)
+    if args.command == "export":
+        forest.save(args.out)
+        print(f"Wrote {forest.n_estimators} trees / {len(forest.feature):,} nodes "
+              f"({forest.nbytes / 1024:.0f} KB) to {args.out}")
+        return 0
+
+    result = check_parity(artifact.obj, forest, parity_rows(), n_threads=args.threads)
+    print(json.dumps(result, indent=2))
+    return 0 if result["label_mismatches"] == 0 and result["identical_proba"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+"""Historical AQI series from ``final_datasett.csv`` with precomputed rollups.
+
+The CSV is loaded once per process through ``aqi.dataset`` (typed columns,
+memory-mapped Arrow cache) into a date-indexed frame.  Daily / weekly / monthly / yearly means, per-period category
+counts and a month x day heatmap matrix per year are built at the same
+time, and the frame is only rebuilt when the file changes (same stat check
+as ``aqi.registry``).  Range queries slice the pre-aggregated frames, and
+range summaries come from prefix sums over the daily series, so moving a
+date slider never regroups raw rows.
+"""
+import os
+import threading
+
+import numpy as np
+
+from aqi.features import FEATURES
+from aqi.labels import AQI_BANDS, aqi_band
+from aqi.registry import BASE_DIR
+
+DATA_FILE = os.path.join(BASE_DIR, "final_datasett.csv")
+CATEGORIES = [name for _, name in AQI_BANDS] + ["Severe"]
+METRICS = ["AQI"] + FEATURES
+# display name -> pandas offset alias
+FREQUENCIES = {"Daily": "D", "Weekly": "W", "Monthly": "MS", "Yearly": "YS"}
+
+
+def load_frame(path=DATA_FILE):
+    """Typed, date-indexed frame: float32 pollutants, int16 AQI, categorical CPCB band."""
+    import pandas as pd
+
+    from aqi.dataset import load_frame as load_dataset
+
+    raw = load_dataset(path)
+    index = pd.to_datetime(
+        {"year": raw["Year"], "month": raw["Month"], "day": raw["Date"]}, errors="coerce"
+    )
+    # rows without a valid date or an AQI can't be placed or banded; drop them before any int cast
+    keep = (index.notna() & raw["AQI"].notna()).to_numpy()
+    raw, index = raw[keep], index[keep]
+    df = raw[FEATURES].copy()
+    df["AQI"] = raw["AQI"].astype(np.int16)
+    df["Holidays"] = raw["Holidays_Count"].fillna(0).astype(np.int8)
+    df["Weekday"] = raw["Days"].fillna(0).astype(np.int8)
+    df["Category"] = pd.Categorical(aqi_band(df["AQI"]), categories=CATEGORIES, ordered=True)
+    df.index = pd.DatetimeIndex(index, name="Date")
+    return df.sort_index()
+
+
+class History:
+    """Frame plus every aggregate the History page asks for, built once."""
+
+    def __init__(self, frame, version=None):
+        import pandas as pd
+
+        self.frame = frame
+        self.version = version
+        values = frame[METRICS].astype(np.float64)
+        self.rollups = {}
+        self.category_rollups = {}
+        dummies = pd.get_dummies(frame["Category"]).astype(np.int32)
+        for freq in FREQUENCIES.values():
+            self.rollups[freq] = values.resample(freq).mean().dropna(how="all").astype(np.float32)
+            self.category_rollups[freq] = dummies.resample(freq).sum().loc[self.rollups[freq].index]
+
+        # prefix sums over the daily rows: any [start, end] summary is two lookups
+        self._dates = frame.index.values
+        self._aqi_cumsum = np.concatenate([[0.0], np.cumsum(frame["AQI"].to_numpy(np.float64))])
+        self._cat_cumsum = np.vstack([np.zeros(len(CATEGORIES), np.int64), np.cumsum(dummies.to_numpy(np.int64), axis=0)])
+        self._aqi = frame["AQI"].to_numpy()
+
+        self.heatmaps = {year: self._heatmap(frame[frame.index.year == year]) for year in self.years}
+        self.heatmaps["All"] = self._heatmap(frame)
+
+    @staticmethod
+    def _heatmap(frame):
+        # 12 x 31 mean AQI (NaN where the day doesn't exist or has no reading)
+        total = np.zeros((12, 31))
+        count = np.zeros((12, 31))
+        np.add.at(total, (frame.index.month - 1, frame.index.day - 1), frame["AQI"].to_numpy(np.float64))
+        np.add.at(count, (frame.index.month - 1, frame.index.day - 1), 1)
+        with np.errstate(invalid="ignore"):
+            return total / np.where(count == 0, np.nan, count)
+
+    @property
+    def years(self):
+        return sorted(set(self.frame.index.year))
+
+    @property
+    def bounds(self):
+        return self.frame.index.min().date(), self.frame.index.max().date()
+
+    def _positions(self, start, end):
+        lo = np.searchsorted(self._dates, np.datetime64(start, "ns"), side="left")
+        hi = np.searchsorted(self._dates, np.datetime64(end, "ns") + np.timedelta64(1, "D"), side="left")
+        return lo, hi
+
+    def rollup(self, freq="D", start=None, end=None, metrics=None):
+        """Pre-aggregated means for periods starting inside [start, end]."""
+        df = self.rollups[freq]
+        df = df.loc[start:end] if start or end else df
+        return df[metrics] if metrics else df
+
+    def category_counts(self, freq="D", start=None, end=None):
+        df = self.category_rollups[freq]
+        return df.loc[start:end] if start or end else df
+
+    def summary(self, start, end):
+        """Day count, mean/max AQI and days per category for [start, end] (dates inclusive)."""
+        lo, hi = self._positions(start, end)
+        days = int(hi - lo)
+        if days == 0:
+            return {"days": 0, "mean_aqi": None, "max_aqi": None, "categories": dict.fromkeys(CATEGORIES, 0)}
+        counts = self._cat_cumsum[hi] - self._cat_cumsum[lo]
+        return {
+            "days": days,
+            "mean_aqi": float((self._aqi_cumsum[hi] - self._aqi_cumsum[lo]) / days),
+            "max_aqi": int(self._aqi[lo:hi].max()),
+            "categories": dict(zip(CATEGORIES, counts.tolist())),
+        }
+
+    def heatmap(self, year="All"):
+        return self.heatmaps[year]
+
+
+_history = None
+_signature = None
+_lock = threading.Lock()
+
+
+def get_history(path=DATA_FILE):
+    """Process-wide ``History``; rebuilt only when the CSV's mtime/size change."""
+    global _history, _signature
+    st = os.stat(path)
+    signature = (path, st.st_mtime_ns, st.st_size)
+    if _history is None or _signature != signature:
+        with _lock:
+            if _history is None or _signature != signature:
+                _history = History(load_frame(path), version=f"{st.st_mtime_ns}-{st.st_size}")
+                _signature = signature
+    return _history
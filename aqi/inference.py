@@ -0,0 +1,123 @@
+"""Model inference shared by the dashboard, batch scoring and the HTTP API (no Streamlit).
+
+Small batches (the dashboard's single rows, API micro-batches) go through the
+flat NumPy engine in ``aqi.forest``, which skips sklearn's per-call overhead;
+larger ones use the sklearn model directly.  Both give identical results,
+NaN features included (the flat engine routes them the way sklearn does).
+When ``AQI_MODEL_VARIANT`` selects a reduced variant (``aqi.variants``), it
+serves every batch size so answers don't depend on how rows were batched.
+The same goes for ``AQI_SHARED_FOREST`` (multi-worker mode, see ``aqi.serve``):
+workers then score everything from the memory-mapped forest and leave the
+joblib model on disk, trading some large-batch speed for memory.
+``predict_cached`` puts ``aqi.prediction_cache`` in front of all of this.
+"""
+import os
+
+import numpy as np
+
+from aqi.features import FEATURES
+from aqi.labels import aqi_health_tips, emoji_map, risk_badges
+from aqi.metrics import timed
+from aqi.forest import SHARED_DIR, get_compiled_forest
+from aqi.prediction_cache import prediction_cache
+from aqi.variants import MODEL_VARIANT
+from aqi.registry import get_label_encoder, get_model, get_regressor, model_version
+
+# up to this many rows, use the compiled forest; above it sklearn's Cython traversal wins on one core
+FLAT_MAX_ROWS = int(os.environ.get("AQI_FLAT_MAX_ROWS", "256"))
+
+
+def to_matrix(rows):
+    """Accept dicts keyed by feature name or 6-value sequences; return an (n, 6) float array."""
+    matrix = []
+    for row in rows:
+        if isinstance(row, dict):
+            row = [row[name] for name in FEATURES]
+        matrix.append([float(v) for v in row])
+    X = np.asarray(matrix, dtype=float).reshape(-1, len(FEATURES))
+    return X
+
+
+def engine(n_rows):
+    """The estimator to use for a batch of ``n_rows`` (both expose predict/predict_proba/classes_)."""
+    if MODEL_VARIANT or SHARED_DIR or n_rows <= FLAT_MAX_ROWS:
+        return get_compiled_forest()
+    return get_model()
+
+
+@timed("predict")
+def predict_encoded(X):
+    X = np.asarray(X, dtype=float)
+    return engine(len(X)).predict(X)
+
+
+@timed("predict")
+def predict_proba(X):
+    """(labels, probabilities) for an (n, 6) matrix using one ``predict_proba`` call."""
+    X = np.asarray(X, dtype=float)
+    estimator, label_encoder = engine(len(X)), get_label_encoder()
+    proba = estimator.predict_proba(X)
+    labels = label_encoder.inverse_transform(estimator.classes_[proba.argmax(axis=1)])
+    return labels, proba
+
+
+@timed("predict")
+def predict_aqi(X):
+    """Numeric AQI estimates from the regressor, or None if it isn't deployed."""
+    regressor = get_regressor()
+    if regressor is None:
+        return None
+    return np.clip(regressor.predict(np.asarray(X, dtype=float)), 0, 500).round()
+
+
+def class_labels():
+    return list(get_label_encoder().inverse_transform(engine(1).classes_))
+
+
+def describe(X, labels, proba):
+    """Turn raw predictions into the result dicts the UI/API show."""
+    names = class_labels()
+    main_pollutants, risks, risk_emojis = risk_badges(labels, X)
+    results = []
+    for i, label in enumerate(labels):
+        results.append({
+            "category": str(label),
+            "emoji": emoji_map.get(label, "❓"),
+            "probabilities": {name: round(float(p), 4) for name, p in zip(names, proba[i])},
+            "health": aqi_health_tips.get(label),
+            "main_pollutant": str(main_pollutants[i]),
+            "risk": str(risks[i]),
+            "risk_emoji": str(risk_emojis[i]),
+        })
+    return results
+
+
+def predict_rows(rows):
+    X = to_matrix(rows)
+    labels, proba = predict_proba(X)
+    return describe(X, labels, proba)
+
+
+def cache_version():
+    return f"{model_version()}:{MODEL_VARIANT or 'full'}"
+
+
+def cached_result(row, version=None):
+    """Cached result for one 6-value row, or None; a miss is counted when the row is then scored."""
+    return prediction_cache.get(prediction_cache.key(row, version or cache_version()), count_miss=False)
+
+
+def predict_cached(rows):
+    """``predict_rows`` through the prediction cache; all misses are scored in one call."""
+    X = to_matrix(rows)
+    version = cache_version()
+    keys = [prediction_cache.key(x, version) for x in X]
+    results = [prediction_cache.get(key) for key in keys]
+    missing = [i for i, result in enumerate(results) if result is None]
+    if missing:
+        # score the normalized vectors, so a key always maps to the same answer
+        X_missing = np.asarray([key[1] for key in (keys[i] for i in missing)], dtype=float)
+        labels, proba = predict_proba(X_missing)
+        for i, result in zip(missing, describe(X_missing, labels, proba)):
+            results[i] = prediction_cache.put(keys[i], result)
+    return results
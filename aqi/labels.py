@@ -0,0 +1,89 @@
+"""Category lookups shared by the dashboard, batch scoring and the HTTP API.
+
+Nothing here imports Streamlit, so it can be used from headless workers.
+"""
+import numpy as np
+
+from aqi.features import FEATURES
+
+# 🟨 AQI Emoji Map
+emoji_map = {
+    "Good": "🟢",
+    "Satisfactory": "🟡",
+    "Moderate": "🟠",
+    "Poor": "🔴",
+    "Very Poor": "🟣",
+    "Severe": "⚫️"
+}
+
+# CPCB AQI bands: (upper bound, category); anything above 400 is Severe
+AQI_BANDS = [(50, "Good"), (100, "Satisfactory"), (200, "Moderate"), (300, "Poor"), (400, "Very Poor")]
+
+aqi_health_tips = {
+    "Good": {
+        "impact": "Air quality is considered satisfactory, and air pollution poses little or no risk.",
+        "tip": "Enjoy your day! It’s a great time for outdoor activities. 😊"
+    },
+    "Satisfactory": {
+        "impact": "Air quality is acceptable. However, there may be a risk for some sensitive individuals.",
+        "tip": "If you have asthma or allergies, keep medications handy. 🤧"
+    },
+    "Moderate": {
+        "impact": "Air quality is okay for most, but may cause minor irritation to sensitive groups.",
+        "tip": "Avoid intense outdoor activities. Hydrate well. 💧"
+    },
+    "Poor": {
+        "impact": "Everyone may begin to experience health effects; sensitive individuals may experience serious effects.",
+        "tip": "Limit outdoor exposure. Use a mask if necessary. 😷"
+    },
+    "Very Poor": {
+        "impact": "Health warnings of emergency conditions. Serious effects on everyone's health.",
+        "tip": "Avoid going out. Stay indoors with air filters. ❌🌫️"
+    },
+    "Severe": {
+        "impact": "Serious health effects even for healthy people.",
+        "tip": "Emergency! Remain indoors and avoid all physical exertion. 🚨"
+    }
+}
+
+risk_levels = {
+    "Good": "LOW",
+    "Satisfactory": "LOW",
+    "Moderate": "MEDIUM",
+    "Poor": "HIGH",
+    "Very Poor": "HIGH",
+    "Severe": "CRITICAL"
+}
+
+risk_emoji = {
+    "LOW": "🟢",
+    "MEDIUM": "🟠",
+    "HIGH": "🔴",
+    "CRITICAL": "🚨"
+}
+
+
+# 🎚️ CPCB AQI Bands
+def aqi_band(aqi):
+    """CPCB category name for each numeric AQI value."""
+    aqi = np.asarray(aqi, dtype=float)
+    names = np.array([name for _, name in AQI_BANDS] + ["Severe"])
+    return names[np.searchsorted([upper for upper, _ in AQI_BANDS], aqi, side="left")]
+
+
+# 🚦 Risk Badge Generator
+def get_risk_badge(aqi_category, inputs):
+    main_pollutant = max(inputs, key=inputs.get)
+    risk = risk_levels.get(aqi_category, "UNKNOWN")
+    emoji = risk_emoji.get(risk, "❓")
+    return main_pollutant, risk, emoji
+
+
+def risk_badges(categories, X):
+    """Vectorized ``get_risk_badge`` over a label array and an (n, 6) reading matrix."""
+    main_pollutants = np.asarray(FEATURES, dtype=object)[np.argmax(np.asarray(X), axis=1)]
+    # only a handful of distinct categories -> look each up once, then broadcast
+    unique, inverse = np.unique(np.asarray(categories, dtype=str), return_inverse=True)
+    risks = np.array([risk_levels.get(c, "UNKNOWN") for c in unique], dtype=object)
+    emojis = np.array([risk_emoji.get(r, "❓") for r in risks], dtype=object)
+    return main_pollutants, risks[inverse], emojis[inverse]
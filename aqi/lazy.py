@@ -0,0 +1,64 @@
+"""Deferred imports for heavy optional dependencies, plus import-time reporting.
+
+``lazy_import("shap")`` imports on first use and records how long that took,
+so the dashboard only pays for SHAP/matplotlib/pandas/gspread on the code
+paths that need them.  ``importtime_breakdown`` runs a fresh interpreter
+with ``-X importtime`` for a per-module view of cold-start cost.
+"""
+import importlib
+import subprocess
+import sys
+import time
+
+_import_times = {}
+
+
+def lazy_import(name):
+    """Return module ``name``, importing it (and timing the import) on first use."""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    t0 = time.perf_counter()
+    module = importlib.import_module(name)
+    _import_times[name] = time.perf_counter() - t0
+    return module
+
+
+def import_times():
+    """First-import durations (seconds) of modules loaded through ``lazy_import`` in this process."""
+    return dict(_import_times)
+
+
+def importtime_breakdown(modules, top=25):
+    """Import ``modules`` in a clean interpreter with ``-X importtime``.
+
+    Returns ``(total_seconds, rows)`` where rows are dicts with the module name,
+    self and cumulative microseconds, sorted by cumulative time.
+    """
+    code = "; ".join(f"import {m}" for m in modules)
+    t0 = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, timeout=300,
+    )
+    total = time.perf_counter() - t0
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        # "import time:       self [us] |  cumulative | imported package"
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            rows.append({
+                "module": name.rstrip(),
+                "depth": (len(name) - len(name.lstrip())) // 2,
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+            })
+        except ValueError:
+            continue
+    for row in rows:
+        row["module"] = row["module"].strip()
+    rows.sort(key=lambda r: r["cumulative_ms"], reverse=True)
+    return total, rows[:top]
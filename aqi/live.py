@@ -0,0 +1,377 @@
+"""Live AQI ingestion: a background poller that fills a local time-series cache.
+
+The Live dashboard only ever reads ``LiveCache`` (SQLite, WAL), so a rerun
+never touches the network.  ``IngestWorker`` polls the configured source on
+an asyncio loop with one pooled ``httpx.AsyncClient``; each poll asks only
+for readings newer than the source's stored cursor, and extra result pages
+are fetched concurrently.  Re-delivered readings are ignored by the primary
+key, so overlapping windows are harmless.
+
+Sources are pluggable: anything with a ``name``, ``client()`` and
+``async fetch(client, since)`` returning reading dicts works.
+``AQI_LIVE_SOURCE`` is ``openaq`` (default) or ``package.module:Class``.
+
+Ingestion is opt-in: the ``openaq`` source speaks the ``/v2/measurements``
+API, which OpenAQ itself has retired, so it has no default URL and nothing
+polls until ``AQI_LIVE_URL`` names a compatible service.
+
+    python -m aqi.live run                  # standalone poller (set AQI_LIVE_AUTOSTART=0 for the app)
+    python -m aqi.live once                 # a single poll, e.g. from cron
+    python -m aqi.mock_openaq &             # local stand-in for OpenAQ, then:
+    AQI_LIVE_URL=http://127.0.0.1:8765 python -m aqi.live run
+"""
+import argparse
+import asyncio
+import importlib
+import math
+import os
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+LIVE_DB = os.environ.get("AQI_LIVE_DB", "aqi_live.db")
+LIVE_SOURCE = os.environ.get("AQI_LIVE_SOURCE", "openaq")
+LIVE_URL = os.environ.get("AQI_LIVE_URL", "")  # a /v2/measurements-compatible API; unset = no polling
+LIVE_API_KEY = os.environ.get("AQI_LIVE_API_KEY", "")
+LIVE_CITY = os.environ.get("AQI_LIVE_CITY", "Delhi")
+LIVE_LOCATIONS = [loc for loc in os.environ.get("AQI_LIVE_LOCATIONS", "").split(",") if loc]
+POLL_SECONDS = float(os.environ.get("AQI_LIVE_POLL_SECONDS", "300"))
+AUTOSTART = os.environ.get("AQI_LIVE_AUTOSTART", "1") == "1"
+
+# OpenAQ parameter -> model feature
+PARAMETERS = {"pm25": "PM2.5", "pm10": "PM10", "no2": "NO2", "so2": "SO2", "co": "CO", "o3": "Ozone"}
+# unit conversions to what the model was trained on (µg/m³, CO in mg/m³), 25 °C
+CONVERSIONS = {
+    ("CO", "µg/m³"): (0.001, "mg/m³"),
+    ("CO", "ppm"): (1.145, "mg/m³"),
+    ("NO2", "ppb"): (1.88, "µg/m³"),
+    ("NO2", "ppm"): (1880.0, "µg/m³"),
+    ("SO2", "ppb"): (2.62, "µg/m³"),
+    ("SO2", "ppm"): (2620.0, "µg/m³"),
+    ("Ozone", "ppb"): (1.96, "µg/m³"),
+    ("Ozone", "ppm"): (1960.0, "µg/m³"),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS readings (
+    location TEXT NOT NULL,
+    parameter TEXT NOT NULL,
+    ts TEXT NOT NULL,
+    value REAL NOT NULL,
+    unit TEXT,
+    PRIMARY KEY (location, parameter, ts)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_readings_parameter_ts ON readings(parameter, ts);
+CREATE TABLE IF NOT EXISTS cursors (
+    source TEXT PRIMARY KEY,
+    ts TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+"""
+
+
+def utc_ts(value):
+    """ISO-8601 (any offset, or ``Z``) -> 'YYYY-MM-DD HH:MM:SS' in UTC, the format stored in the cache."""
+    dt = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def normalize(parameter, value, unit):
+    """(feature name, value, unit) in model units, or None for parameters the model doesn't use."""
+    feature = PARAMETERS.get(str(parameter).lower())
+    if feature is None or value is None:
+        return None
+    try:
+        value = float(value)
+    except (TypeError, ValueError):  # e.g. "n/a" from a station
+        return None
+    if not math.isfinite(value) or value < 0:
+        return None
+    unit = (unit or "").replace("ug/m3", "µg/m³").replace("mg/m3", "mg/m³")
+    factor, unit = CONVERSIONS.get((feature, unit), (1.0, unit))
+    return feature, value * factor, unit
+
+
+class LiveCache:
+    def __init__(self, path=LIVE_DB):
+        self.path = path
+        self._local = threading.local()
+
+    @property
+    def conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")  # the dashboard reads while the worker writes
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            conn = self._local.conn = conn
+        return conn
+
+    def cursor(self, source):
+        row = self.conn.execute("SELECT ts FROM cursors WHERE source = ?", (source,)).fetchone()
+        return row[0] if row else None
+
+    def write(self, source, readings):
+        """Insert new readings and advance ``source``'s cursor in one transaction; returns rows added."""
+        if not readings:
+            return 0
+        with self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO readings (location, parameter, ts, value, unit) VALUES (?, ?, ?, ?, ?)",
+                [(r["location"], r["parameter"], r["ts"], r["value"], r["unit"]) for r in readings],
+            )
+            added = self.conn.total_changes - before
+            self.conn.execute(
+                "INSERT INTO cursors (source, ts, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(source) DO UPDATE SET ts = MAX(ts, excluded.ts), updated_at = excluded.updated_at",
+                (source, max(r["ts"] for r in readings), utc_ts(datetime.now(timezone.utc).isoformat())),
+            )
+        return added
+
+    def latest(self, window_minutes=60):
+        """{feature: {"value", "ts", "locations"}}: mean over locations within the newest window."""
+        rows = self.conn.execute(
+            "SELECT r.parameter, AVG(r.value), MAX(r.ts), COUNT(DISTINCT r.location), MIN(r.unit) FROM readings r "
+            "JOIN (SELECT parameter, MAX(ts) AS newest FROM readings GROUP BY parameter) m "
+            "ON r.parameter = m.parameter "
+            "WHERE r.ts >= datetime(m.newest, ?) GROUP BY r.parameter",
+            (f"-{int(window_minutes)} minutes",),
+        ).fetchall()
+        return {p: {"value": v, "ts": ts, "locations": n, "unit": unit} for p, v, ts, n, unit in rows}
+
+    def series(self, hours=24):
+        """Mean value per (timestamp, feature) over the last ``hours`` of cached data, wide format."""
+        import pandas as pd
+
+        newest = self.conn.execute("SELECT MAX(ts) FROM readings").fetchone()[0]
+        if newest is None:
+            return pd.DataFrame()
+        df = pd.read_sql_query(
+            "SELECT ts, parameter, AVG(value) AS value FROM readings WHERE ts >= datetime(?, ?) "
+            "GROUP BY ts, parameter ORDER BY ts",
+            self.conn, params=[newest, f"-{int(hours)} hours"],
+        )
+        df["ts"] = pd.to_datetime(df["ts"])
+        return df.pivot_table(index="ts", columns="parameter", values="value")
+
+    def stats(self):
+        count, first, last = self.conn.execute("SELECT COUNT(*), MIN(ts), MAX(ts) FROM readings").fetchone()
+        cursors = dict(self.conn.execute("SELECT source, ts FROM cursors").fetchall())
+        return {"readings": count, "first": first, "last": last, "cursors": cursors}
+
+
+class OpenAQSource:
+    """OpenAQ ``/v2/measurements``-style API: paged JSON ``results`` with ``date.utc``."""
+
+    def __init__(self, base_url=LIVE_URL, api_key=LIVE_API_KEY, city=LIVE_CITY, locations=LIVE_LOCATIONS,
+                 page_size=1000, max_pages=20, max_connections=8, timeout=15.0):
+        if not base_url:
+            raise ValueError("set AQI_LIVE_URL to a /v2/measurements-compatible API (OpenAQ retired v2)")
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.city = city
+        self.locations = list(locations)
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.name = f"openaq:{self.base_url}:{self.city}:{','.join(self.locations)}"
+
+    def client(self):
+        import httpx
+
+        headers = {"X-API-Key": self.api_key} if self.api_key else {}
+        limits = httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections)
+        return httpx.AsyncClient(base_url=self.base_url, headers=headers, limits=limits, timeout=self.timeout)
+
+    def _params(self, since, page):
+        params = {
+            "parameter": list(PARAMETERS),
+            "limit": self.page_size,
+            "page": page,
+            "sort": "asc",
+            "order_by": "datetime",
+        }
+        if self.locations:
+            params["location_id"] = self.locations
+        elif self.city:
+            params["city"] = self.city
+        if since:
+            params["date_from"] = since.replace(" ", "T") + "Z"
+        return params
+
+    async def _page(self, client, since, page):
+        response = await client.get("/v2/measurements", params=self._params(since, page))
+        response.raise_for_status()
+        return response.json()
+
+    async def fetch(self, client, since=None):
+        """Readings at or after ``since`` (cursor format), as dicts ready for ``LiveCache.write``."""
+        first = await self._page(client, since, 1)
+        found = int(first.get("meta", {}).get("found") or 0)
+        pages = min(math.ceil(found / self.page_size), self.max_pages)
+        rest = await asyncio.gather(*(self._page(client, since, p) for p in range(2, pages + 1)))
+        readings = []
+        for body in [first, *rest]:
+            for r in body.get("results", []):
+                converted = normalize(r.get("parameter"), r.get("value"), r.get("unit"))
+                if converted is None:
+                    continue
+                feature, value, unit = converted
+                location = r.get("locationId") or r.get("location") or "unknown"
+                readings.append({"location": str(location), "parameter": feature,
+                                 "ts": utc_ts(r["date"]["utc"]), "value": value, "unit": unit})
+        return readings
+
+
+SOURCES = {"openaq": OpenAQSource}
+
+
+def configured(spec=LIVE_SOURCE, url=LIVE_URL):
+    """Whether there is anything to poll: a custom source, or ``openaq`` with ``AQI_LIVE_URL`` set."""
+    return spec != "openaq" or bool(url)
+
+
+def make_source(spec=LIVE_SOURCE):
+    """``openaq`` or ``package.module:Class`` (constructed with no arguments)."""
+    if spec in SOURCES:
+        return SOURCES[spec]()
+    module, _, attr = spec.partition(":")
+    if not attr:
+        raise ValueError(f"unknown live source {spec!r} (expected one of {', '.join(SOURCES)} or module:Class)")
+    return getattr(importlib.import_module(module), attr)()
+
+
+class IngestWorker:
+    def __init__(self, source, cache, interval=POLL_SECONDS, max_backoff=3600.0):
+        self.source = source
+        self.cache = cache
+        self.interval = interval
+        self.max_backoff = max_backoff
+        self._thread = None
+        self._stop = threading.Event()
+        self.polls = 0
+        self.fetched = 0
+        self.added = 0
+        self.errors = 0
+        self.consecutive_errors = 0
+        self.last_poll = None
+        self.last_error = None
+
+    async def poll_once(self, client):
+        since = self.cache.cursor(self.source.name)
+        readings = await self.source.fetch(client, since)
+        added = self.cache.write(self.source.name, readings)
+        self.polls += 1
+        self.fetched += len(readings)
+        self.added += added
+        self.last_poll = time.time()
+        return added
+
+    async def run(self, max_polls=None):
+        # one client (connection pool) for the worker's lifetime
+        async with self.source.client() as client:
+            while not self._stop.is_set():
+                try:
+                    await self.poll_once(client)
+                    self.consecutive_errors = 0
+                    delay = self.interval
+                except Exception as e:  # keep polling; readers keep serving the cache
+                    self.errors += 1
+                    self.consecutive_errors += 1
+                    self.last_error = f"{type(e).__name__}: {e}"
+                    delay = min(self.max_backoff, self.interval * 2 ** min(self.consecutive_errors, 10))
+                if max_polls is not None and self.polls + self.errors >= max_polls:
+                    return
+                await self._sleep(delay)
+
+    async def _sleep(self, seconds):
+        # short naps so stop() is noticed quickly without a thread blocked in Event.wait
+        deadline = time.monotonic() + seconds
+        while not self._stop.is_set() and time.monotonic() < deadline:
+            await asyncio.sleep(min(0.5, deadline - time.monotonic()))
+
+    def start(self):
+        """Run the poller on its own event loop in a daemon thread (idempotent)."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=lambda: asyncio.run(self.run()), name="aqi-live-ingest", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def stats(self):
+        return {
+            "source": self.source.name,
+            "running": self.running,
+            "interval_s": self.interval,
+            "polls": self.polls,
+            "fetched": self.fetched,
+            "added": self.added,
+            "errors": self.errors,
+            "last_poll": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.last_poll)) if self.last_poll else None,
+            "last_error": self.last_error,
+        }
+
+
+_cache = None
+_worker = None
+_lock = threading.Lock()
+
+
+def get_live_cache():
+    global _cache
+    if _cache is None:
+        with _lock:
+            if _cache is None:
+                _cache = LiveCache()
+    return _cache
+
+
+def ensure_worker():
+    """Start this process's ingestion thread once (unless ``AQI_LIVE_AUTOSTART=0`` or no source is
+    configured); returns it or None."""
+    global _worker
+    if not AUTOSTART or not configured():
+        return _worker
+    if _worker is None:
+        cache = get_live_cache()
+        with _lock:
+            if _worker is None:
+                _worker = IngestWorker(make_source(), cache).start()
+    return _worker
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Live AQI ingestion worker")
+    parser.add_argument("command", choices=["run", "once"])
+    parser.add_argument("--interval", type=float, default=POLL_SECONDS)
+    args = parser.parse_args()
+    if not configured():
+        parser.error("no live source configured: set AQI_LIVE_URL (or AQI_LIVE_SOURCE=module:Class)")
+
+    worker = IngestWorker(make_source(), get_live_cache(), interval=args.interval)
+    try:
+        asyncio.run(worker.run(max_polls=1 if args.command == "once" else None))
+    except KeyboardInterrupt:
+        pass
+    print(worker.stats())
+    return 1 if args.command == "once" and worker.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
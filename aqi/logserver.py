@@ -0,0 +1,129 @@
+"""Single writer process for prediction logs shared by several workers.
+
+With ``AQI_LOG_SERVER`` set (``aqi.serve`` does this), ``aqi.logwriter``
+ships each flushed batch to this process over a Unix socket instead of
+writing the file itself.  One process then owns the log: no ``flock``
+contention between workers, one SQLite connection doing all the inserts,
+and batches from different workers are appended in arrival order.  A batch
+is acknowledged only once it is written, so a worker that flushes and then
+reads the log sees its own rows.  Reads still go straight to the file.
+
+    python -m aqi.logserver --socket /tmp/aqi-log.sock   # uses AQI_LOG_FORMAT / AQI_LOG_PATH
+"""
+import argparse
+import os
+import signal
+import sys
+import threading
+from multiprocessing.connection import Client, Listener
+
+from aqi.logwriter import LOG_FORMAT, LOG_PATH, make_local_sink
+
+LOG_SERVER = os.environ.get("AQI_LOG_SERVER")
+# shared secret for the socket; aqi.serve generates one per deployment
+AUTH_KEY = os.environ.get("AQI_LOG_SERVER_KEY", "aqi-log").encode()
+
+
+class RemoteSink:
+    """``PredictionLogger`` sink that hands batches to the log server.
+
+    ``fmt`` / ``path`` describe the file the server writes, so readers
+    (``read_log``, ``get_log_store``) find it as if they had written it.
+    """
+
+    def __init__(self, address=LOG_SERVER, fmt=LOG_FORMAT, path=LOG_PATH, authkey=AUTH_KEY):
+        self.address = address
+        self.authkey = authkey
+        self.local = make_local_sink(fmt, path)  # never written to here, only listed/read
+        self.fmt = fmt
+        self.path = path
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _request(self, rows):
+        if self._conn is None:
+            self._conn = Client(self.address, family="AF_UNIX", authkey=self.authkey)
+        self._conn.send(rows)
+        status, detail = self._conn.recv()
+        if status != "ok":
+            raise RuntimeError(f"log server: {detail}")
+
+    def write(self, rows):
+        with self._lock:
+            try:
+                self._request(rows)
+            except (OSError, EOFError):  # server restarted -> reconnect once
+                self._conn = None
+                self._request(rows)
+
+    def files(self):
+        return self.local.files()
+
+
+class LogServer:
+    def __init__(self, address, sink, authkey=AUTH_KEY):
+        self.address = address
+        self.sink = sink
+        self.listener = Listener(address, family="AF_UNIX", authkey=authkey)
+        self._write_lock = threading.Lock()
+        self.batches = 0
+        self.rows = 0
+        self.clients = 0
+
+    def _serve(self, conn):
+        with conn:
+            while True:
+                try:
+                    rows = conn.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    with self._write_lock:
+                        self.sink.write(rows)
+                        self.batches += 1
+                        self.rows += len(rows)
+                    conn.send(("ok", len(rows)))
+                except Exception as e:  # report to the worker, keep serving
+                    conn.send(("error", f"{type(e).__name__}: {e}"))
+
+    def serve_forever(self):
+        while True:
+            try:
+                conn = self.listener.accept()
+            except OSError:  # closed
+                return
+            except Exception:  # failed handshake (wrong key); ignore the client
+                continue
+            self.clients += 1
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def close(self):
+        self.listener.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write prediction logs sent by aqi.serve workers")
+    parser.add_argument("--socket", default=LOG_SERVER, required=LOG_SERVER is None)
+    parser.add_argument("--format", default=LOG_FORMAT)
+    parser.add_argument("--path", default=LOG_PATH)
+    args = parser.parse_args()
+
+    if os.path.exists(args.socket):
+        os.unlink(args.socket)
+    server = LogServer(args.socket, make_local_sink(args.format, args.path))
+    signal.signal(signal.SIGTERM, lambda *_: server.close())
+    print(f"Writing {args.format} log {args.path} for clients of {args.socket}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        with server._write_lock:  # let a batch being written finish
+            pass
+        print(f"{server.rows:,} rows in {server.batches:,} batches from {server.clients} connections", flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
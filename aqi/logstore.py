@@ -0,0 +1,214 @@
+"""SQLite-backed prediction log with indexes and pre-aggregated counts.
+
+Rows are inserted in batches by ``SqliteSink`` (the write side used by
+``aqi.logwriter``); the same transaction bumps ``daily_counts`` so category
+totals never need a scan of ``predictions``.  ``LogStore`` is the read side:
+filtered, paginated queries served from the ``ts`` / ``(category, ts)``
+indexes, so the Admin viewer only ever pulls one page into memory.
+
+    python -m aqi.logstore import aqi_logs.csv   # migrate an old CSV log
+"""
+import argparse
+import csv
+import os
+import sqlite3
+import threading
+
+LOG_DB = os.environ.get("AQI_LOG_DB", "aqi_logs.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS predictions (
+    id INTEGER PRIMARY KEY,
+    ts TEXT NOT NULL,
+    pm25 REAL, pm10 REAL, no2 REAL, so2 REAL, co REAL, ozone REAL,
+    category TEXT,
+    main_pollutant TEXT,
+    risk TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_predictions_ts ON predictions(ts);
+CREATE INDEX IF NOT EXISTS idx_predictions_category_ts ON predictions(category, ts);
+CREATE TABLE IF NOT EXISTS daily_counts (
+    day TEXT NOT NULL,
+    category TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    PRIMARY KEY (day, category)
+) WITHOUT ROWID;
+"""
+
+# display name (as in aqi_logs.csv) -> column
+COLUMNS = {
+    "Timestamp": "ts",
+    "PM2.5": "pm25",
+    "PM10": "pm10",
+    "NO2": "no2",
+    "SO2": "so2",
+    "CO": "co",
+    "Ozone": "ozone",
+    "AQI Category": "category",
+    "Main Pollutant": "main_pollutant",
+    "Risk Level": "risk",
+}
+SELECT_COLUMNS = ", ".join(f'{col} AS "{name}"' for name, col in COLUMNS.items())
+
+
+def connect(path=LOG_DB):
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")  # readers don't block the writer
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+class SqliteSink:
+    """Batch writer used by ``aqi.logwriter.PredictionLogger``."""
+
+    def __init__(self, path=LOG_DB):
+        self.path = path
+        self._conn = None
+
+    def write(self, rows):
+        if self._conn is None:
+            self._conn = connect(self.path)
+        with self._conn:  # one transaction per batch
+            self._conn.executemany(
+                f"INSERT INTO predictions ({', '.join(COLUMNS.values())}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                rows,
+            )
+            counts = {}
+            for row in rows:
+                key = (str(row[0])[:10], row[7])
+                counts[key] = counts.get(key, 0) + 1
+            self._conn.executemany(
+                "INSERT INTO daily_counts (day, category, n) VALUES (?, ?, ?) "
+                "ON CONFLICT(day, category) DO UPDATE SET n = n + excluded.n",
+                [(day, category, n) for (day, category), n in counts.items()],
+            )
+
+    def files(self):
+        return [self.path] if os.path.exists(self.path) else []
+
+
+class LogStore:
+    def __init__(self, path=LOG_DB):
+        self.path = path
+        self._local = threading.local()
+
+    @property
+    def conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = connect(self.path)
+        return conn
+
+    @staticmethod
+    def _where(start=None, end=None, categories=None):
+        clauses, params = [], []
+        if start:
+            clauses.append("ts >= ?")
+            params.append(str(start))
+        if end:
+            clauses.append("ts < ?")
+            params.append(str(end))
+        if categories:
+            clauses.append(f"category IN ({', '.join('?' * len(categories))})")
+            params.extend(categories)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def count(self, start=None, end=None, categories=None):
+        where, params = self._where(start, end, categories)
+        return self.conn.execute(f"SELECT COUNT(*) FROM predictions{where}", params).fetchone()[0]
+
+    def page(self, page=1, page_size=50, start=None, end=None, categories=None):
+        """Newest-first rows for one page as a DataFrame (``start``/``end`` are 'YYYY-MM-DD[ HH:MM:SS]')."""
+        import pandas as pd
+
+        where, params = self._where(start, end, categories)
+        offset = max(page - 1, 0) * page_size
+        sql = f"SELECT {SELECT_COLUMNS} FROM predictions{where} ORDER BY ts DESC, id DESC LIMIT ? OFFSET ?"
+        return pd.read_sql_query(sql, self.conn, params=params + [page_size, offset])
+
+    def category_counts(self, start_day=None, end_day=None):
+        """{category: n} from the pre-aggregated daily table (days are inclusive 'YYYY-MM-DD')."""
+        clauses, params = [], []
+        if start_day:
+            clauses.append("day >= ?")
+            params.append(str(start_day))
+        if end_day:
+            clauses.append("day <= ?")
+            params.append(str(end_day))
+        where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+        rows = self.conn.execute(
+            f"SELECT category, SUM(n) FROM daily_counts{where} GROUP BY category ORDER BY 2 DESC", params
+        ).fetchall()
+        return dict(rows)
+
+    def daily_counts(self, start_day=None, end_day=None):
+        import pandas as pd
+
+        sql = "SELECT day, category, n FROM daily_counts WHERE day >= ? AND day <= ? ORDER BY day"
+        df = pd.read_sql_query(sql, self.conn, params=[str(start_day or "0000"), str(end_day or "9999")])
+        return df.pivot_table(index="day", columns="category", values="n", fill_value=0)
+
+    def daily_means(self, start_day=None, end_day=None):
+        """Rows and mean pollutant levels per day (days are inclusive 'YYYY-MM-DD'), indexed by day."""
+        import pandas as pd
+
+        means = ", ".join(f'AVG({col}) AS "{name}"' for name, col in list(COLUMNS.items())[1:7])
+        sql = (f"SELECT substr(ts, 1, 10) AS day, COUNT(*) AS rows, {means} FROM predictions "
+               "WHERE ts >= ? AND ts < date(?, '+1 day') GROUP BY day ORDER BY day")
+        params = [str(start_day or "0000-01-01"), str(end_day or "9998-12-31")]
+        return pd.read_sql_query(sql, self.conn, params=params).set_index("day")
+
+    def since(self, last_id=0, limit=None):
+        """Rows with id > ``last_id`` in insertion order, as (last id seen, DataFrame)."""
+        import pandas as pd
+
+        sql = f"SELECT id, {SELECT_COLUMNS} FROM predictions WHERE id > ? ORDER BY id"
+        params = [last_id]
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        df = pd.read_sql_query(sql, self.conn, params=params)
+        return (int(df["id"].iloc[-1]) if len(df) else last_id), df.drop(columns="id")
+
+    def time_bounds(self):
+        return self.conn.execute("SELECT MIN(ts), MAX(ts) FROM predictions").fetchone()
+
+    def to_frame(self):
+        import pandas as pd
+
+        return pd.read_sql_query(f"SELECT {SELECT_COLUMNS} FROM predictions ORDER BY id", self.conn)
+
+    def import_csv(self, csv_path, batch_size=10_000):
+        """Append rows of an ``aqi_logs.csv``-style file; returns the number imported."""
+        sink = SqliteSink(self.path)
+        total, batch = 0, []
+        with open(csv_path, newline="") as f:
+            reader = csv.reader(f)
+            next(reader, None)  # header
+            for row in reader:
+                if len(row) != len(COLUMNS):
+                    continue
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    sink.write(batch)
+                    total, batch = total + len(batch), []
+        if batch:
+            sink.write(batch)
+            total += len(batch)
+        return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prediction log store utilities")
+    sub = parser.add_subparsers(dest="command", required=True)
+    imp = sub.add_parser("import", help="import an aqi_logs.csv file")
+    imp.add_argument("csv_path")
+    imp.add_argument("--db", default=LOG_DB)
+    args = parser.parse_args()
+    if args.command == "import":
+        print(f"Imported {LogStore(args.db).import_csv(args.csv_path)} rows into {args.db}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+"""Buffered prediction logging with a single background writer thread.
+
+``log_prediction`` only builds a row and puts it on an in-memory queue; a
+daemon thread drains the queue and appends whole batches, either every
+``flush_interval`` seconds or as soon as ``batch_size`` rows are waiting.
+Writes are serialized by the thread within a process and by an exclusive
+``flock`` on ``<path>.lock`` across processes (several Streamlit workers
+can share one log).  On-disk formats (``AQI_LOG_FORMAT``):
+
+* ``sqlite`` - default; indexed ``aqi_logs.db`` with per-day category counts,
+               queried page by page through ``aqi.logstore.LogStore``;
+* ``csv``   - the classic ``aqi_logs.csv``, rotated to ``aqi_logs.<stamp>.csv``
+              once it grows past ``max_bytes``;
+* ``arrow`` - append-only Arrow IPC segments in ``aqi_logs/``, one file per
+              flush, written to a temp name and renamed so readers never see
+              a partial segment.
+
+With ``AQI_LOG_SERVER`` set, batches go to the single writer process in
+``aqi.logserver`` instead (multi-worker mode, see ``aqi.serve``); it writes
+the same formats to the same path.
+"""
+import atexit
+import contextlib
+import csv
+import glob
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+from aqi.metrics import timed
+
+try:
+    import fcntl
+except ImportError:  # Windows: the in-process writer thread is the only guard
+    fcntl = None
+
+LOG_COLUMNS = ["Timestamp", "PM2.5", "PM10", "NO2", "SO2", "CO", "Ozone", "AQI Category", "Main Pollutant", "Risk Level"]
+NUMERIC_COLUMNS = LOG_COLUMNS[1:7]
+
+LOG_FORMAT = os.environ.get("AQI_LOG_FORMAT", "sqlite")
+DEFAULT_PATHS = {"sqlite": "aqi_logs.db", "csv": "aqi_logs.csv", "arrow": "aqi_logs"}
+LOG_PATH = os.environ.get("AQI_LOG_PATH", DEFAULT_PATHS.get(LOG_FORMAT, "aqi_logs"))
+MAX_BYTES = int(os.environ.get("AQI_LOG_MAX_BYTES", str(50 * 1024 * 1024)))
+
+
+@contextlib.contextmanager
+def file_lock(path):
+    with open(path + ".lock", "a") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def make_row(inputs, aqi_category, main_pollutant, risk, timestamp=None):
+    timestamp = timestamp or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return [
+        timestamp,
+        inputs["PM2.5"],
+        inputs["PM10"],
+        inputs["NO2"],
+        inputs["SO2"],
+        inputs["CO"],
+        inputs["Ozone"],
+        aqi_category,
+        main_pollutant,
+        risk
+    ]
+
+
+class CsvSink:
+    def __init__(self, path=LOG_PATH, max_bytes=MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+
+    def _rotate(self):
+        if self.max_bytes and os.path.exists(self.path) and os.path.getsize(self.path) >= self.max_bytes:
+            root, ext = os.path.splitext(self.path)
+            # microseconds: two rotations within one second must not overwrite each other
+            os.replace(self.path, f"{root}.{datetime.now():%Y%m%d-%H%M%S-%f}{ext}")
+
+    def write(self, rows):
+        with file_lock(self.path):
+            self._rotate()
+            file_exists = os.path.exists(self.path)
+            with open(self.path, mode="a", newline="") as file:
+                writer = csv.writer(file)
+                if not file_exists:
+                    writer.writerow(LOG_COLUMNS)
+                writer.writerows(rows)
+
+    def files(self):
+        root, ext = os.path.splitext(self.path)
+        rotated = sorted(glob.glob(f"{root}.*{ext}"))
+        return rotated + ([self.path] if os.path.exists(self.path) else [])
+
+
+class ArrowSink:
+    def __init__(self, path=LOG_PATH):
+        self.path = path
+        self._seq = 0
+
+    def write(self, rows):
+        import pyarrow as pa
+
+        columns = list(zip(*rows))
+        arrays = [pa.array(columns[0], type=pa.string())]
+        arrays += [pa.array(col, type=pa.float64()) for col in columns[1:7]]
+        arrays += [pa.array(col, type=pa.string()) for col in columns[7:]]
+        table = pa.Table.from_arrays(arrays, names=LOG_COLUMNS)
+
+        os.makedirs(self.path, exist_ok=True)
+        self._seq += 1
+        name = f"segment-{time.time_ns()}-{os.getpid()}-{self._seq:06d}.arrow"
+        final = os.path.join(self.path, name)
+        tmp = final + ".tmp"
+        with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp, final)
+
+    def files(self):
+        return sorted(glob.glob(os.path.join(self.path, "segment-*.arrow")))
+
+
+def make_local_sink(fmt=LOG_FORMAT, path=LOG_PATH):
+    if fmt == "sqlite":
+        from aqi.logstore import SqliteSink
+        return SqliteSink(path)
+    if fmt == "arrow":
+        return ArrowSink(path)
+    if fmt == "csv":
+        return CsvSink(path)
+    raise ValueError(f"unknown log format {fmt!r} (expected 'sqlite', 'csv' or 'arrow')")
+
+
+def make_sink(fmt=LOG_FORMAT, path=LOG_PATH):
+    """Sink for this process: the log server's client when ``AQI_LOG_SERVER`` is set, else the file itself."""
+    from aqi.logserver import LOG_SERVER, RemoteSink
+
+    if LOG_SERVER:
+        return RemoteSink(LOG_SERVER, fmt, path)
+    return make_local_sink(fmt, path)
+
+
+class PredictionLogger:
+    def __init__(self, sink=None, batch_size=500, flush_interval=1.0, max_queue=100_000):
+        self.sink = sink or make_sink()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._flushed = threading.Condition()
+        self._flush_requested = threading.Event()  # a flush() caller is waiting: write now, don't batch
+        self.written = 0
+        self.dropped = 0
+        self.errors = 0
+        self.last_error = None
+
+    def _ensure_started(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._start_lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name="aqi-log-writer", daemon=True)
+                    self._thread.start()
+
+    def log(self, row):
+        """Queue one row; never blocks on disk. Returns False if the queue is full."""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(row)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def _drain(self, first):
+        batch = [first]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            deadline = time.monotonic() + self.flush_interval
+            # wait briefly for more rows so bursts become one write (unless flush() is waiting)
+            while (self._queue.qsize() < self.batch_size and not self._flush_requested.is_set()
+                   and time.monotonic() < deadline):
+                self._flush_requested.wait(min(0.05, self.flush_interval))
+            batch = self._drain(first)
+            self._write(batch)
+
+    def _write(self, batch):
+        try:
+            with timed("log_write"):
+                self.sink.write(batch)
+            self.written += len(batch)
+        except Exception as e:  # keep the writer alive; the rows are reported as lost
+            self.errors += 1
+            self.last_error = f"{type(e).__name__}: {e}"
+        finally:
+            with self._flushed:
+                for _ in batch:
+                    self._queue.task_done()
+                if not self._queue.unfinished_tasks:
+                    self._flush_requested.clear()
+                self._flushed.notify_all()
+
+    def flush(self, timeout=5.0):
+        """Block until everything queued so far is on disk (used at exit and by readers)."""
+        deadline = time.monotonic() + timeout
+        with self._flushed:
+            if self._queue.unfinished_tasks:
+                self._flush_requested.set()  # the writer may be holding rows for up to flush_interval
+            while self._queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._flushed.wait(remaining)
+        return True
+
+    def stats(self):
+        return {
+            "format": type(self.sink).__name__,
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "last_error": self.last_error,
+        }
+
+
+_logger = None
+_logger_lock = threading.Lock()
+
+
+def get_logger():
+    global _logger
+    if _logger is None:
+        with _logger_lock:
+            if _logger is None:
+                _logger = PredictionLogger()
+                atexit.register(_logger.flush)
+    return _logger
+
+
+@timed("log_prediction")
+def log_prediction(inputs, aqi_category, main_pollutant, risk):
+    return get_logger().log(make_row(inputs, aqi_category, main_pollutant, risk))
+
+
+def fmt_of(sink):
+    if type(sink).__name__ == "RemoteSink":
+        return sink.fmt
+    return {"SqliteSink": "sqlite", "CsvSink": "csv", "ArrowSink": "arrow"}.get(type(sink).__name__)
+
+
+def get_log_store():
+    """``LogStore`` over the active log, or None when logging to CSV/Arrow."""
+    logger = get_logger()
+    if fmt_of(logger.sink) != "sqlite":
+        return None
+    from aqi.logstore import LogStore
+    logger.flush(timeout=1.0)
+    return LogStore(logger.sink.path)
+
+
+def read_log():
+    """All logged rows (rotated files / segments included) as a DataFrame, or None if nothing was logged."""
+    import pandas as pd
+
+    logger = get_logger()
+    logger.flush(timeout=1.0)
+    files = logger.sink.files()
+    if not files:
+        return None
+    if fmt_of(logger.sink) == "sqlite":
+        from aqi.logstore import LogStore
+        return LogStore(logger.sink.path).to_frame()
+    if fmt_of(logger.sink) == "arrow":
+        import pyarrow as pa
+
+        tables = [pa.ipc.open_file(pa.memory_map(f)).read_all() for f in files]
+        return pa.concat_tables(tables).to_pandas()
+    return pd.concat([pd.read_csv(f) for f in files], ignore_index=True)
@@ -0,0 +1,202 @@
+"""In-process stage timings, exportable as Prometheus text or JSON.
+
+Wrap a stage with ``timed("predict")`` (context manager or decorator); each
+stage keeps a fixed-bucket latency histogram plus a window of recent samples
+for percentiles.  Recording costs two ``perf_counter`` calls and a short
+locked update, so it stays on in production (``AQI_METRICS=0`` turns it off).
+Histograms are per process; with several workers, scrape each one.
+
+``SamplingProfiler`` is the opt-in part: a daemon thread that snapshots every
+other thread's stack every few milliseconds and counts functions, so a slow
+page can be profiled under real traffic without restarting anything.
+"""
+import contextlib
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+
+ENABLED = os.environ.get("AQI_METRICS", "1") == "1"
+# upper bounds in seconds (Prometheus "le"), 100 µs .. 10 s
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+RECENT = 1024
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS, recent=RECENT):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=recent)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        i = 0
+        while i < len(self.buckets) and seconds > self.buckets[i]:
+            i += 1
+        with self._lock:
+            self.counts[i] += 1
+            self.count += 1
+            self.sum += seconds
+            self.max = max(self.max, seconds)
+            self.recent.append(seconds)
+
+    def percentile(self, q):
+        with self._lock:
+            samples = sorted(self.recent)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "total_ms": round(self.sum * 1000, 2),
+            "mean_ms": round(self.sum / self.count * 1000, 3) if self.count else None,
+            "p50_ms": _ms(self.percentile(0.50)),
+            "p95_ms": _ms(self.percentile(0.95)),
+            "p99_ms": _ms(self.percentile(0.99)),
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 3)
+
+
+class StageTimings:
+    def __init__(self):
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, stage):
+        hist = self._stages.get(stage)
+        if hist is None:
+            with self._lock:
+                hist = self._stages.setdefault(stage, Histogram())
+        return hist
+
+    def observe(self, stage, seconds):
+        if ENABLED:
+            self.histogram(stage).observe(seconds)
+
+    def snapshot(self):
+        """{stage: summary} sorted by total time spent, largest first."""
+        items = sorted(self._stages.items(), key=lambda kv: kv[1].sum, reverse=True)
+        return {stage: hist.summary() for stage, hist in items}
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+
+    def to_prometheus(self, name="aqi_stage_duration_seconds"):
+        lines = [f"# HELP {name} Time spent per app stage.", f"# TYPE {name} histogram"]
+        for stage, hist in sorted(self._stages.items()):
+            label = stage.replace("\\", "\\\\").replace('"', '\\"')
+            cumulative = 0
+            for bound, n in zip(list(hist.buckets) + ["+Inf"], hist.counts):
+                cumulative += n
+                lines.append(f'{name}_bucket{{stage="{label}",le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_sum{{stage="{label}"}} {hist.sum:.6f}')
+            lines.append(f'{name}_count{{stage="{label}"}} {hist.count}')
+        return "\n".join(lines) + "\n"
+
+
+timings = StageTimings()
+
+
+class timed(contextlib.ContextDecorator):
+    """``with timed("shap"): ...`` or ``@timed("qr_render")``; records even if the block raises."""
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def _recreate_cm(self):
+        return timed(self.stage)  # fresh start time per decorated call (thread-safe)
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        timings.observe(self.stage, time.perf_counter() - self._start)
+        return False
+
+
+class SamplingProfiler:
+    """Statistical profiler over all threads except its own."""
+
+    def __init__(self, interval=0.005, max_depth=64):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.samples = 0
+        self.self_counts = Counter()
+        self.total_counts = Counter()
+        self.stacks = Counter()
+        self.started_at = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if not self.running:
+            self._stop.clear()
+            self.started_at = time.time()
+            self._thread = threading.Thread(target=self._run, name="aqi-sampling-profiler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(1.0)
+
+    def reset(self):
+        with self._lock:
+            self.samples = 0
+            self.self_counts.clear()
+            self.total_counts.clear()
+            self.stacks.clear()
+
+    @staticmethod
+    def _name(code):
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def _run(self):
+        me = threading.get_ident()
+        idle = {"wait", "select", "poll", "epoll", "sleep", "_wait_for_tstate_lock", "acquire"}
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == me or frame.f_code.co_name in idle:  # skip parked threads
+                    continue
+                stack = []
+                while frame is not None and len(stack) < self.max_depth:
+                    stack.append(self._name(frame.f_code))
+                    frame = frame.f_back
+                with self._lock:
+                    self.samples += 1
+                    self.self_counts[stack[0]] += 1
+                    self.total_counts.update(set(stack))
+                    self.stacks[";".join(reversed(stack))] += 1
+
+    def top(self, n=25):
+        """[(function, self %, total %)] by self samples."""
+        with self._lock:
+            samples = self.samples or 1
+            return [(fn, round(100 * c / samples, 1), round(100 * self.total_counts[fn] / samples, 1))
+                    for fn, c in self.self_counts.most_common(n)]
+
+    def collapsed(self):
+        """Stacks in "a;b;c count" form for flamegraph.pl / speedscope."""
+        with self._lock:
+            return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+
+profiler = SamplingProfiler()
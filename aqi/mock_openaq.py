@@ -0,0 +1,122 @@
+"""Local stand-in for the OpenAQ measurements API, for developing and testing ``aqi.live``.
+
+Serves ``GET /v2/measurements`` with the same paging, ``date_from`` and
+``parameter`` / ``location_id`` filters the poller uses.  Readings are
+deterministic hourly values for a few fake Delhi stations; the clock runs
+``--speed`` simulated hours per real hour, so new readings keep appearing
+and incremental polls can be observed.  ``GET /stats`` reports how many
+requests and rows were served.
+
+    python -m aqi.mock_openaq --port 8765 --speed 720   # one new hour every 5 s
+"""
+import argparse
+import math
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+# typical Delhi levels in the units OpenAQ reports
+BASELINES = {"pm25": (110.0, "µg/m³"), "pm10": (200.0, "µg/m³"), "no2": (45.0, "µg/m³"),
+             "so2": (12.0, "µg/m³"), "co": (1300.0, "µg/m³"), "o3": (30.0, "µg/m³")}
+STATIONS = {"8118": "Anand Vihar", "8172": "ITO", "8235": "R K Puram", "8915": "Punjabi Bagh"}
+
+
+class MockClock:
+    def __init__(self, history_hours=48, speed=1.0, now=None):
+        self.speed = speed
+        self.started = time.monotonic()
+        start = now or datetime.now(timezone.utc)
+        self.origin = start.replace(minute=0, second=0, microsecond=0) - timedelta(hours=history_hours)
+        self.history_hours = history_hours
+
+    def newest_hour(self):
+        elapsed_hours = (time.monotonic() - self.started) * self.speed / 3600
+        return self.origin + timedelta(hours=self.history_hours + int(elapsed_hours))
+
+
+def reading(station, parameter, hour):
+    base, unit = BASELINES[parameter]
+    # daily cycle + per-station offset + deterministic noise
+    cycle = 1 + 0.35 * math.sin(2 * math.pi * (hour.hour - 8) / 24)
+    noise = (zlib.crc32(f"{station}{parameter}{hour:%Y%m%d%H}".encode()) % 1000) / 1000 - 0.5
+    value = round(base * cycle * (1 + 0.2 * noise) * (0.85 + 0.1 * (int(station) % 4)), 2)
+    return {
+        "locationId": int(station),
+        "location": STATIONS[station],
+        "parameter": parameter,
+        "value": value,
+        "unit": unit,
+        "date": {"utc": hour.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                 "local": (hour + timedelta(hours=5, minutes=30)).strftime("%Y-%m-%dT%H:%M:%S+05:30")},
+        "country": "IN",
+        "city": "Delhi",
+    }
+
+
+def create_app(history_hours=48, speed=1.0, latency_ms=0.0):
+    clock = MockClock(history_hours, speed)
+    stats = {"requests": 0, "rows": 0, "date_from": []}
+
+    async def measurements(request):
+        import asyncio
+
+        stats["requests"] += 1
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        q = request.query_params
+        parameters = [p for p in (q.getlist("parameter") or BASELINES) if p in BASELINES]
+        stations = [s for s in (q.getlist("location_id") or STATIONS) if s in STATIONS]
+        limit = min(int(q.get("limit", 100)), 10_000)
+        page = max(int(q.get("page", 1)), 1)
+        newest = clock.newest_hour()
+        hour = clock.origin
+        if q.get("date_from"):
+            stats["date_from"].append(q["date_from"])
+            since = datetime.fromisoformat(q["date_from"].replace("Z", "+00:00"))
+            since = since if since.tzinfo else since.replace(tzinfo=timezone.utc)
+            hour = max(hour, since.replace(minute=0, second=0, microsecond=0))
+            if hour < since:
+                hour += timedelta(hours=1)
+        hours = max(int((newest - hour) / timedelta(hours=1)) + 1, 0)
+        found = hours * len(stations) * len(parameters)
+
+        # rows ordered by (datetime, station, parameter); only the requested page is built
+        per_hour = len(stations) * len(parameters)
+        results = []
+        for i in range((page - 1) * limit, min(page * limit, found)):
+            h, rest = divmod(i, per_hour)
+            s, p = divmod(rest, len(parameters))
+            results.append(reading(stations[s], parameters[p], hour + timedelta(hours=h)))
+        stats["rows"] += len(results)
+        return JSONResponse({"meta": {"name": "openaq-mock", "page": page, "limit": limit, "found": found},
+                             "results": results})
+
+    async def get_stats(request):
+        return JSONResponse({**stats, "date_from": stats["date_from"][-10:],
+                             "newest": clock.newest_hour().strftime("%Y-%m-%dT%H:%M:%SZ")})
+
+    app = Starlette(routes=[Route("/v2/measurements", measurements), Route("/stats", get_stats)])
+    app.state.stats = stats
+    app.state.clock = clock
+    return app
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Mock OpenAQ measurements API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--history-hours", type=int, default=48)
+    parser.add_argument("--speed", type=float, default=1.0, help="simulated hours per real hour")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.history_hours, args.speed, args.latency_ms), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
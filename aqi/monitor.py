@@ -0,0 +1,338 @@
+"""Incremental drift monitoring of the prediction log against the training data.
+
+A baseline is computed once per ``final_datasett.csv`` version.  It holds the
+mean, std and quantiles of each pollutant, decile bin edges with their shares
+(for PSI), a sorted sample for KS, and the CPCB category mix.  ``Monitor``
+keeps streaming statistics for the logged predictions: a count, Welford
+mean/variance, min/max, a t-digest for quantiles, counts in the baseline's
+bins, and category counts.  ``update()`` only reads rows whose id is above
+the last one seen (``LogStore.since``), so a refresh costs time proportional
+to the new traffic, not to the size of the log.  The state is saved next to
+the log database, so a restart resumes where it stopped.
+
+Drift is reported per feature as PSI and a KS distance, plus PSI on the
+category mix.  Statuses are ok / warn / alert; the thresholds are below.
+"""
+import json
+import math
+import os
+import threading
+import time
+
+import numpy as np
+
+from aqi.features import FEATURES
+
+PSI_WARN, PSI_ALERT = 0.1, 0.25
+KS_WARN, KS_ALERT = 0.1, 0.2
+MIN_ROWS = int(os.environ.get("AQI_MONITOR_MIN_ROWS", "100"))  # no alerts on a handful of rows
+BATCH_ROWS = int(os.environ.get("AQI_MONITOR_BATCH_ROWS", "50000"))
+COMPRESSION = 100
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+EPS = 1e-4  # keeps PSI finite when a bin is empty on one side
+
+
+class TDigest:
+    """Merging t-digest (k1 scale function); batches are merged vectorized."""
+
+    def __init__(self, compression=COMPRESSION, means=(), weights=()):
+        self.compression = compression
+        self.means = np.asarray(means, dtype=float)
+        self.weights = np.asarray(weights, dtype=float)
+
+    @property
+    def count(self):
+        return float(self.weights.sum())
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[np.isfinite(values)]
+        if not len(values):
+            return self
+        means = np.concatenate([self.means, values])
+        weights = np.concatenate([self.weights, np.ones(len(values))])
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        q_left = (np.cumsum(weights) - weights) / total
+        # k1(q) = delta / (2 pi) * asin(2q - 1): every centroid spans at most one unit of k
+        k = self.compression / (2 * math.pi) * np.arcsin(np.clip(2 * q_left - 1, -1, 1))
+        cluster = np.floor(k - k[0]).astype(np.int64)
+        _, cluster = np.unique(cluster, return_inverse=True)
+        merged_w = np.bincount(cluster, weights=weights)
+        self.means = np.bincount(cluster, weights=means * weights) / merged_w
+        self.weights = merged_w
+        return self
+
+    def quantile(self, q):
+        if not len(self.means):
+            return None
+        centers = np.cumsum(self.weights) - self.weights / 2
+        return float(np.interp(q * self.weights.sum(), centers, self.means))
+
+    def cdf(self, x):
+        if not len(self.means):
+            return np.zeros_like(np.asarray(x, dtype=float))
+        centers = (np.cumsum(self.weights) - self.weights / 2) / self.weights.sum()
+        return np.interp(x, self.means, centers, left=0.0, right=1.0)
+
+    def to_dict(self):
+        return {"compression": self.compression, "means": self.means.tolist(), "weights": self.weights.tolist()}
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d["compression"], d["means"], d["weights"])
+
+
+class FeatureStats:
+    """Count, mean/variance (Chan's parallel update), min/max, t-digest, PSI bin counts."""
+
+    def __init__(self, edges, state=None):
+        self.edges = np.asarray(edges, dtype=float)
+        state = state or {}
+        self.count = state.get("count", 0)
+        self.mean = state.get("mean", 0.0)
+        self.m2 = state.get("m2", 0.0)
+        self.min = state.get("min", math.inf)
+        self.max = state.get("max", -math.inf)
+        self.bins = np.asarray(state.get("bins", np.zeros(len(self.edges) + 1)), dtype=np.int64)
+        self.digest = TDigest.from_dict(state["digest"]) if "digest" in state else TDigest()
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[np.isfinite(values)]
+        n = len(values)
+        if not n:
+            return
+        mean, m2 = values.mean(), ((values - values.mean()) ** 2).sum()
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta ** 2 * self.count * n / total
+        self.count = total
+        self.min, self.max = min(self.min, float(values.min())), max(self.max, float(values.max()))
+        self.bins += np.bincount(np.searchsorted(self.edges, values, side="right"), minlength=len(self.bins))
+        self.digest.update(values)
+
+    @property
+    def std(self):
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    def to_dict(self):
+        return {"count": self.count, "mean": self.mean, "m2": self.m2, "min": self.min, "max": self.max,
+                "bins": self.bins.tolist(), "digest": self.digest.to_dict()}
+
+
+def psi(expected, actual):
+    """Population stability index of two count (or share) vectors over the same bins."""
+    e = np.asarray(expected, dtype=float)
+    a = np.asarray(actual, dtype=float)
+    e = np.clip(e / e.sum(), EPS, None)
+    a = np.clip(a / a.sum(), EPS, None)
+    return float(((a - e) * np.log(a / e)).sum())
+
+
+def status(value, warn, alert):
+    if value is None:
+        return "n/a"
+    return "alert" if value >= alert else "warn" if value >= warn else "ok"
+
+
+def data_file_path(data_file=None):
+    from aqi.registry import BASE_DIR
+
+    return data_file or os.path.join(BASE_DIR, "final_datasett.csv")
+
+
+def data_version(data_file=None):
+    """``name:size:mtime_ns`` of the training data; a baseline is valid for one version."""
+    data_file = data_file_path(data_file)
+    st = os.stat(data_file)
+    return f"{os.path.basename(data_file)}:{st.st_size}:{st.st_mtime_ns}"
+
+
+def build_baseline(data_file=None, sample_size=10_000):
+    """Reference statistics of the training data (computed once per data version)."""
+    from aqi.dataset import load_frame
+    from aqi.history import CATEGORIES
+    from aqi.labels import aqi_band
+
+    data_file = data_file_path(data_file)
+    version = data_version(data_file)  # before reading, so an edit mid-build gets a fresh baseline next time
+    frame = load_frame(data_file, columns=FEATURES + ["AQI"])
+    features = {}
+    for name in FEATURES:
+        values = frame[name].dropna().to_numpy(dtype=float)
+        edges = np.unique(np.quantile(values, np.linspace(0.1, 0.9, 9)))
+        bins = np.bincount(np.searchsorted(edges, values, side="right"), minlength=len(edges) + 1)
+        sample = np.quantile(values, np.linspace(0, 1, min(sample_size, len(values))))
+        features[name] = {
+            "count": int(len(values)), "mean": float(values.mean()), "std": float(values.std(ddof=1)),
+            "min": float(values.min()), "max": float(values.max()),
+            "quantiles": {str(q): float(np.quantile(values, q)) for q in QUANTILES},
+            "edges": edges.tolist(), "bins": bins.tolist(), "sample": sample.tolist(),
+        }
+    labels = aqi_band(frame["AQI"].dropna().to_numpy())
+    categories = {c: int((labels == c).sum()) for c in CATEGORIES}
+    return {"version": version, "features": features, "categories": categories}
+
+
+class Monitor:
+    def __init__(self, store, baseline, state_path=None):
+        self.store = store
+        self.baseline = baseline
+        self.state_path = state_path
+        self._lock = threading.Lock()
+        self.reset()
+        if state_path and os.path.exists(state_path):
+            self._load()
+
+    def reset(self):
+        self.last_id = 0
+        self.updated_at = None
+        self.features = {name: FeatureStats(self.baseline["features"][name]["edges"]) for name in FEATURES}
+        self.categories = dict.fromkeys(self.baseline["categories"], 0)
+
+    def _load(self):
+        try:
+            with open(self.state_path) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return
+        if state.get("baseline") != self.baseline["version"]:
+            return  # different training data -> different bins; start over
+        self.last_id = state["last_id"]
+        self.updated_at = state.get("updated_at")
+        self.features = {name: FeatureStats(self.baseline["features"][name]["edges"], state["features"][name])
+                         for name in FEATURES}
+        self.categories.update(state["categories"])
+
+    def _save(self):
+        if not self.state_path:
+            return
+        state = {"baseline": self.baseline["version"], "last_id": self.last_id, "updated_at": self.updated_at,
+                 "features": {name: s.to_dict() for name, s in self.features.items()},
+                 "categories": self.categories}
+        tmp = f"{self.state_path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp, self.state_path)
+
+    def update(self):
+        """Fold in log rows added since the last update; returns how many were read."""
+        with self._lock:
+            max_id = self.store.conn.execute("SELECT MAX(id) FROM predictions").fetchone()[0] or 0
+            if max_id < self.last_id:  # log was replaced or truncated
+                self.reset()
+            new = 0
+            while True:
+                last_id, df = self.store.since(self.last_id, limit=BATCH_ROWS)
+                if df.empty:
+                    break
+                for name in FEATURES:
+                    self.features[name].update(df[name].to_numpy(dtype=float))
+                for category, n in df["AQI Category"].value_counts().items():
+                    self.categories[category] = self.categories.get(category, 0) + int(n)
+                self.last_id = last_id
+                new += len(df)
+            self.updated_at = time.strftime("%Y-%m-%d %H:%M:%S")
+            if new:
+                self._save()
+            return new
+
+    def feature_report(self):
+        rows = []
+        for name in FEATURES:
+            base, live = self.baseline["features"][name], self.features[name]
+            enough = live.count >= MIN_ROWS
+            p = psi(base["bins"], live.bins) if live.count else None
+            sample = np.asarray(base["sample"])
+            ks = float(np.abs(live.digest.cdf(sample) - np.linspace(0, 1, len(sample))).max()) if live.count else None
+            worst = max(status(p, PSI_WARN, PSI_ALERT), status(ks, KS_WARN, KS_ALERT),
+                        key=["n/a", "ok", "warn", "alert"].index)
+            rows.append({
+                "feature": name,
+                "rows": live.count,
+                "mean": round(live.mean, 2) if live.count else None,
+                "baseline_mean": round(base["mean"], 2),
+                "std": round(live.std, 2) if live.count else None,
+                "baseline_std": round(base["std"], 2),
+                "p50": _round(live.digest.quantile(0.5)),
+                "baseline_p50": round(base["quantiles"]["0.5"], 2),
+                "p95": _round(live.digest.quantile(0.95)),
+                "baseline_p95": round(base["quantiles"]["0.95"], 2),
+                "max": _round(live.max) if live.count else None,
+                "baseline_max": round(base["max"], 2),
+                "psi": _round(p, 4),
+                "ks": _round(ks, 4),
+                "status": worst if enough else "n/a",
+            })
+        return rows
+
+    def category_report(self):
+        names = list(self.baseline["categories"])
+        base = np.array([self.baseline["categories"][c] for c in names], dtype=float)
+        live = np.array([self.categories.get(c, 0) for c in names], dtype=float)
+        total = live.sum()
+        p = psi(base, live) if total else None
+        return {
+            "psi": _round(p, 4),
+            "status": status(p, PSI_WARN, PSI_ALERT) if total >= MIN_ROWS else "n/a",
+            "shares": [{"category": c, "log": round(l / total, 4) if total else 0.0, "baseline": round(b / base.sum(), 4)}
+                       for c, l, b in zip(names, live, base)],
+        }
+
+    def alerts(self):
+        """[(level, message)] for every feature or the category mix past a threshold."""
+        out = []
+        for row in self.feature_report():
+            if row["status"] in ("warn", "alert"):
+                out.append((row["status"], f"{row['feature']}: PSI {row['psi']}, KS {row['ks']} "
+                                           f"(log median {row['p50']} vs {row['baseline_p50']} in training data)"))
+        cats = self.category_report()
+        if cats["status"] in ("warn", "alert"):
+            out.append((cats["status"], f"Predicted category mix: PSI {cats['psi']} vs training labels"))
+        return out
+
+    def stats(self):
+        return {"last_id": self.last_id, "rows": self.features[FEATURES[0]].count, "updated_at": self.updated_at,
+                "baseline": self.baseline["version"], "state_file": self.state_path}
+
+
+def _round(value, digits=2):
+    return None if value is None else round(value, digits)
+
+
+_baseline = None
+_monitor = None
+_lock = threading.Lock()
+_baseline_lock = threading.Lock()
+
+
+def get_baseline(data_file=None):
+    """Baseline of the current training data, rebuilt only when the file's size or mtime changes."""
+    global _baseline
+    version = data_version(data_file)
+    baseline = _baseline
+    if baseline is None or baseline["version"] != version:
+        with _baseline_lock:
+            if _baseline is None or _baseline["version"] != version:
+                _baseline = build_baseline(data_file)
+            baseline = _baseline
+    return baseline
+
+
+def get_monitor():
+    """Monitor over the active SQLite log, or None when logging to CSV/Arrow."""
+    global _monitor
+    from aqi.logwriter import get_log_store
+
+    store = get_log_store()
+    if store is None:
+        return None
+    baseline = get_baseline()
+    with _lock:
+        if _monitor is None or _monitor.store.path != store.path or _monitor.baseline is not baseline:
+            # a new data version has new bins: saved state for the old one is discarded by _load
+            _monitor = Monitor(store, baseline, state_path=f"{store.path}.monitor.json")
+    return _monitor
@@ -0,0 +1,86 @@
+"""Process-wide LRU/TTL cache of prediction results.
+
+Keys are the 6-feature vector (optionally rounded to ``AQI_PREDICT_CACHE_DECIMALS``)
+plus the model version, so a hot-reloaded model never serves old answers.
+Values are the result dicts from ``aqi.inference.describe`` (label,
+probabilities, health tips, risk badge); callers must treat them as read-only.
+Presets and default inputs make most dashboard predictions repeats, and those
+are answered without touching the model.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+MAX_ENTRIES = int(os.environ.get("AQI_PREDICT_CACHE_SIZE", "10000"))
+TTL_SECONDS = float(os.environ.get("AQI_PREDICT_CACHE_TTL", "3600"))
+_decimals = os.environ.get("AQI_PREDICT_CACHE_DECIMALS", "")
+DECIMALS = int(_decimals) if _decimals else None
+
+
+class PredictionCache:
+    def __init__(self, max_entries=MAX_ENTRIES, ttl=TTL_SECONDS, decimals=DECIMALS, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.decimals = decimals
+        self._clock = clock
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+    def normalize(self, values):
+        """The vector the key (and the prediction) is based on."""
+        values = [float(v) for v in values]
+        return [round(v, self.decimals) for v in values] if self.decimals is not None else values
+
+    def key(self, values, version):
+        return (version, tuple(self.normalize(values)))
+
+    def get(self, key, count_miss=True):
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None:
+                stored_at, result = item
+                if self.ttl and self._clock() - stored_at > self.ttl:
+                    del self._items[key]
+                    self.expired += 1
+                else:
+                    self._items.move_to_end(key)
+                    self.hits += 1
+                    return result
+            if count_miss:
+                self.misses += 1
+            return None
+
+    def put(self, key, result):
+        with self._lock:
+            self._items[key] = (self._clock(), result)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+                self.evictions += 1
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._items),
+            "max_entries": self.max_entries,
+            "ttl_s": self.ttl,
+            "decimals": self.decimals,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "expired": self.expired,
+            "evictions": self.evictions,
+        }
+
+
+prediction_cache = PredictionCache()
@@ -0,0 +1,186 @@
+"""Process-wide registry for the joblib artifacts used by the dashboard.
+
+Streamlit re-executes ``app.py`` on every widget change, but imported modules
+stay alive for the whole server process.  Keeping the loaded objects here means
+the random forest is deserialized once per process and shared by every session.
+Each ``get`` does a cheap ``os.stat``; only when mtime/size change is the file
+hashed, and only when the hash changes is it loaded again (hot reload).
+``version`` answers the hash alone, so processes that serve predictions from
+the shared forest (``AQI_SHARED_FOREST``) never deserialize the model.
+"""
+import hashlib
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+
+import joblib
+
+from aqi.metrics import timings
+
+BASE_DIR = os.environ.get(
+    "AQI_ARTIFACT_DIR", os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+MODEL_FILE = "aqi_rf_model.joblib"
+ENCODER_FILE = "label_encoder.joblib"
+REGRESSOR_FILE = "aqi_rf_regressor.joblib"  # optional: numeric AQI, built by aqi.train
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@dataclass
+class Artifact:
+    name: str
+    path: str
+    obj: object
+    sha256: str
+    mtime_ns: int
+    size_bytes: int
+    load_seconds: float
+    memory_bytes: int
+    loaded_at: float = field(default_factory=time.time)
+    loads: int = 1
+
+    @property
+    def version(self):
+        return self.sha256[:12]
+
+    def as_dict(self):
+        return {
+            "name": self.name,
+            "version": self.version,
+            "file_size_kb": round(self.size_bytes / 1024, 1),
+            "memory_kb": round(self.memory_bytes / 1024, 1),
+            "load_ms": round(self.load_seconds * 1000, 2),
+            "loaded_at": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.loaded_at)),
+            "loads": self.loads,
+        }
+
+
+def deep_sizeof(obj, _seen=None):
+    """Approximate resident bytes of ``obj``: numpy buffers plus the containers holding them.
+
+    sklearn trees are Cython objects, so we follow ``__getstate__`` as pickle would.
+    """
+    if _seen is None:
+        _seen = {}
+    if id(obj) in _seen:
+        return 0
+    _seen[id(obj)] = obj  # keep temporaries (e.g. __getstate__ dicts) alive so ids aren't reused
+
+    nbytes = getattr(obj, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+    size = sys.getsizeof(obj, 0)
+    if isinstance(obj, (str, bytes, int, float, bool, type(None))):
+        return size
+    if isinstance(obj, dict):
+        return size + sum(deep_sizeof(k, _seen) + deep_sizeof(v, _seen) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return size + sum(deep_sizeof(v, _seen) for v in obj)
+    if hasattr(obj, "__dict__"):
+        return size + deep_sizeof(vars(obj), _seen)
+    if hasattr(obj, "__getstate__"):
+        try:
+            return size + deep_sizeof(obj.__getstate__(), _seen)
+        except TypeError:
+            pass
+    return size
+
+
+def _load_measured(path):
+    """joblib.load ``path`` and return (obj, seconds, approximate bytes held)."""
+    t0 = time.perf_counter()
+    obj = joblib.load(path)
+    elapsed = time.perf_counter() - t0
+    timings.observe("model_load", elapsed)
+    return obj, elapsed, deep_sizeof(obj)
+
+
+class ModelRegistry:
+    def __init__(self, base_dir=BASE_DIR):
+        self.base_dir = base_dir
+        self._artifacts = {}
+        self._hashes = {}  # name -> (mtime_ns, size, sha256) for files hashed but not loaded
+        self._lock = threading.RLock()
+
+    def _path(self, name):
+        return name if os.path.isabs(name) else os.path.join(self.base_dir, name)
+
+    def get(self, name):
+        """Return the current ``Artifact`` for ``name``, (re)loading only when the file changed."""
+        path = self._path(name)
+        st = os.stat(path)
+        current = self._artifacts.get(name)
+        if current is not None and (current.mtime_ns, current.size_bytes) == (st.st_mtime_ns, st.st_size):
+            return current
+
+        with self._lock:
+            current = self._artifacts.get(name)
+            if current is not None and (current.mtime_ns, current.size_bytes) == (st.st_mtime_ns, st.st_size):
+                return current
+            sha = file_sha256(path)
+            if current is not None and current.sha256 == sha:
+                # touched but unchanged (e.g. re-copied on deploy) -> keep the loaded object
+                current.mtime_ns, current.size_bytes = st.st_mtime_ns, st.st_size
+                return current
+            obj, seconds, mem = _load_measured(path)
+            loads = current.loads + 1 if current is not None else 1
+            artifact = Artifact(name, path, obj, sha, st.st_mtime_ns, st.st_size, seconds, mem, loads=loads)
+            self._artifacts[name] = artifact
+            return artifact
+
+    def load(self, name):
+        return self.get(name).obj
+
+    def version(self, name):
+        """Short hash of ``name`` as it is on disk now, without loading it."""
+        path = self._path(name)
+        st = os.stat(path)
+        current = self._artifacts.get(name)
+        if current is not None and (current.mtime_ns, current.size_bytes) == (st.st_mtime_ns, st.st_size):
+            return current.version
+        hashed = self._hashes.get(name)
+        if hashed is None or hashed[:2] != (st.st_mtime_ns, st.st_size):
+            hashed = (st.st_mtime_ns, st.st_size, file_sha256(path))
+            self._hashes[name] = hashed
+        return hashed[2][:12]
+
+    def stats(self):
+        return [a.as_dict() for a in self._artifacts.values()]
+
+    def clear(self):
+        with self._lock:
+            self._artifacts.clear()
+            self._hashes.clear()
+
+
+# One registry per process, shared by every Streamlit session.
+registry = ModelRegistry()
+
+
+def get_model():
+    return registry.load(MODEL_FILE)
+
+
+def get_label_encoder():
+    return registry.load(ENCODER_FILE)
+
+
+def get_regressor():
+    """Numeric AQI regressor, or None when ``REGRESSOR_FILE`` isn't deployed."""
+    if not os.path.exists(registry._path(REGRESSOR_FILE)):
+        return None
+    return registry.load(REGRESSOR_FILE)
+
+
+def model_version():
+    """Short hash identifying the current model file (used as a cache key elsewhere)."""
+    return registry.version(MODEL_FILE)
@@ -0,0 +1,78 @@
+"""Process-wide LRU cache for encoded images (PNG/SVG bytes).
+
+Entries are keyed on everything that affects the output (e.g. URL, pollutant
+vector, theme) and evicted least-recently-used once the total size passes
+``max_bytes``, so repeated reruns and other sessions reuse the same bytes
+instead of re-rendering and re-encoding.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+MAX_BYTES = int(os.environ.get("AQI_RENDER_CACHE_BYTES", str(32 * 1024 * 1024)))
+
+
+class RenderCache:
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            data = self._items.get(key)
+            if data is not None:
+                self._items.move_to_end(key)
+            return data
+
+    def put(self, key, data):
+        if len(data) > self.max_bytes:
+            return data  # never cache something that would evict everything else
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self._items[key] = data
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.size -= len(evicted)
+                self.evictions += 1
+        return data
+
+    def get_or_render(self, key, render, *args, **kwargs):
+        """Return cached bytes for ``key`` or call ``render(*args, **kwargs)`` once and store the result."""
+        data = self.get(key)
+        if data is not None:
+            self.hits += 1
+            return data
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:  # concurrent sessions asking for the same image render it once
+            data = self.get(key)
+            if data is not None:
+                self.hits += 1
+                return data
+            self.misses += 1
+            data = self.put(key, render(*args, **kwargs))
+        with self._lock:
+            self._key_locks.pop(key, None)
+        return data
+
+    def stats(self):
+        return {
+            "entries": len(self._items),
+            "size_kb": round(self.size / 1024, 1),
+            "max_kb": round(self.max_bytes / 1024, 1),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+render_cache = RenderCache()
@@ -0,0 +1,285 @@
+"""Prebuilt daily share reports: static HTML/PNG bundles, content-addressed.
+
+Every day of ``final_datasett.csv`` (source ``history``) and every day with
+logged predictions (source ``log``) gets a small summary: category, AQI,
+main pollutant (highest CPCB sub-index) and mean pollutant levels.  The
+summary is hashed together with ``PUBLIC_URL`` and ``TEMPLATE_VERSION``, and
+its bundle lives in ``REPORT_DIR/<hash>/``:
+
+* ``index.html``   - the shareable page (category, tips, tweet link, images);
+* ``chart.png``    - levels vs Delhi average vs WHO limits;
+* ``qr.png``       - QR code of the page's own URL;
+* ``summary.json`` - the summary itself.
+
+A bundle whose hash exists is never rendered again, so a rebuild only costs
+the days whose data changed (usually just today's log).  Missing bundles are
+rendered by a process pool; each is written to a temporary directory and
+renamed into place.  ``REPORT_DIR/index.json`` maps ``<source>/<day>`` to a
+hash and is replaced atomically after the bundles exist.  Bundles it no
+longer lists are deleted after ``KEEP_HOURS``, so pages that still link to
+them keep working in the meantime.
+
+``REPORT_DIR`` defaults to ``static/reports`` next to ``app.py``, which
+Streamlit serves at ``app/static/reports/`` (``server.enableStaticServing``).
+Any static file server works too.  The Share page only links to bundles.
+
+    python -m aqi.reports build --workers 4        # log days + the last 30 dataset days
+    python -m aqi.reports build --history-days 0   # every dataset day
+    python -m aqi.reports watch --interval 300     # rebuild in the background (aqi.serve --reports)
+"""
+import argparse
+import hashlib
+import html
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ProcessPoolExecutor
+
+from aqi.features import FEATURES
+from aqi.labels import aqi_health_tips, emoji_map
+from aqi.registry import BASE_DIR
+
+REPORT_DIR = os.environ.get("AQI_REPORT_DIR", os.path.join(BASE_DIR, "static", "reports"))
+URL_PATH = "app/static/reports"  # where Streamlit serves REPORT_DIR, relative to the app
+PUBLIC_URL = os.environ.get("AQI_PUBLIC_URL", "https://alokdelhiairqualityml.streamlit.app/")
+HISTORY_DAYS = int(os.environ.get("AQI_REPORT_HISTORY_DAYS", "30"))
+KEEP_HOURS = float(os.environ.get("AQI_REPORT_KEEP_HOURS", "24"))
+TEMPLATE_VERSION = 1  # bump when the page or images change, so every bundle is rebuilt
+SOURCES = {"history": "Delhi daily record", "log": "Dashboard predictions"}
+
+
+def _summary(source, day, values, category, aqi=None, rows=1, category_counts=None):
+    from aqi.cpcb import compute_row
+
+    values = [float(v) for v in values]
+    cpcb_aqi, _, dominant = compute_row(values)
+    values = [None if v != v else round(v, 2) for v in values]  # NaN -> null, so the JSON stays strict
+    return {
+        "source": source,
+        "day": day,
+        "category": category,
+        "aqi": int(aqi) if aqi is not None else cpcb_aqi,
+        "main_pollutant": dominant,
+        "values": dict(zip(FEATURES, values)),
+        "rows": int(rows),
+        "category_counts": category_counts,
+    }
+
+
+def history_summaries(days=HISTORY_DAYS):
+    """One summary per dataset day (the last ``days`` of them, all if 0)."""
+    from aqi.history import get_history
+
+    frame = get_history().frame
+    frame = frame.iloc[-days:] if days else frame
+    return [_summary("history", f"{date:%Y-%m-%d}", row[FEATURES], str(row["Category"]), aqi=row["AQI"])
+            for date, row in frame.iterrows()]
+
+
+def log_summaries():
+    """One summary per day of the prediction log; the category is the day's most frequent prediction."""
+    from aqi.logwriter import get_log_store, read_log
+
+    store = get_log_store()
+    if store is not None:
+        means, counts = store.daily_means(), store.daily_counts()
+    else:  # CSV / Arrow logs: group the whole log in memory
+        df = read_log()
+        if df is None or df.empty:
+            return []
+        df["day"] = df["Timestamp"].astype(str).str[:10]
+        grouped = df.groupby("day")
+        means = grouped[FEATURES].mean().assign(rows=grouped.size())
+        counts = df.pivot_table(index="day", columns="AQI Category", values="PM2.5", aggfunc="size", fill_value=0)
+    summaries = []
+    for day, row in means.iterrows():
+        day_counts = {str(c): int(n) for c, n in counts.loc[day].items() if n} if day in counts.index else {}
+        if not day_counts:
+            continue
+        category = max(day_counts, key=day_counts.get)
+        summaries.append(_summary("log", str(day), row[FEATURES], category, rows=row["rows"],
+                                  category_counts=day_counts))
+    return summaries
+
+
+def report_key(summary, public_url=PUBLIC_URL):
+    payload = json.dumps({"summary": summary, "template": TEMPLATE_VERSION, "url": public_url}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def report_url(key, base=PUBLIC_URL):
+    """URL of a bundle's page under ``base`` (pass "" for a link relative to the app)."""
+    path = f"{URL_PATH}/{key}/index.html"
+    return f"{base.rstrip('/')}/{path}" if base else path
+
+
+def render_html(summary, key, public_url=PUBLIC_URL):
+    category = summary["category"]
+    emoji = emoji_map.get(category, "")
+    tips = aqi_health_tips.get(category, {})
+    title = f"Delhi air quality on {summary['day']}: {category} {emoji}"
+    tweet = f"Delhi AQI on {summary['day']} was {category} {emoji}. {report_url(key, public_url)} #AQI #AirQuality"
+    if summary["source"] == "log":
+        counts = ", ".join(f"{c}: {n}" for c, n in sorted(summary["category_counts"].items(), key=lambda i: -i[1]))
+        basis = f"Most frequent of {summary['rows']:,} dashboard predictions ({counts})."
+    else:
+        basis = "Daily record from final_datasett.csv."
+    aqi = "n/a" if summary["aqi"] is None else summary["aqi"]
+    rows = "".join(f"<tr><td>{html.escape(name)}</td><td>{'n/a' if value is None else f'{value:g}'}</td></tr>"
+                   for name, value in summary["values"].items())
+    e = html.escape
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{e(title)}</title>
+<meta property="og:title" content="{e(title)}">
+<meta property="og:image" content="chart.png">
+<style>
+body {{ font-family: 'Segoe UI', sans-serif; max-width: 760px; margin: 2rem auto; padding: 0 1rem; color: #1F2937; }}
+img {{ max-width: 100%; }}
+table {{ border-collapse: collapse; }} td {{ padding: 2px 12px; border-bottom: 1px solid #eee; }}
+.small {{ color: #6B7280; font-size: 0.9em; }}
+</style>
+</head>
+<body>
+<h1>{e(title)}</h1>
+<p><b>AQI:</b> {aqi} &nbsp; <b>Main pollutant:</b> {e(str(summary['main_pollutant']))}</p>
+<p class="small">{e(SOURCES[summary['source']])}. {e(basis)}</p>
+<p><b>Health impact:</b> {e(tips.get('impact', ''))}<br><b>Tip:</b> {e(tips.get('tip', ''))}</p>
+<img src="chart.png" alt="Pollutant levels vs Delhi average and WHO limits">
+<table>{rows}</table>
+<p><a href="https://twitter.com/intent/tweet?text={urllib.parse.quote(tweet)}">🐦 Tweet this report</a>
+ &middot; <a href="{e(public_url)}">Open the dashboard</a></p>
+<img src="qr.png" alt="QR code for this report" width="200">
+</body>
+</html>
+"""
+
+
+def build_bundle(summary, key, out_dir=REPORT_DIR, public_url=PUBLIC_URL):
+    """Render one bundle into ``out_dir/<key>/`` (runs in a pool worker)."""
+    from aqi.charts import render_comparison_chart, render_qr_png
+
+    final = os.path.join(out_dir, key)
+    tmp = f"{final}.{os.getpid()}.tmp"
+    os.makedirs(tmp, exist_ok=True)
+    files = {
+        "chart.png": render_comparison_chart([float("nan") if v is None else v for v in summary["values"].values()]),
+        "qr.png": render_qr_png(report_url(key, public_url)),
+        "index.html": render_html(summary, key, public_url).encode(),
+        "summary.json": json.dumps(summary, indent=2).encode(),
+    }
+    for name, data in files.items():
+        with open(os.path.join(tmp, name), "wb") as f:
+            f.write(data)
+    try:
+        os.replace(tmp, final)
+    except OSError:  # another builder got there first; same content
+        shutil.rmtree(tmp, ignore_errors=True)
+    return key
+
+
+def write_index(index, out_dir=REPORT_DIR):
+    tmp = os.path.join(out_dir, f"index.{os.getpid()}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(index, f, indent=1)
+    os.replace(tmp, os.path.join(out_dir, "index.json"))
+
+
+def prune(index, out_dir=REPORT_DIR, keep_hours=KEEP_HOURS):
+    """Delete bundles not in ``index`` that are older than ``keep_hours``; returns how many."""
+    live = set(index["reports"].values())
+    cutoff = time.time() - keep_hours * 3600
+    removed = 0
+    for name in os.listdir(out_dir):
+        path = os.path.join(out_dir, name)
+        if os.path.isdir(path) and name not in live and os.path.getmtime(path) < cutoff:
+            shutil.rmtree(path, ignore_errors=True)
+            removed += 1
+    return removed
+
+
+def build(history_days=HISTORY_DAYS, include_log=True, workers=None, out_dir=REPORT_DIR, public_url=PUBLIC_URL,
+          keep_hours=KEEP_HOURS):
+    """Render the bundles that don't exist yet, then publish a new index.json; returns counts."""
+    summaries = history_summaries(history_days) + (log_summaries() if include_log else [])
+    keys = {f"{s['source']}/{s['day']}": report_key(s, public_url) for s in summaries}
+    missing = [(s, keys[f"{s['source']}/{s['day']}"]) for s in summaries
+               if not os.path.exists(os.path.join(out_dir, keys[f"{s['source']}/{s['day']}"], "index.html"))]
+    os.makedirs(out_dir, exist_ok=True)
+    if missing:
+        import multiprocessing
+
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1,
+                                 mp_context=multiprocessing.get_context("spawn")) as pool:
+            list(pool.map(build_bundle, *zip(*missing), [out_dir] * len(missing), [public_url] * len(missing)))
+
+    latest = {}
+    for s in summaries:
+        latest[s["source"]] = max(latest.get(s["source"], ""), s["day"])
+    index = {"generated_at": time.strftime("%Y-%m-%d %H:%M:%S"), "template": TEMPLATE_VERSION,
+             "latest": latest, "reports": keys}
+    write_index(index, out_dir)
+    return {"reports": len(keys), "rendered": len(missing), "pruned": prune(index, out_dir, keep_hours)}
+
+
+_index = None
+_signature = None
+_lock = threading.Lock()
+
+
+def load_index(out_dir=REPORT_DIR):
+    """Current index.json (re-read only when it changes), or None before the first build."""
+    global _index, _signature
+    path = os.path.join(out_dir, "index.json")
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    signature = (path, st.st_mtime_ns, st.st_size)
+    if _signature != signature:
+        with _lock:
+            if _signature != signature:
+                with open(path) as f:
+                    _index = json.load(f)
+                _signature = signature
+    return _index
+
+
+def latest_report(source, out_dir=REPORT_DIR):
+    """(day, key) of the newest bundle for ``source``, or None."""
+    index = load_index(out_dir)
+    day = (index or {}).get("latest", {}).get(source)
+    if not day:
+        return None
+    return day, index["reports"][f"{source}/{day}"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build static daily share reports")
+    parser.add_argument("command", choices=["build", "watch"])
+    parser.add_argument("--workers", type=int, default=None, help="render processes (default: CPU count)")
+    parser.add_argument("--history-days", type=int, default=HISTORY_DAYS, help="last N dataset days, 0 for all")
+    parser.add_argument("--no-log", action="store_true", help="skip the prediction log")
+    parser.add_argument("--out", default=REPORT_DIR)
+    parser.add_argument("--interval", type=float, default=300, help="seconds between builds (watch)")
+    args = parser.parse_args()
+
+    while True:
+        t0 = time.perf_counter()
+        result = build(args.history_days, not args.no_log, args.workers, args.out)
+        print(f"{result['reports']} reports ({result['rendered']} rendered, {result['pruned']} pruned) "
+              f"in {time.perf_counter() - t0:.1f}s -> {args.out}", flush=True)
+        if args.command == "build":
+            return 0
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,344 @@
+"""Run several dashboard or API workers behind one local port.
+
+    python -m aqi.serve --workers 4                          # Streamlit app on :7860
+    python -m aqi.serve --kind api --workers 4 --port 8000   # aqi.api
+    python -m aqi.serve --workers 4 --stats 30               # per-worker memory every 30 s
+    python -m aqi.serve --workers 4 --reports 300            # also rebuild aqi.reports every 5 min
+
+Before any worker starts, the forest is exported once into ``AQI_SHARED_FOREST``
+(a directory in /dev/shm unless set) and every worker maps it read-only (see
+``aqi.forest``), so a worker adds no copy of the model.  Prediction logs go
+through one ``aqi.logserver`` process.  Workers listen on 127.0.0.1 at the
+ports after ``--port``; a small asyncio TCP proxy on ``--port`` hands out
+connections:
+
+* app: a browser is pinned to one worker by an ``aqi_worker`` cookie set on
+  its first response, since Streamlit sessions and media files live in the
+  worker that created them;
+* api: each connection goes to the worker with the fewest open connections.
+
+With ``--reports`` an ``aqi.reports watch`` process keeps the static share
+reports current.  Workers (and the helper processes) that exit are restarted;
+Ctrl+C / SIGTERM stops all.
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import re
+import secrets
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+from aqi.registry import BASE_DIR
+
+MAX_HEAD = 64 * 1024
+COOKIE = b"aqi_worker"
+COOKIE_RE = re.compile(rb"^cookie:.*?\b" + COOKIE + rb"=(\d+)", re.IGNORECASE | re.MULTILINE)
+DEFAULT_SHARED = "/dev/shm/aqi_forest" if os.path.isdir("/dev/shm") else os.path.join(BASE_DIR, "aqi_rf_model.shared")
+
+
+def worker_command(kind, port):
+    if kind == "app":
+        return [sys.executable, "-m", "streamlit", "run", os.path.join(BASE_DIR, "app.py"),
+                "--server.port", str(port), "--server.address", "127.0.0.1", "--server.headless", "true",
+                "--server.enableCORS", "false", "--server.enableStaticServing", "true", "--browser.gatherUsageStats", "false"]
+    return [sys.executable, "-m", "uvicorn", "aqi.api:app", "--host", "127.0.0.1", "--port", str(port),
+            "--log-level", "warning"]
+
+
+def memory_mb(pid):
+    """(rss, pss, private) MB of ``pid`` from /proc, or Nones where unavailable.
+
+    PSS splits shared pages (the mapped forest, shared libraries) between the
+    processes using them, so the sum over workers is their real footprint.
+    """
+    fields = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                name, _, rest = line.partition(":")
+                if rest.strip().endswith("kB"):
+                    fields[name] = int(rest.split()[0])
+    except OSError:
+        return None, None, None
+    private = fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)
+    return tuple(round(v / 1024, 1) for v in (fields.get("Rss", 0), fields.get("Pss", 0), private))
+
+
+async def port_open(port, timeout=0.5):
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection("127.0.0.1", port), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return False
+    writer.close()
+    return True
+
+
+class Process:
+    """A supervised child process, restarted when it exits."""
+
+    def __init__(self, name, cmd, env, port=None):
+        self.name = name
+        self.cmd = cmd
+        self.env = env
+        self.port = port
+        self.proc = None
+        self.ready = False
+        self.restarts = 0
+        self.active = 0  # open proxied connections
+        self.connections = 0
+
+    def start(self):
+        self.ready = False
+        self.proc = subprocess.Popen(self.cmd, env=self.env)
+
+    @property
+    def alive(self):
+        return self.proc is not None and self.proc.poll() is None
+
+    def stop(self):
+        if self.alive:
+            self.proc.terminate()
+
+    def wait(self, timeout):
+        try:
+            self.proc.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+            self.proc.wait()
+
+
+class Balancer:
+    def __init__(self, workers, sticky):
+        self.workers = workers
+        self.sticky = sticky
+
+    def pick(self, head=b""):
+        up = [w for w in self.workers if w.ready]
+        if not up:
+            return None
+        match = COOKIE_RE.search(head)
+        if match and int(match.group(1)) < len(self.workers) and self.workers[int(match.group(1))].ready:
+            return self.workers[int(match.group(1))]
+        return min(up, key=lambda w: (w.active, w.connections))
+
+    async def handle(self, reader, writer):
+        head = await read_head(reader) if self.sticky else b""
+        worker = self.pick(head)
+        if worker is None:
+            writer.write(b"HTTP/1.1 503 Service Unavailable\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+            with contextlib.suppress(OSError):
+                await writer.drain()
+            writer.close()
+            return
+        try:
+            up_reader, up_writer = await asyncio.open_connection("127.0.0.1", worker.port)
+        except OSError:
+            worker.ready = False  # the monitor loop marks it ready again once it answers
+            writer.close()
+            return
+        # a browser without a cookie for this worker gets one on the first response
+        index = self.workers.index(worker)
+        match = COOKIE_RE.search(head)
+        pin = index if self.sticky and head and (match is None or int(match.group(1)) != index) else None
+        worker.active += 1
+        worker.connections += 1
+        try:
+            up_writer.write(head)
+            await asyncio.gather(pipe(reader, up_writer), pipe(up_reader, writer, pin))
+        finally:
+            worker.active -= 1
+            for w in (writer, up_writer):
+                w.close()
+
+
+async def read_head(reader):
+    """The request line and headers of the first request on a connection (all of it if it isn't HTTP)."""
+    try:
+        return await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as e:
+        return e.partial
+    except asyncio.LimitOverrunError:
+        return await reader.read(MAX_HEAD)
+
+
+async def pipe(reader, writer, set_cookie=None):
+    try:
+        if set_cookie is not None:
+            head = await read_head(reader)
+            end = head.find(b"\r\n\r\n")
+            if head.startswith(b"HTTP/") and end >= 0:
+                cookie = b"Set-Cookie: %s=%d; Path=/; HttpOnly; SameSite=Lax\r\n" % (COOKIE, set_cookie)
+                head = head[:end + 2] + cookie + head[end + 2:]
+            writer.write(head)
+        while data := await reader.read(MAX_HEAD):
+            writer.write(data)
+            await writer.drain()
+        if writer.can_write_eof():
+            writer.write_eof()
+    except (OSError, asyncio.IncompleteReadError):
+        pass
+
+
+class Supervisor:
+    def __init__(self, kind, n_workers, host, port, shared_dir, stats_interval=0, reports_interval=0):
+        self.kind = kind
+        self.host = host
+        self.port = port
+        self.stats_interval = stats_interval
+        self.run_dir = tempfile.mkdtemp(prefix="aqi-serve-")
+        socket_path = os.path.join(self.run_dir, "log.sock")
+        # one Streamlit cookie secret for all workers, so XSRF cookies survive being re-pinned after a restart
+        env = dict(os.environ, AQI_SHARED_FOREST=shared_dir, AQI_LOG_SERVER=socket_path,
+                   AQI_LOG_SERVER_KEY=secrets.token_hex(16), STREAMLIT_SERVER_COOKIE_SECRET=secrets.token_hex(16),
+                   PYTHONPATH=BASE_DIR)
+        self.shared_dir = shared_dir
+        self.log_server = Process("log", [sys.executable, "-m", "aqi.logserver", "--socket", socket_path], env)
+        self.socket_path = socket_path
+        # one render process: report builds shouldn't compete with the workers for every core
+        self.helpers = [self.log_server] + ([Process("reports", [
+            sys.executable, "-m", "aqi.reports", "watch", "--workers", "1", "--interval", str(reports_interval)], env)]
+            if reports_interval else [])
+        self.workers = [Process(f"{kind}-{i}", worker_command(kind, port + 1 + i), env, port=port + 1 + i)
+                        for i in range(n_workers)]
+        self.balancer = Balancer(self.workers, sticky=kind == "app")
+        self.stopping = False
+
+    def export_forest(self):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, "-m", "aqi.forest", "share", "--dir", self.shared_dir],
+                       env=self.log_server.env, check=True)
+        print(f"(exported in {time.perf_counter() - t0:.1f}s)", flush=True)
+
+    def log_server_accepts(self):
+        """True once the log server completes a handshake on its socket."""
+        from multiprocessing.connection import Client
+
+        try:
+            Client(self.socket_path, family="AF_UNIX", authkey=self.log_server.env["AQI_LOG_SERVER_KEY"].encode()).close()
+        except (OSError, EOFError):
+            return False
+        return True
+
+    def start_log_server(self):
+        # a socket left by the previous (crashed) server exists but refuses connections
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.socket_path)
+        self.log_server.start()
+        deadline = time.monotonic() + 30
+        while not self.log_server_accepts():
+            if not self.log_server.alive or time.monotonic() > deadline:
+                raise RuntimeError("aqi.logserver did not start")
+            time.sleep(0.05)
+        self.log_server.ready = True
+
+    async def monitor(self):
+        last_stats = time.monotonic()
+        while not self.stopping:
+            if not self.log_server.alive:
+                print(f"log server exited ({self.log_server.proc.returncode}); restarting", flush=True)
+                self.log_server.restarts += 1
+                await asyncio.to_thread(self.start_log_server)
+            for p in self.helpers[1:]:
+                if not p.alive:
+                    print(f"{p.name} exited ({p.proc.returncode}); restarting", flush=True)
+                    p.restarts += 1
+                    p.start()
+            for w in self.workers:
+                if not w.alive:
+                    print(f"{w.name} exited ({w.proc.returncode}); restarting", flush=True)
+                    w.restarts += 1
+                    w.start()
+                elif not w.ready and await port_open(w.port):
+                    w.ready = True
+            if self.stats_interval and time.monotonic() - last_stats >= self.stats_interval:
+                self.print_stats()
+                last_stats = time.monotonic()
+            await asyncio.sleep(0.5)
+
+    async def wait_ready(self, timeout=120):
+        deadline = time.monotonic() + timeout
+        while not all(w.ready for w in self.workers):
+            if time.monotonic() > deadline:
+                raise RuntimeError("workers not ready: " + ", ".join(w.name for w in self.workers if not w.ready))
+            await asyncio.sleep(0.25)
+
+    def print_stats(self):
+        print(f"{'process':<10} {'port':>5} {'pid':>7} {'conns':>6} {'open':>5} {'restarts':>8} "
+              f"{'rss_mb':>7} {'pss_mb':>7} {'private_mb':>10}")
+        total_pss = 0.0
+        for p in self.helpers + self.workers:
+            rss, pss, private = memory_mb(p.proc.pid) if p.alive else (None, None, None)
+            total_pss += pss or 0.0
+            print(f"{p.name:<10} {p.port or '':>5} {p.proc.pid:>7} {p.connections:>6} {p.active:>5} {p.restarts:>8} "
+                  f"{rss if rss is not None else 'n/a':>7} {pss if pss is not None else 'n/a':>7} "
+                  f"{private if private is not None else 'n/a':>10}")
+        print(f"total PSS: {total_pss:.1f} MB", flush=True)
+
+    async def run(self):
+        print(f"Exporting shared forest to {self.shared_dir}", flush=True)
+        await asyncio.to_thread(self.export_forest)
+        await asyncio.to_thread(self.start_log_server)
+        for p in self.helpers[1:] + self.workers:
+            p.start()
+        monitor = asyncio.create_task(self.monitor())
+        await self.wait_ready()
+        server = await asyncio.start_server(self.balancer.handle, self.host, self.port, limit=MAX_HEAD)
+        print(f"{len(self.workers)} {self.kind} worker(s) on ports {self.workers[0].port}-{self.workers[-1].port}, "
+              f"serving http://{self.host}:{self.port}", flush=True)
+        self.print_stats()
+
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            with contextlib.suppress(NotImplementedError):
+                loop.add_signal_handler(sig, stop.set)
+        async with server:
+            await stop.wait()
+        self.stopping = True
+        await monitor
+
+    def shutdown(self):
+        # workers first: they flush their last log rows through the log server at exit
+        for w in self.workers:
+            w.stop()
+        for w in self.workers:
+            if w.proc is not None:
+                w.wait(15)
+        for p in reversed(self.helpers):  # log server last
+            p.stop()
+        for p in reversed(self.helpers):
+            if p.proc is not None:
+                p.wait(15)
+        shutil.rmtree(self.run_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run N dashboard/API workers behind one local port")
+    parser.add_argument("--kind", choices=["app", "api"], default="app")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=None, help="default 7860 (app) / 8000 (api)")
+    parser.add_argument("--shared-dir", default=os.environ.get("AQI_SHARED_FOREST", DEFAULT_SHARED))
+    parser.add_argument("--stats", type=float, default=0, help="print per-process memory every N seconds")
+    parser.add_argument("--reports", type=float, default=0, help="rebuild the share reports every N seconds")
+    args = parser.parse_args()
+
+    port = args.port or (7860 if args.kind == "app" else 8000)
+    supervisor = Supervisor(args.kind, args.workers, args.host, port, args.shared_dir, args.stats, args.reports)
+    try:
+        asyncio.run(supervisor.run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        supervisor.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+"""Batched Google Sheets sink for prediction log rows.
+
+The authorized gspread client and the worksheet handle are created once per
+process and reused.  Rows are buffered in memory and sent with a single
+``append_rows`` call when ``batch_size`` rows are waiting or every
+``flush_interval`` seconds, from a background thread, so the page never waits
+on the network.  Quota (429) and transient 5xx/connection errors are retried
+with exponential backoff and jitter; rows from a batch that still fails stay
+buffered for the next flush (bounded by ``max_buffer``).  A batch the API
+rejects outright (a 400) would fail the same way every time, so it is moved
+to ``dead_letter`` instead of blocking the rows behind it; a 401/403 first
+gets one retry with a freshly authorized client, since expired credentials
+are the usual cause.
+
+``FakeSheetsClient`` mimics the small part of the gspread API used here so the
+sink can be exercised locally (``AQI_SHEETS_FAKE=1``) without Google access.
+"""
+import atexit
+import os
+import random
+import threading
+import time
+from collections import deque
+
+from aqi.metrics import timed
+
+SPREADSHEET = os.environ.get("AQI_SHEETS_SPREADSHEET", "Delhi_AQI_Logs")
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+AUTH_STATUS = {401, 403}  # usually expired credentials: worth one fresh authorize before giving up
+
+
+def status_code(error):
+    response = getattr(error, "response", None)
+    code = getattr(response, "status_code", None) or getattr(error, "code", None)
+    return code if isinstance(code, int) else None
+
+
+def is_retryable(error):
+    if status_code(error) in RETRYABLE_STATUS or isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    try:
+        from requests.exceptions import RequestException  # what gspread's HTTP layer raises
+    except ImportError:
+        return False
+    # network-level failures; an HTTPError carrying e.g. a 400 is not worth repeating
+    return isinstance(error, RequestException) and status_code(error) is None
+
+
+def gspread_client_factory(creds_info):
+    """Return a callable that authorizes gspread with service-account ``creds_info``."""
+    def factory():
+        from google.oauth2.service_account import Credentials
+        import gspread
+
+        scopes = ["https://www.googleapis.com/auth/spreadsheets", "https://www.googleapis.com/auth/drive"]
+        credentials = Credentials.from_service_account_info(dict(creds_info), scopes=scopes)
+        return gspread.authorize(credentials)
+    return factory
+
+
+class SheetsSink:
+    def __init__(self, client_factory, spreadsheet=SPREADSHEET, batch_size=50, flush_interval=10.0,
+                 max_retries=5, base_delay=1.0, max_delay=60.0, max_buffer=10_000, max_dead_letter=10_000,
+                 sleep=time.sleep):
+        self.client_factory = client_factory
+        self.spreadsheet = spreadsheet
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_buffer = max_buffer
+        self._sleep = sleep
+        self._client = None
+        self._worksheet = None
+        self._buffer = deque()
+        self.dead_letter = deque(maxlen=max_dead_letter)  # rows of rejected batches, newest kept
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self.sent = 0
+        self.batches = 0
+        self.retries = 0
+        self.dropped = 0
+        self.rejected = 0
+        self.reauthorizations = 0
+        self.last_error = None
+
+    def worksheet(self):
+        # one authorize + open per process; reset only after a non-retryable failure
+        if self._worksheet is None:
+            self._client = self.client_factory()
+            self._worksheet = self._client.open(self.spreadsheet).sheet1
+        return self._worksheet
+
+    def add(self, row):
+        with self._lock:
+            if len(self._buffer) >= self.max_buffer:
+                self._buffer.popleft()
+                self.dropped += 1
+            self._buffer.append(list(row))
+            full = len(self._buffer) >= self.batch_size
+        self._ensure_started()
+        if full:
+            self._wake.set()
+
+    def _ensure_started(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name="aqi-sheets-sink", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def _append_with_backoff(self, rows):
+        """"sent", "retry" (still failing after ``max_retries``) or "rejected" (not retryable)."""
+        attempt = 0
+        reauthorized = False
+        while True:
+            try:
+                with timed("sheets_append"):
+                    self.worksheet().append_rows(rows, value_input_option="USER_ENTERED")
+                return "sent"
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                if not is_retryable(e):
+                    self._client = self._worksheet = None  # e.g. expired auth -> re-authorize next time
+                    if status_code(e) in AUTH_STATUS and not reauthorized:
+                        reauthorized = True  # once, straight away: a fresh token usually fixes it
+                        self.reauthorizations += 1
+                        continue
+                    return "rejected"
+                if attempt == self.max_retries:
+                    return "retry"
+                self.retries += 1
+                delay = min(self.max_delay, self.base_delay * 2 ** attempt)
+                self._sleep(delay * (0.5 + random.random() / 2))
+                attempt += 1
+
+    def flush(self):
+        """Send everything buffered so far in batches; returns the number of rows sent."""
+        sent = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    rows = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+                if not rows:
+                    return sent
+                outcome = self._append_with_backoff(rows)
+                if outcome == "retry":
+                    with self._lock:  # keep the rows for the next attempt, oldest first
+                        self._buffer.extendleft(reversed(rows))
+                    return sent
+                if outcome == "rejected":
+                    self.dead_letter.extend(rows)
+                    self.rejected += len(rows)
+                    continue
+                sent += len(rows)
+                self.sent += len(rows)
+                self.batches += 1
+
+    def stats(self):
+        return {
+            "buffered": len(self._buffer),
+            "sent": self.sent,
+            "batches": self.batches,
+            "retries": self.retries,
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+            "reauthorizations": self.reauthorizations,
+            "dead_letter": len(self.dead_letter),
+            "connected": self._worksheet is not None,
+            "last_error": self.last_error,
+        }
+
+
+class FakeAPIError(Exception):
+    def __init__(self, code, message="fake Sheets API error"):
+        super().__init__(f"{code}: {message}")
+        self.code = code
+
+
+class FakeWorksheet:
+    def __init__(self, fail_codes=()):
+        self.rows = []
+        self.calls = 0
+        self.fail_codes = deque(fail_codes)
+
+    def append_rows(self, rows, value_input_option=None):
+        self.calls += 1
+        if self.fail_codes:
+            raise FakeAPIError(self.fail_codes.popleft())
+        self.rows.extend(rows)
+
+
+class FakeSheetsClient:
+    """In-memory stand-in for an authorized gspread client."""
+
+    def __init__(self, fail_codes=()):
+        self.sheet1 = FakeWorksheet(fail_codes)
+        self.opened = []
+
+    def open(self, name):
+        self.opened.append(name)
+        return self
+
+
+_sink = None
+_sink_lock = threading.Lock()
+
+
+def get_sheets_sink(creds_info=None):
+    """Process-wide sink; uses the fake backend when ``AQI_SHEETS_FAKE=1``."""
+    global _sink
+    if _sink is None:
+        with _sink_lock:
+            if _sink is None:
+                if os.environ.get("AQI_SHEETS_FAKE") == "1":
+                    fake = FakeSheetsClient()
+                    factory = lambda: fake  # noqa: E731
+                else:
+                    factory = gspread_client_factory(creds_info)
+                _sink = SheetsSink(factory)
+                atexit.register(_sink.flush)
+    return _sink
+
+
+def active_sink():
+    """The sink if one was created in this process, else None (never connects)."""
+    return _sink
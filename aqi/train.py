@@ -0,0 +1,293 @@
+"""Rebuild ``aqi_rf_model.joblib`` and ``label_encoder.joblib`` from ``final_datasett.csv``.
+
+Labels are the CPCB category of the numeric ``AQI`` column.  A stratified
+hold-out split is kept aside; on the rest a grid of random-forest
+hyperparameters is cross-validated in a process pool (one trial per task,
+every worker loads the cached split once).  The winner is refit on the
+training split and written with its metadata to ``models/<version>/``, next
+to a random-forest regressor of the numeric AQI fitted on the same split.
+
+Everything is seeded, so the same CSV, grid and library versions give the
+same model.  The split and fold assignment are cached in ``.train_cache/``
+keyed by the CSV's hash, so repeated runs skip the preparation step.
+
+    python -m aqi.train                  # search, fit, write models/<version>/
+    python -m aqi.train --install        # ... and replace the artifacts the app serves
+    python -m aqi.train --no-search      # fit DEFAULT_PARAMS only
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import platform
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from aqi.dataset import load_frame
+from aqi.features import FEATURES
+from aqi.labels import aqi_band
+from aqi.registry import BASE_DIR, ENCODER_FILE, MODEL_FILE, REGRESSOR_FILE, file_sha256
+
+DATA_FILE = os.path.join(BASE_DIR, "final_datasett.csv")
+MODELS_DIR = os.environ.get("AQI_MODELS_DIR", os.path.join(BASE_DIR, "models"))
+CACHE_DIR = os.environ.get("AQI_TRAIN_CACHE", os.path.join(BASE_DIR, ".train_cache"))
+SEED = 42
+TEST_SIZE = 0.2
+N_FOLDS = 5
+
+# parameters of the shipped model
+DEFAULT_PARAMS = {"n_estimators": 100, "max_depth": None, "min_samples_leaf": 1, "max_features": "sqrt"}
+REGRESSOR_PARAMS = {"n_estimators": 100, "max_depth": None, "min_samples_leaf": 2, "max_features": 1.0}
+PARAM_GRID = {
+    "n_estimators": [100, 200],
+    "max_depth": [None, 12, 20],
+    "min_samples_leaf": [1, 2, 4],
+    "max_features": ["sqrt", None],
+}
+
+
+def param_grid(grid=PARAM_GRID):
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def prepare(data_file=DATA_FILE, n_folds=N_FOLDS, seed=SEED, cache_dir=CACHE_DIR):
+    """Path of the cached split (features, encoded labels, numeric AQI, fold ids), building it if needed."""
+    data_sha = file_sha256(data_file)
+    path = os.path.join(cache_dir, f"{data_sha[:16]}-t{TEST_SIZE}-f{n_folds}-s{seed}-f32-aqi.npz")
+    if os.path.exists(path):
+        return path, data_sha
+
+    from sklearn.model_selection import StratifiedKFold, train_test_split
+    from sklearn.preprocessing import LabelEncoder
+
+    data = load_frame(data_file, columns=FEATURES + ["AQI"]).dropna()
+    X = data[FEATURES].to_numpy(dtype=np.float64)
+    encoder = LabelEncoder().fit(aqi_band(data["AQI"]))
+    y = encoder.transform(aqi_band(data["AQI"]))
+    aqi = data["AQI"].to_numpy(dtype=np.float64)
+    # the extra array doesn't change the split: indices depend only on y and the seed
+    X_train, X_test, y_train, y_test, aqi_train, aqi_test = train_test_split(
+        X, y, aqi, test_size=TEST_SIZE, stratify=y, random_state=seed)
+    fold = np.empty(len(y_train), dtype=np.int8)
+    for k, (_, val) in enumerate(StratifiedKFold(n_folds, shuffle=True, random_state=seed).split(X_train, y_train)):
+        fold[val] = k
+
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = path + f".{os.getpid()}.tmp.npz"
+    np.savez(tmp, X_train=X_train, y_train=y_train, X_test=X_test, y_test=y_test, aqi_train=aqi_train,
+             aqi_test=aqi_test, fold=fold, classes=encoder.classes_)
+    os.replace(tmp, path)
+    return path, data_sha
+
+
+def load_split(path):
+    with np.load(path, allow_pickle=False) as npz:
+        return {name: npz[name] for name in npz.files}
+
+
+_split = None
+
+
+def _init_worker(path):
+    # one load per worker process; every trial it runs reuses the arrays
+    global _split
+    _split = load_split(path)
+
+
+def run_trial(params, seed=SEED):
+    """Cross-validate one parameter set on the cached folds (runs in a pool worker)."""
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.metrics import accuracy_score, f1_score
+
+    X, y, fold = _split["X_train"], _split["y_train"], _split["fold"]
+    accuracy, macro_f1 = [], []
+    t0 = time.perf_counter()
+    for k in range(int(fold.max()) + 1):
+        train, val = fold != k, fold == k
+        model = RandomForestClassifier(**params, random_state=seed, n_jobs=1).fit(X[train], y[train])
+        pred = model.predict(X[val])
+        accuracy.append(accuracy_score(y[val], pred))
+        macro_f1.append(f1_score(y[val], pred, average="macro"))
+    return {
+        "params": params,
+        "accuracy": round(float(np.mean(accuracy)), 5),
+        "accuracy_std": round(float(np.std(accuracy)), 5),
+        "macro_f1": round(float(np.mean(macro_f1)), 5),
+        "seconds": round(time.perf_counter() - t0, 3),
+    }
+
+
+def search(split_path, grid, n_jobs=None):
+    """All trials in grid order; the pool only changes how fast they finish."""
+    n_jobs = n_jobs or os.cpu_count() or 1
+    if n_jobs == 1:
+        _init_worker(split_path)
+        return [run_trial(params) for params in grid]
+    with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=(split_path,)) as pool:
+        return list(pool.map(run_trial, grid))
+
+
+def best_trial(trials):
+    # highest accuracy, then macro-F1; ties go to the earlier (simpler) grid entry
+    return max(trials, key=lambda t: (t["accuracy"], t["macro_f1"]))
+
+
+def artifact_version(data_sha, params, seed):
+    import sklearn
+
+    key = json.dumps({"data": data_sha, "params": params, "seed": seed, "test_size": TEST_SIZE,
+                      "sklearn": sklearn.__version__}, sort_keys=True)
+    return hashlib.sha256(key.encode()).hexdigest()[:12]
+
+
+def fit_final(split, params, seed=SEED, n_jobs=None):
+    import pandas as pd
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.metrics import accuracy_score, classification_report, f1_score
+    from sklearn.preprocessing import LabelEncoder
+
+    # fit on a DataFrame so feature_names_in_ matches the shipped model
+    X_train = pd.DataFrame(split["X_train"], columns=FEATURES)
+    model = RandomForestClassifier(**params, random_state=seed, n_jobs=n_jobs or -1).fit(X_train, split["y_train"])
+    model.n_jobs = None  # tree building is deterministic regardless; don't ship a parallel predict
+    pred = model.predict(pd.DataFrame(split["X_test"], columns=FEATURES))
+    encoder = LabelEncoder()
+    encoder.classes_ = split["classes"].astype(object)
+    holdout = {
+        "rows": len(pred),
+        "accuracy": round(float(accuracy_score(split["y_test"], pred)), 5),
+        "macro_f1": round(float(f1_score(split["y_test"], pred, average="macro")), 5),
+        "per_class": classification_report(split["y_test"], pred, target_names=list(encoder.classes_),
+                                           output_dict=True, zero_division=0),
+    }
+    return model, encoder, holdout
+
+
+def fit_regressor(split, params=None, seed=SEED, n_jobs=None):
+    import pandas as pd
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+    params = params or REGRESSOR_PARAMS
+    X_train = pd.DataFrame(split["X_train"], columns=FEATURES)
+    model = RandomForestRegressor(**params, random_state=seed, n_jobs=n_jobs or -1).fit(X_train, split["aqi_train"])
+    model.n_jobs = None
+    truth = split["aqi_test"]
+    pred = model.predict(pd.DataFrame(split["X_test"], columns=FEATURES))
+    holdout = {
+        "rows": len(pred),
+        "mae": round(float(mean_absolute_error(truth, pred)), 3),
+        "rmse": round(float(np.sqrt(mean_squared_error(truth, pred))), 3),
+        "r2": round(float(r2_score(truth, pred)), 5),
+        "category_accuracy": round(float((aqi_band(pred) == aqi_band(truth)).mean()), 5),
+    }
+    return model, params, holdout
+
+
+def write_artifacts(model, encoder, metadata, out_dir, regressor=None):
+    import joblib
+
+    os.makedirs(out_dir, exist_ok=True)
+    artifacts = [(MODEL_FILE, model), (ENCODER_FILE, encoder)]
+    if regressor is not None:
+        artifacts.append((REGRESSOR_FILE, regressor))
+    for name, obj in artifacts:
+        path = os.path.join(out_dir, name)
+        joblib.dump(obj, path, compress=3)
+        metadata["artifacts"][name] = file_sha256(path)
+    with open(os.path.join(out_dir, "metadata.json"), "w") as f:
+        json.dump(metadata, f, indent=2)
+
+
+def install(out_dir, target_dir=BASE_DIR):
+    """Copy the artifacts next to the app; the registry hot-reloads them on the next request."""
+    for name in (MODEL_FILE, ENCODER_FILE, REGRESSOR_FILE):
+        if not os.path.exists(os.path.join(out_dir, name)):
+            continue
+        tmp = os.path.join(target_dir, f".{name}.tmp")
+        shutil.copyfile(os.path.join(out_dir, name), tmp)
+        os.replace(tmp, os.path.join(target_dir, name))
+
+
+def train(data_file=DATA_FILE, grid=None, n_folds=N_FOLDS, seed=SEED, n_jobs=None, models_dir=MODELS_DIR):
+    """Run the whole pipeline; returns (output directory, metadata)."""
+    import sklearn
+
+    timings = {}
+    t0 = time.perf_counter()
+    split_path, data_sha = prepare(data_file, n_folds, seed)
+    split = load_split(split_path)
+    timings["prepare_s"] = round(time.perf_counter() - t0, 3)
+
+    t = time.perf_counter()
+    trials = search(split_path, grid, n_jobs) if grid else []
+    params = best_trial(trials)["params"] if trials else dict(DEFAULT_PARAMS)
+    timings["search_s"] = round(time.perf_counter() - t, 3)
+
+    t = time.perf_counter()
+    model, encoder, holdout = fit_final(split, params, seed, n_jobs)
+    timings["fit_s"] = round(time.perf_counter() - t, 3)
+
+    t = time.perf_counter()
+    regressor, regressor_params, regressor_holdout = fit_regressor(split, seed=seed, n_jobs=n_jobs)
+    timings["fit_regressor_s"] = round(time.perf_counter() - t, 3)
+
+    version = artifact_version(data_sha, params, seed)
+    out_dir = os.path.join(models_dir, version)
+    timings["total_s"] = round(time.perf_counter() - t0, 3)
+    metadata = {
+        "version": version,
+        "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "data": {"file": os.path.basename(data_file), "sha256": data_sha,
+                 "train_rows": len(split["y_train"]), "test_rows": len(split["y_test"])},
+        "features": FEATURES,
+        "classes": [str(c) for c in encoder.classes_],
+        "split": {"test_size": TEST_SIZE, "n_folds": n_folds, "seed": seed},
+        "params": params,
+        "cv": {"best": best_trial(trials) if trials else None, "trials": trials},
+        "holdout": holdout,
+        "regressor": {"params": regressor_params, "holdout": regressor_holdout},
+        "timings": timings,
+        "n_jobs": n_jobs or os.cpu_count(),
+        "versions": {"python": platform.python_version(), "numpy": np.__version__, "sklearn": sklearn.__version__},
+        "artifacts": {},
+    }
+    write_artifacts(model, encoder, metadata, out_dir, regressor)
+    return out_dir, metadata
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the AQI category model from final_datasett.csv")
+    parser.add_argument("--data", default=DATA_FILE)
+    parser.add_argument("--folds", type=int, default=N_FOLDS)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--out", default=MODELS_DIR, help="parent directory for models/<version>/")
+    parser.add_argument("--no-search", action="store_true", help="skip the grid search and fit DEFAULT_PARAMS")
+    parser.add_argument("--install", action="store_true", help="copy the new artifacts over the served ones")
+    args = parser.parse_args()
+
+    grid = None if args.no_search else param_grid()
+    if grid:
+        print(f"Cross-validating {len(grid)} parameter sets x {args.folds} folds "
+              f"on {args.jobs or os.cpu_count()} worker(s)...", file=sys.stderr)
+    out_dir, metadata = train(args.data, grid, args.folds, args.seed, args.jobs, args.out)
+    print(json.dumps({"version": metadata["version"], "params": metadata["params"],
+                      "cv_accuracy": metadata["cv"]["best"] and metadata["cv"]["best"]["accuracy"],
+                      "holdout_accuracy": metadata["holdout"]["accuracy"],
+                      "regressor_holdout": metadata["regressor"]["holdout"], "timings": metadata["timings"]}, indent=2))
+    print(f"Wrote {out_dir}")
+    if args.install:
+        install(out_dir)
+        print(f"Installed {MODEL_FILE}, {ENCODER_FILE} and {REGRESSOR_FILE} into {BASE_DIR}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
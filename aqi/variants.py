@@ -0,0 +1,258 @@
+"""Smaller variants of the compiled forest, and the report used to pick one.
+
+Each variant is the flat engine from ``aqi.forest`` with some of its size
+traded away:
+
+* fewer trees (the first N of the forest),
+* limited depth (deeper subtrees collapse into the node's class distribution),
+* quantized nodes: float32 thresholds, or int16 thresholds compared against
+  inputs scaled per feature, with uint8 leaf probabilities.
+
+``build`` writes each variant to ``variants/<name>/`` (same layout as
+``aqi_rf_model.compiled/``) and a ``report.json`` with category agreement
+against the full model, accuracy against the CPCB band of the ``AQI`` column
+of ``final_datasett.csv``, size on disk, load time, resident memory and
+predict latency.  The app serves the variant named by ``AQI_MODEL_VARIANT``
+(unset = the exact full forest); SHAP explanations always use the full model.
+
+    python -m aqi.variants build            # all variants + report table
+    python -m aqi.variants build compact    # just one
+    python -m aqi.variants report           # print the last report
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import warnings
+
+import numpy as np
+
+from aqi.forest import CompiledForest, compile_forest
+from aqi.labels import aqi_band
+from aqi.registry import BASE_DIR, ENCODER_FILE, MODEL_FILE, registry
+
+VARIANTS_DIR = os.environ.get("AQI_VARIANTS_DIR", os.path.join(BASE_DIR, "variants"))
+MODEL_VARIANT = os.environ.get("AQI_MODEL_VARIANT", "")
+
+VARIANTS = {
+    "full": {},
+    "trees50": {"n_trees": 50},
+    "trees25": {"n_trees": 25},
+    "depth14": {"max_depth": 14},
+    "depth10": {"max_depth": 10},
+    "float32": {"threshold_dtype": "float32"},
+    "int16": {"threshold_dtype": "int16", "value_dtype": "uint8"},
+    "compact": {"n_trees": 50, "max_depth": 12, "threshold_dtype": "int16", "value_dtype": "uint8"},
+}
+
+def quantize(forest, threshold_dtype=None, value_dtype=None):
+    """Copy of ``forest`` with thresholds / leaf values stored in smaller dtypes."""
+    threshold, x_scale = forest.threshold, None
+    if threshold_dtype == "float32":
+        threshold = threshold.astype(np.float32)
+    elif threshold_dtype == "int16":
+        # per-feature scale so the largest threshold fills int16; floor() on both sides keeps
+        # "x <= t goes left" exact and only merges values within 1/scale of a threshold
+        internal = ~forest.is_leaf
+        max_abs = np.ones(forest.n_features_in_)
+        for f in range(forest.n_features_in_):
+            used = np.abs(threshold[internal & (forest.feature == f)])
+            if len(used) and used.max() > 0:
+                max_abs[f] = used.max()
+        x_scale = np.iinfo(np.int16).max * 0.98 / max_abs
+        threshold = np.floor(threshold * x_scale[forest.feature]).astype(np.int16)
+    elif threshold_dtype is not None:
+        raise ValueError(f"unsupported threshold dtype {threshold_dtype!r}")
+
+    value, value_scale = forest.value, 1.0
+    if value_dtype == "uint8":
+        value_scale = 1.0 / 255
+        value = np.round(value * 255).astype(np.uint8)
+    elif value_dtype == "float16":
+        value = value.astype(np.float16)
+    elif value_dtype is not None:
+        raise ValueError(f"unsupported value dtype {value_dtype!r}")
+
+    return CompiledForest(
+        feature=forest.feature.astype(np.uint8 if forest.n_features_in_ <= 255 else np.int32),
+        threshold=threshold,
+        left=forest.left,
+        right=forest.right,
+        value=value,
+        roots=forest.roots,
+        missing_left=forest.missing_left,
+        classes=forest.classes_,
+        max_depth=forest.max_depth,
+        n_features=forest.n_features_in_,
+        version=forest.version,
+        x_scale=x_scale,
+        value_scale=value_scale,
+    )
+
+
+def build_variant(model, name, version=None):
+    spec = VARIANTS[name]
+    forest = compile_forest(model, version, n_trees=spec.get("n_trees"), max_depth=spec.get("max_depth"))
+    if spec.get("threshold_dtype") or spec.get("value_dtype"):
+        forest = quantize(forest, spec.get("threshold_dtype"), spec.get("value_dtype"))
+    return forest
+
+
+def variant_path(name):
+    return os.path.join(VARIANTS_DIR, name)
+
+
+def load_variant(name, version):
+    """Saved variant ``name`` if it was built from model ``version``, else a fresh in-memory build."""
+    if name not in VARIANTS:
+        raise ValueError(f"unknown model variant {name!r} (expected one of {', '.join(VARIANTS)})")
+    path = variant_path(name)
+    if os.path.exists(os.path.join(path, "meta.json")):
+        forest = CompiledForest.load(path)
+        if forest.version == version and forest.missing_left is not None:
+            return forest
+        if forest.version != version:
+            warnings.warn(f"variant {name!r} was built from model {forest.version}, not {version}; rebuilding in memory")
+        else:
+            warnings.warn(f"variant {name!r} predates missing-value routing; rebuilding in memory")
+    return build_variant(registry.load(MODEL_FILE), name, version)
+
+
+def dir_size(path):
+    return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+
+
+def median_ms(fn, repeat):
+    fn()  # warm-up
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+_RSS_PROBE = """
+import sys, time
+import numpy as np
+from aqi.forest import CompiledForest
+
+def rss_kb():
+    with open("/proc/self/status") as f:
+        return next(int(line.split()[1]) for line in f if line.startswith("VmRSS"))
+
+before = rss_kb()
+t0 = time.perf_counter()
+forest = CompiledForest.load(sys.argv[1])
+elapsed = time.perf_counter() - t0
+forest.predict_proba(np.random.default_rng(0).uniform(0, 500, (2000, forest.n_features_in_)))
+print(elapsed, rss_kb() - before)
+"""
+
+
+def measure_load(path):
+    """(load seconds, resident KB added after a warm predict) for a saved variant, in a fresh interpreter.
+
+    Arrays are memory-mapped, so only the pages traversal touches count; Linux only (reads /proc).
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [BASE_DIR, os.environ.get("PYTHONPATH")])))
+    out = subprocess.run([sys.executable, "-c", _RSS_PROBE, path], capture_output=True, text=True, env=env, check=True)
+    seconds, rss_kb = out.stdout.split()
+    return float(seconds), int(rss_kb)
+
+
+def evaluate(forest, X, full_labels, truth, label_encoder, batch_rows=10_000):
+    labels = forest.predict(X)
+    names = label_encoder.inverse_transform(labels)
+    row = X[:1]
+    batch = np.resize(X, (batch_rows, X.shape[1]))
+    return {
+        "agreement": round(float((labels == full_labels).mean()), 4),
+        "accuracy": round(float((names == truth).mean()), 4),
+        "single_row_ms": round(median_ms(lambda: forest.predict_proba(row), 200), 3),
+        f"batch_{batch_rows // 1000}k_ms": round(median_ms(lambda: forest.predict_proba(batch), 5), 1),
+    }
+
+
+def build(names=None, out_dir=VARIANTS_DIR):
+    """Build, save and measure variants; writes and returns ``report.json`` contents."""
+    import pandas as pd
+
+    from aqi.features import FEATURES
+
+    artifact = registry.get(MODEL_FILE)
+    label_encoder = registry.load(ENCODER_FILE)
+    data = pd.read_csv(os.path.join(BASE_DIR, "final_datasett.csv"))
+    X = data[FEATURES].to_numpy(dtype=float)
+    truth = aqi_band(data["AQI"])
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        full_labels = artifact.obj.predict(X)
+
+    report = {"model_version": artifact.version, "rows": len(X), "variants": {}}
+    for name in names or VARIANTS:
+        forest = build_variant(artifact.obj, name, artifact.version)
+        path = os.path.join(out_dir, name)
+        forest.save(path)
+        load_s, rss_kb = measure_load(path)
+        result = {"spec": VARIANTS[name], "trees": forest.n_estimators, "nodes": len(forest.feature),
+                  "max_depth": forest.max_depth, "disk_kb": round(dir_size(path) / 1024, 1),
+                  "nbytes_kb": round(forest.nbytes / 1024, 1), "load_ms": round(load_s * 1000, 2), "rss_kb": rss_kb}
+        result.update(evaluate(forest, X, full_labels, truth, label_encoder))
+        report["variants"][name] = result
+        print(f"built {name}", file=sys.stderr)
+
+    # the joblib model itself, for reference (memory is the registry's deep_sizeof estimate)
+    trees = [e.tree_ for e in artifact.obj.estimators_]
+    sklearn = {"trees": len(trees), "nodes": sum(t.node_count for t in trees), "max_depth": max(t.max_depth for t in trees),
+               "disk_kb": round(artifact.size_bytes / 1024, 1), "nbytes_kb": round(artifact.memory_bytes / 1024, 1),
+               "load_ms": round(artifact.load_seconds * 1000, 2)}
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        sklearn.update(evaluate(artifact.obj, X, full_labels, truth, label_encoder))
+    report["sklearn"] = sklearn
+
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, "report.json"), "w") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def format_report(report):
+    columns = ["trees", "nodes", "max_depth", "agreement", "accuracy", "disk_kb", "nbytes_kb", "rss_kb",
+               "load_ms", "single_row_ms", "batch_10k_ms"]
+    rows = [("sklearn", report["sklearn"])] + list(report["variants"].items())
+    widths = [max(len(c), 8) for c in columns]
+    lines = [f"{'variant':<10}" + "".join(f"{c:>{w + 2}}" for c, w in zip(columns, widths))]
+    for name, result in rows:
+        lines.append(f"{name:<10}" + "".join(f"{str(result.get(c, '-')):>{w + 2}}" for c, w in zip(columns, widths)))
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and compare reduced model variants")
+    sub = parser.add_subparsers(dest="command", required=True)
+    bld = sub.add_parser("build", help="build variants and write report.json")
+    bld.add_argument("names", nargs="*", metavar="NAME", help=f"any of: {', '.join(VARIANTS)}")
+    bld.add_argument("--out", default=VARIANTS_DIR)
+    rep = sub.add_parser("report", help="print the last report")
+    rep.add_argument("--out", default=VARIANTS_DIR)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        unknown = [name for name in args.names if name not in VARIANTS]
+        if unknown:
+            parser.error(f"unknown variant(s): {', '.join(unknown)}")
+        report = build(args.names or None, args.out)
+    else:
+        with open(os.path.join(args.out, "report.json")) as f:
+            report = json.load(f)
+    print(format_report(report))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""What-if sweeps: classify a whole grid of pollutant vectors in one call.
+
+One or two features vary over evenly spaced values while the others keep a
+fixed vector.  The grid is built as a single (n_points, 6) matrix with NumPy
+and scored in one ``predict_proba`` call.  The result is the category (and its
+probability) at every grid point.  Sweeps are cached per model version, fixed
+vector and grid, so moving a slider back, or another session asking for the
+same surface, costs nothing.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from aqi.features import FEATURES
+from aqi.inference import cache_version, class_labels, predict_proba
+from aqi.labels import AQI_BANDS
+
+MAX_SWEEPS = int(os.environ.get("AQI_WHATIF_CACHE_SIZE", "32"))
+MAX_POINTS = int(os.environ.get("AQI_WHATIF_MAX_POINTS", "250000"))
+
+# CPCB order, mildest first (the label encoder's order is alphabetical)
+CATEGORIES = [name for _, name in AQI_BANDS] + ["Severe"]
+
+# slider limits per feature
+RANGES = {"PM2.5": (0.0, 500.0), "PM10": (0.0, 600.0), "NO2": (0.0, 200.0),
+          "SO2": (0.0, 100.0), "CO": (0.0, 10.0), "Ozone": (0.0, 200.0)}
+
+
+class Sweep:
+    def __init__(self, key, fixed, x_feature, x_values, y_feature, y_values, codes, confidence):
+        self.key = key
+        self.fixed = fixed
+        self.x_feature = x_feature
+        self.x_values = x_values
+        self.y_feature = y_feature
+        self.y_values = y_values
+        self.codes = codes  # (len(y_values), len(x_values)) index into CATEGORIES
+        self.confidence = confidence  # probability of the predicted category
+
+    @property
+    def shape(self):
+        return self.codes.shape
+
+    def category_at(self, x, y=None):
+        i = int(np.abs(self.x_values - x).argmin())
+        j = int(np.abs(self.y_values - y).argmin()) if self.y_feature and y is not None else 0
+        return CATEGORIES[self.codes[j, i]]
+
+    def shares(self):
+        """{category: fraction of grid points} for the categories that occur."""
+        counts = np.bincount(self.codes.ravel(), minlength=len(CATEGORIES))
+        return {CATEGORIES[i]: round(float(c) / self.codes.size, 4) for i, c in enumerate(counts) if c}
+
+    def transitions(self, row=0):
+        """[(x value, category below, category from here)] along one row of the grid."""
+        codes = self.codes[row]
+        change = np.flatnonzero(codes[1:] != codes[:-1]) + 1
+        return [(float(self.x_values[i]), CATEGORIES[codes[i - 1]], CATEGORIES[codes[i]]) for i in change]
+
+
+def grid_matrix(fixed, x_feature, x_values, y_feature=None, y_values=None):
+    """(n_points, 6) matrix, y-major: row ``j * len(x_values) + i`` is (x_values[i], y_values[j])."""
+    ny = len(y_values) if y_feature else 1
+    X = np.tile(np.asarray(fixed, dtype=float), (len(x_values) * ny, 1))
+    X[:, FEATURES.index(x_feature)] = np.tile(x_values, ny)
+    if y_feature:
+        X[:, FEATURES.index(y_feature)] = np.repeat(y_values, len(x_values))
+    return X
+
+
+def compute_sweep(fixed, x_feature, x_range, x_steps, y_feature=None, y_range=None, y_steps=None, key=None):
+    if y_feature == x_feature:
+        raise ValueError("Pick two different pollutants to sweep.")
+    x_values = np.linspace(*x_range, x_steps)
+    y_values = np.linspace(*y_range, y_steps) if y_feature else np.array([np.nan])
+    if len(x_values) * len(y_values) > MAX_POINTS:
+        raise ValueError(f"Grid too large ({len(x_values) * len(y_values):,} points > {MAX_POINTS:,}).")
+
+    X = grid_matrix(fixed, x_feature, x_values, y_feature, y_values)
+    _, proba = predict_proba(X)
+    best = proba.argmax(axis=1)
+    # estimator class order -> CPCB order, so codes sort from mildest to worst
+    to_cpcb = np.array([CATEGORIES.index(name) for name in class_labels()])
+    codes = to_cpcb[best].astype(np.int8).reshape(len(y_values), len(x_values))
+    confidence = proba[np.arange(len(best)), best].astype(np.float32).reshape(codes.shape)
+    return Sweep(key, tuple(fixed), x_feature, x_values, y_feature, y_values, codes, confidence)
+
+
+_sweeps = OrderedDict()
+_lock = threading.Lock()
+stats = {"hits": 0, "misses": 0}
+
+
+def sweep(fixed, x_feature, x_range, x_steps=100, y_feature=None, y_range=None, y_steps=60):
+    """Cached ``compute_sweep``; ``fixed`` is the 6-value vector in ``FEATURES`` order."""
+    fixed = tuple(float(v) for v in fixed)
+    key = (cache_version(), fixed, x_feature, tuple(map(float, x_range)), int(x_steps),
+           y_feature, tuple(map(float, y_range)) if y_feature else None, int(y_steps) if y_feature else None)
+    with _lock:
+        result = _sweeps.get(key)
+        if result is not None:
+            _sweeps.move_to_end(key)
+            stats["hits"] += 1
+            return result
+        stats["misses"] += 1
+    result = compute_sweep(fixed, x_feature, x_range, x_steps, y_feature, y_range, y_steps, key=key)
+    with _lock:
+        _sweeps[key] = result
+        while len(_sweeps) > MAX_SWEEPS:
+            _sweeps.popitem(last=False)
+    return result
+
+
+def drop_to_leave(fixed, feature, steps=200):
+    """How far ``feature`` must fall, others fixed, for the category to change.
+
+    Returns (current category, highest lower value with another category, that
+    category); the value is None if the category holds all the way down to 0.
+    """
+    current = float(fixed[FEATURES.index(feature)])
+    result = sweep(fixed, feature, (0.0, current), steps)
+    codes = result.codes[0]
+    here = codes[-1]
+    changed = np.flatnonzero(codes != here)
+    if not len(changed):
+        return CATEGORIES[here], None, None
+    i = changed[-1]
+    return CATEGORIES[here], float(result.x_values[i]), CATEGORIES[codes[i]]
+
+
+def cache_stats():
+    return {"sweeps": len(_sweeps), "max_sweeps": MAX_SWEEPS, **stats}
@@ -0,0 +1,67 @@
+"""Compare sklearn ``predict_proba`` with the flat engine in ``aqi.forest``.
+
+    python benchmarks/bench_forest.py [--rows 100000] [--threads 1]
+
+Checks parity first (exits 1 on any difference), then reports single-row
+latency (median of many calls) and large-batch throughput for both engines.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from aqi.forest import check_parity, compile_forest, parity_rows  # noqa: E402
+from aqi.registry import MODEL_FILE, registry  # noqa: E402
+
+
+def median_ms(fn, repeat):
+    fn()  # warm-up
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    warnings.simplefilter("ignore")
+
+    artifact = registry.get(MODEL_FILE)
+    model = artifact.obj
+    forest = compile_forest(model, artifact.version)
+
+    parity = check_parity(model, forest, parity_rows(), n_threads=args.threads)
+    print(f"parity: {parity}")
+    if parity["label_mismatches"] or not parity["identical_proba"]:
+        return 1
+
+    row = np.array([[120.0, 180.0, 40.0, 10.0, 1.2, 20.0]])
+    batch = np.random.default_rng(0).uniform(0, 500, size=(args.rows, row.shape[1]))
+
+    print(f"{'engine':<10}{'single row (ms)':>18}{f'{args.rows:,} rows (s)':>18}{'rows/s':>14}")
+    for name, predict in [
+        ("sklearn", model.predict_proba),
+        ("flat", lambda X: forest.predict_proba(X, n_threads=args.threads)),
+    ]:
+        single = median_ms(lambda: predict(row), args.repeat)
+        t0 = time.perf_counter()
+        predict(batch)
+        seconds = time.perf_counter() - t0
+        print(f"{name:<10}{single:>18.3f}{seconds:>18.3f}{args.rows / seconds:>14,.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
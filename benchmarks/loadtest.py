@@ -0,0 +1,384 @@
+"""Localhost load generator: many simulated dashboard sessions across worker processes.
+
+    python benchmarks/loadtest.py app --workers 4 --sessions 4 --duration 60
+    python benchmarks/loadtest.py app --log-format csv      # see CSV log lock contention
+    python benchmarks/loadtest.py api --workers 4 --sessions 8 --server-workers 2
+    python benchmarks/loadtest.py api --server-workers 4 --serve   # behind aqi.serve instead
+
+``app`` mode runs the real ``app.py`` through Streamlit's ``AppTest``.  Each
+session has its own ``AppTest`` and repeats a realistic visit: open Predict,
+pick a preset, predict (which logs), view the log in Admin, then open Share
+for the QR code.  The sessions of one worker take turns step by step;
+parallelism comes from the worker processes.  ``api`` mode starts ``aqi.api`` under uvicorn
+on 127.0.0.1 and posts preset, jittered and batch predictions over HTTP.
+
+Every worker process writes to one shared, throwaway log file (``--log-format``).
+Contention on that file therefore shows up in the ``log_write`` stage timings,
+which are reported next to throughput, latency percentiles per step, and CPU
+seconds and RSS per worker.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import resource
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+PRESETS = ["Good", "Moderate", "Poor", "Very Poor", "Severe"]
+PRESET_VALUES = {
+    "Good": [30, 40, 20, 5, 0.4, 10],
+    "Moderate": [90, 110, 40, 10, 1.2, 30],
+    "Poor": [200, 250, 90, 20, 2.0, 50],
+    "Very Poor": [300, 350, 120, 30, 3.5, 70],
+    "Severe": [400, 500, 150, 40, 4.5, 90],
+}
+PAGE_KEY = "_loadtest_page"
+
+
+def rss_mb(pid="self"):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def cpu_seconds(pid):
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def child_pids(pid):
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(p) for p in f.read().split()]
+    except OSError:
+        return []
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = {}
+        self.errors = {}
+        self.sessions = 0
+        self._lock = threading.Lock()
+
+    def time(self, step, fn):
+        t0 = time.perf_counter()
+        try:
+            fn()
+        except Exception as e:  # a failed step is counted, and the session moves on
+            with self._lock:
+                self.errors[step] = self.errors.get(step, 0) + 1
+                self.last_error = f"{step}: {type(e).__name__}: {e}"
+            return False
+        with self._lock:
+            self.samples.setdefault(step, []).append(time.perf_counter() - t0)
+        return True
+
+
+# 🖥️ app mode: AppTest sessions
+
+APP_STEPS = 5
+
+
+def app_session(rec, seed):
+    """One simulated visitor; advances one step per ``next()``."""
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed)
+    at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=120)
+
+    def goto(page):
+        at.session_state[PAGE_KEY] = page
+        at.run()
+        if at.exception:
+            raise RuntimeError(at.exception[0].message[:200])
+
+    def click_predict():
+        at.button(key="predict_aqi").click().run()
+
+    steps = [
+        ("open_predict", lambda: goto("Predict AQI")),
+        ("pick_preset", lambda: at.selectbox[-1].select(rng.choice(PRESETS)).run()),
+        ("predict", click_predict),
+        ("view_log", lambda: (goto("Admin Tools"), at.toggle(key="show_log").set_value(True).run())),
+        ("share_qr", lambda: goto("Share")),
+    ]
+    while True:
+        for step, fn in steps:
+            ok = rec.time(step, fn)
+            yield
+            if not ok:
+                break
+        else:
+            with rec._lock:
+                rec.sessions += 1
+
+
+def app_sessions(rec, deadline, seeds):
+    # AppTest swaps process-global Streamlit state on every run, so sessions
+    # can't run in parallel threads; they take turns one step at a time instead
+    sessions = [app_session(rec, seed) for seed in seeds]
+    while time.monotonic() < deadline:
+        for session in sessions:
+            next(session)
+
+
+def patch_menu():
+    # the sidebar menu is a custom component AppTest can't click; route via session state instead
+    import streamlit as st
+    import streamlit_option_menu
+
+    streamlit_option_menu.option_menu = lambda **kw: st.session_state.get(PAGE_KEY, kw["options"][0])
+
+
+# 🌐 api mode: HTTP against a local uvicorn
+
+def api_session(rec, deadline, seed, url):
+    import httpx
+
+    rng = random.Random(seed)
+    with httpx.Client(base_url=url, timeout=30) as client:
+        def post(path, payload):
+            r = client.post(path, json=payload)
+            r.raise_for_status()
+
+        while time.monotonic() < deadline:
+            preset = PRESET_VALUES[rng.choice(PRESETS)]
+            jittered = [round(v * rng.uniform(0.8, 1.2), 1) for v in preset]
+            steps = [
+                ("predict_preset", lambda: post("/predict", {"features": preset})),
+                ("predict_new", lambda: post("/predict", {"features": jittered})),
+                ("predict_batch16", lambda: post("/predict/batch", {"rows": [
+                    [round(v * rng.uniform(0.5, 1.5), 1) for v in preset] for _ in range(16)]})),
+                ("health", lambda: client.get("/health").raise_for_status()),
+            ]
+            for step, fn in steps:
+                if not rec.time(step, fn):
+                    break
+            else:
+                with rec._lock:
+                    rec.sessions += 1
+
+
+def worker(index, mode, sessions, duration, url, results):
+    warnings.simplefilter("ignore")
+    if mode == "app":
+        from streamlit.logger import set_log_level
+
+        set_log_level("error")
+        patch_menu()
+        # pay the imports and model load before the clock starts, like a warm container
+        warm = app_session(Recorder(), index)
+        for _ in range(APP_STEPS):
+            next(warm)
+    rec = Recorder()
+    cpu0 = resource.getrusage(resource.RUSAGE_SELF)
+    wall0 = time.perf_counter()
+    deadline = time.monotonic() + duration
+    seeds = [index * 1000 + i for i in range(sessions)]
+    if mode == "app":
+        app_sessions(rec, deadline, seeds)
+    else:
+        threads = [threading.Thread(target=api_session, args=(rec, deadline, seed, url)) for seed in seeds]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    wall = time.perf_counter() - wall0
+    cpu1 = resource.getrusage(resource.RUSAGE_SELF)
+
+    stages, log_stats = {}, None
+    if mode == "app":
+        from aqi.logwriter import get_logger
+        from aqi.metrics import timings
+
+        get_logger().flush(30)
+        stages = timings.snapshot()
+        log_stats = get_logger().stats()
+    results.put({
+        "worker": index,
+        "pid": os.getpid(),
+        "wall_s": wall,
+        "cpu_s": (cpu1.ru_utime + cpu1.ru_stime) - (cpu0.ru_utime + cpu0.ru_stime),
+        "rss_mb": rss_mb(),
+        "peak_rss_mb": cpu1.ru_maxrss / 1024,
+        "sessions": rec.sessions,
+        "samples": rec.samples,
+        "errors": rec.errors,
+        "last_error": getattr(rec, "last_error", None),
+        "stages": stages,
+        "log": log_stats,
+    })
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_api(server_workers, serve=False):
+    import httpx
+
+    port = free_port()
+    if serve:  # aqi.serve: shared mapped forest, one log writer, its own proxy (workers use the next ports)
+        cmd = [sys.executable, "-m", "aqi.serve", "--kind", "api", "--host", "127.0.0.1", "--port", str(port),
+               "--workers", str(server_workers)]
+    else:
+        cmd = [sys.executable, "-m", "aqi.api", "--port", str(port), "--workers", str(server_workers)]
+    proc = subprocess.Popen(cmd, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"aqi.api exited with {proc.returncode}")
+        try:
+            if httpx.get(url + "/health", timeout=2).status_code == 200:
+                return proc, url
+        except httpx.HTTPError:
+            time.sleep(0.25)
+    proc.terminate()
+    raise RuntimeError("aqi.api did not become healthy within 120s")
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000  # noqa: E731
+    return {"count": len(ordered), "p50_ms": round(pick(0.50), 2), "p95_ms": round(pick(0.95), 2),
+            "p99_ms": round(pick(0.99), 2), "mean_ms": round(statistics.fmean(ordered) * 1000, 2)}
+
+
+def summarize(reports, duration, server=None):
+    steps = {}
+    for r in reports:
+        for step, samples in r["samples"].items():
+            steps.setdefault(step, []).extend(samples)
+    all_samples = [s for samples in steps.values() for s in samples]
+    wall = max((r["wall_s"] for r in reports), default=duration) or duration
+    summary = {
+        "workers": len(reports),
+        "wall_s": round(wall, 2),
+        "sessions": sum(r["sessions"] for r in reports),
+        "sessions_per_s": round(sum(r["sessions"] for r in reports) / wall, 2),
+        "steps_per_s": round(len(all_samples) / wall, 2),
+        "errors": sum(sum(r["errors"].values()) for r in reports),
+        "latency": {step: percentiles(samples) for step, samples in steps.items()},
+        "overall": percentiles(all_samples) if all_samples else None,
+        "per_worker": [{k: (round(v, 2) if isinstance(v, float) else v) for k, v in r.items()
+                        if k in ("worker", "pid", "sessions", "cpu_s", "rss_mb", "peak_rss_mb", "last_error")}
+                       for r in sorted(reports, key=lambda r: r["worker"])],
+    }
+    log_stages = {}
+    for r in reports:
+        for stage in ("log_prediction", "log_write"):
+            if stage in r["stages"]:
+                log_stages.setdefault(stage, []).append(r["stages"][stage])
+    if log_stages:
+        summary["log_contention"] = {
+            stage: {"count": sum(s["count"] for s in items),
+                    "worst_p95_ms": max(s["p95_ms"] or 0 for s in items),
+                    "worst_max_ms": max(s["max_ms"] for s in items)}
+            for stage, items in log_stages.items()
+        }
+        summary["log_dropped"] = sum((r["log"] or {}).get("dropped", 0) for r in reports)
+    if server:
+        summary["server"] = server
+    return summary
+
+
+def print_summary(s):
+    print(f"\n{s['workers']} worker(s), {s['wall_s']}s: {s['sessions']} sessions "
+          f"({s['sessions_per_s']}/s), {s['steps_per_s']} steps/s, {s['errors']} error(s)")
+    print(f"{'step':<18}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for step, p in list(s["latency"].items()) + ([("ALL", s["overall"])] if s["overall"] else []):
+        print(f"{step:<18}{p['count']:>8}{p['p50_ms']:>10}{p['p95_ms']:>10}{p['p99_ms']:>10}")
+    print(f"\n{'worker':<8}{'pid':>8}{'sessions':>10}{'cpu s':>8}{'rss MB':>9}{'peak MB':>9}")
+    for w in s["per_worker"]:
+        print(f"{w['worker']:<8}{w['pid']:>8}{w['sessions']:>10}{w['cpu_s']:>8}{w['rss_mb'] or 0:>9}{w['peak_rss_mb']:>9}")
+        if w["last_error"]:
+            print(f"        last error: {w['last_error']}")
+    for stage, c in s.get("log_contention", {}).items():
+        print(f"{stage}: {c['count']} calls, worst worker p95 {c['worst_p95_ms']} ms, max {c['worst_max_ms']} ms")
+    if s.get("server"):
+        print(f"server: {s['server']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("mode", choices=["app", "api"])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="load-generating processes")
+    parser.add_argument("--sessions", type=int, default=2, help="sessions per worker (threads in api mode)")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of load after warm-up")
+    parser.add_argument("--log-format", choices=["sqlite", "csv", "arrow"], default="sqlite")
+    parser.add_argument("--server-workers", type=int, default=1, help="uvicorn workers (api mode)")
+    parser.add_argument("--serve", action="store_true", help="run the API workers under aqi.serve (api mode)")
+    parser.add_argument("--json", help="also write the summary to this file")
+    args = parser.parse_args()
+
+    # one throwaway log shared by every worker: the contention being measured
+    log_dir = tempfile.mkdtemp(prefix="aqi-load-")
+    os.environ["AQI_LOG_FORMAT"] = args.log_format
+    os.environ["AQI_LOG_PATH"] = os.path.join(log_dir, {"sqlite": "load.db", "csv": "load.csv"}.get(args.log_format, "load"))
+
+    server, url = None, None
+    try:
+        if args.mode == "api":
+            server, url = start_api(args.server_workers, args.serve)
+            server_cpu0 = sum(filter(None, (cpu_seconds(p) for p in [server.pid] + child_pids(server.pid))))
+        ctx = multiprocessing.get_context("spawn")  # Streamlit and threads don't survive fork
+        results = ctx.Queue()
+        procs = [ctx.Process(target=worker, args=(i, args.mode, args.sessions, args.duration, url, results))
+                 for i in range(args.workers)]
+        print(f"{args.mode}: {args.workers} worker(s) x {args.sessions} session(s) for {args.duration:g}s "
+              f"(log: {args.log_format})...", file=sys.stderr)
+        for p in procs:
+            p.start()
+        reports = [results.get() for _ in procs]
+        for p in procs:
+            p.join()
+
+        server_stats = None
+        if server is not None:
+            pids = [server.pid] + child_pids(server.pid)
+            server_stats = {
+                "processes": len(pids),
+                "cpu_s": round(sum(filter(None, (cpu_seconds(p) for p in pids))) - server_cpu0, 2),
+                "rss_mb": round(sum(filter(None, (rss_mb(p) for p in pids))), 1),
+            }
+        summary = summarize(reports, args.duration, server_stats)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(10)
+        shutil.rmtree(log_dir, ignore_errors=True)
+
+    print_summary(summary)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+    return 1 if summary["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
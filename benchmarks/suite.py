@@ -0,0 +1,450 @@
+"""Benchmark suite for the hot paths, with results kept per commit.
+
+    python benchmarks/suite.py run [-b predict] [--threshold 0.2]   # measure, save, compare
+    python benchmarks/suite.py compare [BASE] [HEAD]                # two saved commits
+    python benchmarks/suite.py history [-b shap]                    # one row per commit
+
+Each benchmark is timed asv-style: the call count per sample is calibrated
+until one sample takes ``--min-time``, then ``--repeat`` samples are taken, and
+the median per-call time is reported along with the IQR and the minimum.
+
+Results are written to ``benchmarks/results/<machine>/<commit>.json``.  A
+dirty tree gets a ``-dirty`` suffix.  ``run`` compares against the newest
+saved result of an ancestor commit, and exits 1 if any median got slower by
+more than ``--threshold``.  Only compare runs from the same machine.
+
+Results of the reference machine (``AQI_BENCH_MACHINE=reference``; its
+``env`` is in each file) are committed under ``benchmarks/results/reference/``,
+so a fresh checkout already has a baseline on that hardware:
+
+    AQI_BENCH_MACHINE=reference python benchmarks/suite.py run   # vs. the newest committed ancestor
+
+Commit the new file after an intended performance change to move the
+baseline.  Other machines' results stay untracked.
+"""
+import argparse
+import atexit
+import json
+import os
+import platform
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# keep log_prediction away from the app's log file
+_log_dir = tempfile.mkdtemp(prefix="aqi-bench-")
+atexit.register(shutil.rmtree, _log_dir, True)
+os.environ["AQI_LOG_FORMAT"] = "sqlite"
+os.environ["AQI_LOG_PATH"] = os.path.join(_log_dir, "bench_logs.db")
+
+import numpy as np  # noqa: E402
+
+RESULTS_DIR = os.environ.get("AQI_BENCH_RESULTS", os.path.join(ROOT, "benchmarks", "results"))
+MACHINE = os.environ.get("AQI_BENCH_MACHINE", platform.node() or "local")
+THRESHOLD = 0.20
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """Register ``setup(ctx) -> fn``; ``fn()`` is what gets timed."""
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+class Context:
+    """Shared, lazily built inputs so one benchmark's setup isn't timed in another."""
+
+    def __init__(self):
+        self._cache = {}
+
+    def get(self, key, build):
+        if key not in self._cache:
+            self._cache[key] = build()
+        return self._cache[key]
+
+    def rows(self):
+        def build():
+            from aqi.dataset import load_frame
+            from aqi.features import FEATURES
+            from aqi.registry import BASE_DIR
+
+            frame = load_frame(os.path.join(BASE_DIR, "final_datasett.csv"), columns=FEATURES).dropna()
+            return frame[FEATURES].to_numpy(dtype=np.float64)
+        return self.get("rows", build)
+
+    def row(self):
+        return self.rows()[:1]
+
+
+@benchmark("model_load")
+def setup_model_load(ctx):
+    from aqi.registry import MODEL_FILE, ModelRegistry
+
+    return lambda: ModelRegistry().get(MODEL_FILE)
+
+
+@benchmark("predict.single")
+def setup_predict_single(ctx):
+    from aqi.inference import predict_encoded
+
+    row = ctx.row()
+    predict_encoded(row)
+    return lambda: predict_encoded(row)
+
+
+@benchmark("predict.batch")
+def setup_predict_batch(ctx):
+    from aqi.inference import predict_encoded
+
+    rows = ctx.rows()
+    return lambda: predict_encoded(rows)
+
+
+@benchmark("predict_proba.single")
+def setup_predict_proba_single(ctx):
+    from aqi.inference import predict_proba
+
+    row = ctx.row()
+    predict_proba(row)
+    return lambda: predict_proba(row)
+
+
+@benchmark("predict_proba.batch")
+def setup_predict_proba_batch(ctx):
+    from aqi.inference import predict_proba
+
+    rows = ctx.rows()
+    return lambda: predict_proba(rows)
+
+
+@benchmark("predict_cached.hit")
+def setup_predict_cached_hit(ctx):
+    from aqi.inference import predict_cached
+
+    row = ctx.row()
+    predict_cached(row)
+    return lambda: predict_cached(row)
+
+
+@benchmark("shap.single")
+def setup_shap_single(ctx):
+    from aqi.explain import get_explanation_service
+
+    # straight to the explainer: the service's row cache would turn this into a dict lookup
+    explainer = get_explanation_service().explainer
+    row = ctx.row()
+    return lambda: explainer.shap_values(row, check_additivity=False)
+
+
+@benchmark("shap.batch16")
+def setup_shap_batch(ctx):
+    from aqi.explain import get_explanation_service
+
+    explainer = get_explanation_service().explainer
+    rows = ctx.rows()[:16]
+    return lambda: explainer.shap_values(rows, check_additivity=False)
+
+
+@benchmark("chart.comparison")
+def setup_chart_comparison(ctx):
+    from aqi.charts import render_comparison_chart
+
+    values = tuple(ctx.row()[0])
+    return lambda: render_comparison_chart(values)
+
+
+@benchmark("chart.comparison_cached")
+def setup_chart_comparison_cached(ctx):
+    from aqi.charts import comparison_chart
+
+    values = tuple(ctx.row()[0])
+    comparison_chart(values)
+    return lambda: comparison_chart(values)
+
+
+@benchmark("qr.render")
+def setup_qr_render(ctx):
+    from aqi.charts import render_qr_png
+
+    return lambda: render_qr_png("https://delhi-aqi-app.streamlit.app")
+
+
+@benchmark("log_prediction")
+def setup_log_prediction(ctx):
+    from aqi.features import FEATURES
+    from aqi.logwriter import get_logger, log_prediction
+
+    inputs = dict(zip(FEATURES, ctx.row()[0].tolist()))
+    logger = get_logger()
+
+    def run():
+        log_prediction(inputs, "Moderate", "PM2.5", "Medium")
+        if logger._queue.qsize() > 50_000:  # don't let the run measure a full queue
+            logger.flush(30)
+    return run
+
+
+@benchmark("log_write.batch500")
+def setup_log_write(ctx):
+    from aqi.features import FEATURES
+    from aqi.logwriter import make_row, make_sink
+
+    inputs = dict(zip(FEATURES, ctx.row()[0].tolist()))
+    batch = [make_row(inputs, "Moderate", "PM2.5", "Medium") for _ in range(500)]
+    sink = make_sink("sqlite", os.path.join(_log_dir, "bench_write.db"))
+    return lambda: sink.write(batch)
+
+
+@benchmark("cpcb.compute100k")
+def setup_cpcb(ctx):
+    from aqi.cpcb import compute
+
+    X = np.resize(ctx.rows(), (100_000, ctx.rows().shape[1]))
+    return lambda: compute(X)
+
+
+@benchmark("predict_aqi.batch")
+def setup_predict_aqi(ctx):
+    from aqi.inference import predict_aqi
+
+    rows = ctx.rows()
+    return lambda: predict_aqi(rows)
+
+
+@benchmark("whatif.grid100x60")
+def setup_whatif(ctx):
+    from aqi.whatif import compute_sweep
+
+    fixed = ctx.row()[0].tolist()
+    return lambda: compute_sweep(fixed, "PM2.5", (0, 500), 100, "PM10", (0, 600), 60)
+
+
+@benchmark("report.bundle")
+def setup_report_bundle(ctx):
+    from aqi.reports import _summary, build_bundle
+
+    summary = _summary("history", "2024-01-01", ctx.row()[0].tolist(), "Poor", aqi=250)
+    out_dir = tempfile.mkdtemp(dir=_log_dir)
+
+    def run():
+        shutil.rmtree(os.path.join(out_dir, "bench"), ignore_errors=True)
+        build_bundle(summary, "bench", out_dir)
+    return run
+
+
+def measure(fn, min_time=0.05, repeat=7, max_time=20.0):
+    """Per-call seconds: {"median", "iqr", "min", "number", "repeat"}."""
+    fn()  # warm-up
+    number = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - t0
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number *= 10 if elapsed < min_time / 10 else 2
+    samples = [elapsed / number]
+    deadline = time.perf_counter() + max_time
+    while len(samples) < repeat and time.perf_counter() < deadline:
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - t0) / number)
+    q = statistics.quantiles(samples, n=4) if len(samples) > 1 else [samples[0]] * 3
+    return {"median": statistics.median(samples), "iqr": q[2] - q[0], "min": min(samples),
+            "number": number, "repeat": len(samples)}
+
+
+def git(*args):
+    try:
+        return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def commit_id():
+    sha = git("rev-parse", "--short=10", "HEAD") or "nogit"
+    dirty = git("status", "--porcelain", "--untracked-files=no")
+    return sha + ("-dirty" if dirty else "")
+
+
+def environment():
+    import sklearn
+
+    return {"machine": MACHINE, "python": platform.python_version(), "numpy": np.__version__,
+            "sklearn": sklearn.__version__, "cpu_count": os.cpu_count(), "platform": platform.platform()}
+
+
+def results_path(commit, machine=MACHINE):
+    return os.path.join(RESULTS_DIR, machine, f"{commit}.json")
+
+
+def load_results(commit, machine=MACHINE):
+    path = results_path(commit, machine)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def saved_commits(machine=MACHINE):
+    folder = os.path.join(RESULTS_DIR, machine)
+    return {name[:-5] for name in os.listdir(folder) if name.endswith(".json")} if os.path.isdir(folder) else set()
+
+
+def baseline_for(commit, machine=MACHINE):
+    """Newest saved result of HEAD or an ancestor, skipping ``commit`` itself."""
+    saved = saved_commits(machine) - {commit}
+    for sha in git("rev-list", "--abbrev-commit", "--abbrev=10", "-n", "200", "HEAD").split():
+        if sha in saved:
+            return sha
+    return None
+
+
+def compare(base, head, threshold=THRESHOLD):
+    """Rows of (name, base median, head median, ratio, flag) plus the regressed names."""
+    rows, regressed = [], []
+    for name, result in head["benchmarks"].items():
+        old = base["benchmarks"].get(name)
+        if old is None:
+            rows.append((name, None, result["median"], None, "new"))
+            continue
+        ratio = result["median"] / old["median"]
+        flag = ""
+        # a change hidden inside both runs' spread is noise, not a regression
+        noise = max(old["iqr"], result["iqr"])
+        if ratio > 1 + threshold and result["median"] - old["median"] > noise:
+            flag = "REGRESSED"
+            regressed.append(name)
+        elif ratio < 1 / (1 + threshold) and old["median"] - result["median"] > noise:
+            flag = "improved"
+        rows.append((name, old["median"], result["median"], ratio, flag))
+    return rows, regressed
+
+
+def fmt_time(seconds):
+    if seconds is None:
+        return "-"
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("µs", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3g} {unit}"
+    return f"{seconds * 1e9:.3g} ns"
+
+
+def print_comparison(base_id, head_id, rows):
+    print(f"\n{base_id} -> {head_id}")
+    print(f"{'benchmark':<26}{'before':>12}{'after':>12}{'ratio':>8}  ")
+    for name, old, new, ratio, flag in rows:
+        print(f"{name:<26}{fmt_time(old):>12}{fmt_time(new):>12}{(f'{ratio:.2f}' if ratio else '-'):>8}  {flag}")
+
+
+def selected(pattern):
+    return [name for name in BENCHMARKS if not pattern or re.search(pattern, name)]
+
+
+def cmd_run(args):
+    warnings.simplefilter("ignore")
+    commit = commit_id()
+    ctx = Context()
+    results = {}
+    print(f"{'benchmark':<26}{'median':>12}{'iqr':>12}{'min':>12}  calls")
+    for name in selected(args.bench):
+        fn = BENCHMARKS[name](ctx)
+        r = measure(fn, args.min_time, args.repeat)
+        results[name] = r
+        print(f"{name:<26}{fmt_time(r['median']):>12}{fmt_time(r['iqr']):>12}{fmt_time(r['min']):>12}"
+              f"  {r['number']}x{r['repeat']}", flush=True)
+
+    # merge into an existing file so a filtered run (-b) doesn't drop the other benchmarks
+    previous = load_results(commit) or {"benchmarks": {}}
+    data = {"commit": commit, "date": time.strftime("%Y-%m-%d %H:%M:%S"), "env": environment(),
+            "benchmarks": {**previous["benchmarks"], **results}}
+    if not args.no_save:
+        path = results_path(commit)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
+        print(f"saved {os.path.relpath(path, ROOT)}")
+
+    base_id = args.baseline or baseline_for(commit)
+    base = load_results(base_id) if base_id else None
+    if base is None:
+        print("no baseline result to compare with" + (f" ({base_id})" if base_id else ""))
+        return 0
+    rows, regressed = compare(base, {"benchmarks": results}, args.threshold)
+    print_comparison(base_id, commit, rows)
+    if regressed:
+        print(f"\n{len(regressed)} benchmark(s) slower than {base_id} by more than {args.threshold:.0%}: "
+              f"{', '.join(regressed)}")
+        return 1
+    return 0
+
+
+def cmd_compare(args):
+    head_id = args.head or commit_id()
+    base_id = args.base or baseline_for(head_id)
+    base, head = load_results(base_id) if base_id else None, load_results(head_id)
+    if base is None or head is None:
+        print(f"missing results for {base_id if base is None else head_id}", file=sys.stderr)
+        return 2
+    rows, regressed = compare(base, head, args.threshold)
+    print_comparison(base_id, head_id, rows)
+    return 1 if regressed else 0
+
+
+def cmd_history(args):
+    saved = saved_commits()
+    order = []
+    for sha in reversed(git("rev-list", "--abbrev-commit", "--abbrev=10", "-n", "200", "HEAD").split()):
+        order += [c for c in (sha, sha + "-dirty") if c in saved]
+    if not order:
+        print("no saved results")
+        return 0
+    runs = [load_results(c) for c in order]
+    names = [n for n in selected(args.bench) if any(n in r["benchmarks"] for r in runs)]
+    print(f"{'commit':<18}" + "".join(f"{n[:14]:>16}" for n in names))
+    for commit, run in zip(order, runs):
+        cells = [fmt_time(run["benchmarks"].get(n, {}).get("median")) for n in names]
+        print(f"{commit:<18}" + "".join(f"{c:>16}" for c in cells))
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    run = sub.add_parser("run", help="measure, save under the current commit, compare with the baseline")
+    run.add_argument("-b", "--bench", help="regex selecting benchmarks by name")
+    run.add_argument("--min-time", type=float, default=0.05, help="seconds per sample (calibrated)")
+    run.add_argument("--repeat", type=int, default=7)
+    run.add_argument("--threshold", type=float, default=THRESHOLD, help="allowed slowdown, e.g. 0.2 = 20%%")
+    run.add_argument("--baseline", help="commit to compare against (default: newest saved ancestor)")
+    run.add_argument("--no-save", action="store_true")
+    cmp_ = sub.add_parser("compare", help="compare two saved runs")
+    cmp_.add_argument("base", nargs="?")
+    cmp_.add_argument("head", nargs="?")
+    cmp_.add_argument("--threshold", type=float, default=THRESHOLD)
+    hist = sub.add_parser("history", help="median per benchmark for every saved ancestor commit")
+    hist.add_argument("-b", "--bench")
+    sub.add_parser("list", help="benchmark names")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        print("\n".join(BENCHMARKS))
+        return 0
+    return {"run": cmd_run, "compare": cmd_compare, "history": cmd_history}[args.command](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,17 @@
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# keep the suite's prediction logs and Arrow caches out of the working tree (read at import time)
+_TMP_DIR = tempfile.mkdtemp(prefix="aqi-tests-")
+os.environ.setdefault("AQI_LOG_PATH", os.path.join(_TMP_DIR, "aqi_logs.db"))
+os.environ.setdefault("AQI_LOG_DB", os.path.join(_TMP_DIR, "aqi_logs.db"))
+os.environ.setdefault("AQI_DATA_CACHE", os.path.join(_TMP_DIR, "data_cache"))
+
+
+def pytest_configure(config):
+    # the committed model was pickled by an older scikit-learn; arrays carry no feature names
+    config.addinivalue_line("filterwarnings", "ignore::UserWarning:sklearn")
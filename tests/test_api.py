@@ -0,0 +1,51 @@
+import pytest
+from starlette.testclient import TestClient
+
+from aqi.api import app
+from aqi.features import FEATURES
+
+ROW = {"PM2.5": 120.0, "PM10": 180.0, "NO2": 40.0, "SO2": 12.0, "CO": 1.2, "Ozone": 30.0}
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+def test_predict_object_and_list(client):
+    by_name = client.post("/predict", json=ROW)
+    by_position = client.post("/predict", json={"features": [ROW[name] for name in FEATURES]})
+    assert by_name.status_code == by_position.status_code == 200
+    assert by_name.json() == by_position.json()
+
+
+def test_predict_batch(client):
+    response = client.post("/predict/batch", json={"rows": [ROW, [ROW[name] for name in FEATURES]]})
+    assert response.status_code == 200
+    first, second = response.json()["results"]
+    assert first == second
+
+
+@pytest.mark.parametrize("value", ["NaN", "Infinity", "-Infinity", "nan", "inf"])
+def test_non_finite_values_rejected(client, value):
+    response = client.post("/predict", json={**ROW, "PM2.5": value})
+    assert response.status_code == 422
+    assert "PM2.5" in response.json()["error"]
+
+
+def test_non_finite_json_literal_rejected(client):
+    body = '{"features": [120, 180, 40, NaN, 1.2, 30]}'  # Python's json accepts the bare literal
+    response = client.post("/predict", content=body, headers={"content-type": "application/json"})
+    assert response.status_code == 422
+    assert "SO2" in response.json()["error"]
+
+
+def test_non_finite_batch_row_rejected(client):
+    response = client.post("/predict/batch", json={"rows": [ROW, {**ROW, "CO": "Infinity"}]})
+    assert response.status_code == 422
+
+
+@pytest.mark.parametrize("payload", [{"PM2.5": 1.0}, [1, 2, 3], {"features": ["a"] * len(FEATURES)}])
+def test_malformed_rows_rejected(client, payload):
+    assert client.post("/predict", json=payload).status_code == 422
@@ -0,0 +1,68 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from aqi.batch import OUTPUT_COLUMNS, score_file
+from aqi.features import FEATURES
+from aqi.forest import parity_rows
+
+
+def upload(n=1000):
+    df = pd.DataFrame(parity_rows(n_random=n)[-n:], columns=FEATURES)
+    df.loc[:249, FEATURES] = np.nan  # first chunk: nothing to classify
+    df["Station"] = None
+    df.loc[800:, "Station"] = "Anand Vihar"  # empty until a later chunk
+    df["Count"] = 1.0
+    df.loc[900, "Count"] = np.nan
+    return df
+
+
+def test_parquet_chunks_share_one_schema():
+    df = upload()
+    out, rows, counts = score_file(io.BytesIO(df.to_csv(index=False).encode()), "upload.csv",
+                                   fmt="parquet", chunk_size=250)
+    table = pq.read_table(io.BytesIO(out))
+    assert rows == table.num_rows == len(df)
+    assert table.column_names == list(df.columns) + OUTPUT_COLUMNS
+    assert table.column("Station").null_count == 800
+    assert table.column("AQI Category").null_count == 250
+    assert sum(counts.values()) == 750
+
+
+def test_csv_and_parquet_agree():
+    df = upload(600)
+    csv_out, _, csv_counts = score_file(io.BytesIO(df.to_csv(index=False).encode()), "upload.csv", chunk_size=250)
+    parquet_in = io.BytesIO()
+    df.to_parquet(parquet_in)
+    parquet_in.seek(0)
+    pq_out, _, pq_counts = score_file(parquet_in, "upload.parquet", fmt="parquet", chunk_size=250)
+    assert csv_counts == pq_counts
+    from_csv = pd.read_csv(io.BytesIO(csv_out))
+    from_parquet = pq.read_table(io.BytesIO(pq_out)).to_pandas()
+    assert from_csv["AQI Category"].fillna("").tolist() == from_parquet["AQI Category"].fillna("").tolist()
+
+
+def test_upload_with_dates_and_fractional_aqi(tmp_path):
+    df = pd.DataFrame(parity_rows(n_random=300)[-300:], columns=FEATURES)
+    df.insert(0, "Date", pd.date_range("2024-01-05", periods=len(df), freq="h").strftime("%Y-%m-%d %H:%M"))
+    df["AQI"] = np.linspace(50.5, 400.25, len(df))
+    df["Days"] = "Friday"
+    csv = df.to_csv(index=False).encode()
+
+    out, rows, _ = score_file(io.BytesIO(csv), "upload.csv", chunk_size=100)
+    scored = pd.read_csv(io.BytesIO(out))
+    assert rows == len(df)
+    assert scored["Date"].tolist() == df["Date"].tolist()
+    np.testing.assert_allclose(scored["AQI"], df["AQI"])
+    assert scored["AQI Category"].notna().all()
+
+    out, _, _ = score_file(io.BytesIO(csv), "upload.csv", fmt="parquet", chunk_size=100)
+    table = pq.read_table(io.BytesIO(out))
+    assert table.column("Date").to_pylist() == df["Date"].tolist()
+
+    path = tmp_path / "upload.parquet"
+    df.to_parquet(path)
+    _, rows, _ = score_file(str(path), chunk_size=100)  # a path on disk: not the training cache
+    assert rows == len(df)
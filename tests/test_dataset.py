@@ -0,0 +1,37 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from aqi.dataset import ensure_cache, iter_chunks, load_frame
+from aqi.features import FEATURES
+
+
+@pytest.fixture
+def readings(tmp_path):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.uniform(0, 500, size=(1000, len(FEATURES))).round(2), columns=FEATURES)
+    path = tmp_path / "readings.csv"
+    df.to_csv(path, index=False)
+    return str(path), df
+
+
+def test_concurrent_conversions_share_one_cache(readings, tmp_path):
+    path, df = readings
+    cache_dir = str(tmp_path / "cache")
+    with ThreadPoolExecutor(8) as pool:
+        targets = set(pool.map(lambda _: ensure_cache(path, 100, cache_dir), range(8)))
+    assert len(targets) == 1
+    assert os.listdir(cache_dir) == [os.path.basename(targets.pop())]
+
+
+def test_iter_chunks_caps_rows_per_chunk(readings):
+    path, df = readings
+    assert [len(c) for c in iter_chunks(path, 100)] == [100] * 10
+    assert [len(c) for c in iter_chunks(path, 30)] == ([30] * 3 + [10]) * 10  # slices of the 100-row batches
+    assert [len(c) for c in iter_chunks(path, 500)] == [100] * 10  # batches are not merged
+    whole = pd.concat(iter_chunks(path, 30), ignore_index=True)
+    np.testing.assert_allclose(whole[FEATURES].to_numpy(), df[FEATURES].to_numpy(dtype=np.float32))
+    assert len(load_frame(path)) == len(df)
@@ -0,0 +1,68 @@
+import os
+
+import numpy as np
+import pytest
+
+from aqi.forest import CompiledForest, check_parity, compile_forest, export_shared, parity_rows
+from aqi.registry import get_model
+
+
+@pytest.fixture(scope="module")
+def model():
+    return get_model()
+
+
+@pytest.fixture(scope="module")
+def forest(model):
+    return compile_forest(model)
+
+
+@pytest.fixture(scope="module")
+def rows():
+    return parity_rows(n_random=2_000)
+
+
+def nan_rows(rows, seed=0):
+    X = rows.copy()
+    rng = np.random.default_rng(seed)
+    X[rng.random(X.shape) < 0.2] = np.nan
+    return X
+
+
+@pytest.mark.parametrize("n_threads", [1, 4])
+def test_dataset_rows(model, forest, rows, n_threads):
+    result = check_parity(model, forest, rows, n_threads=n_threads)
+    assert result["label_mismatches"] == 0
+    assert result["identical_proba"]
+
+
+@pytest.mark.parametrize("n_threads", [1, 4])
+def test_rows_with_nan(model, forest, rows, n_threads):
+    result = check_parity(model, forest, nan_rows(rows), n_threads=n_threads)
+    assert result["label_mismatches"] == 0
+    assert result["identical_proba"]
+
+
+def test_single_rows(model, forest, rows):
+    X = nan_rows(rows[:200], seed=1)
+    for x in X:
+        np.testing.assert_array_equal(forest.predict_proba(x[None]), model.predict_proba(x[None]))
+    np.testing.assert_array_equal(forest.predict(X), model.predict(X))
+
+
+def test_forest_without_missing_directions_rejects_nan(rows):
+    old = compile_forest(get_model())
+    old.missing_left = None
+    old.predict(rows[:10])
+    with pytest.raises(ValueError, match="missing-value"):
+        old.predict(nan_rows(rows[:10], seed=2))
+
+
+def test_export_shared_rewrites_an_export_without_missing_directions(tmp_path, rows):
+    path = export_shared(shared_dir=str(tmp_path))
+    os.remove(os.path.join(path, "missing_left.npy"))  # as exported before NaN routing existed
+    assert export_shared(shared_dir=str(tmp_path)) == path
+    assert os.path.exists(os.path.join(path, "missing_left.npy"))
+    shared = CompiledForest.load(path)
+    X = nan_rows(rows[:50], seed=3)
+    np.testing.assert_array_equal(shared.predict_proba(X), get_model().predict_proba(X))
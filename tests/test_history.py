@@ -0,0 +1,23 @@
+import numpy as np
+
+from aqi.history import History, load_frame
+
+CSV = """Date,Month,Year,Holidays_Count,Days,PM2.5,PM10,NO2,SO2,CO,Ozone,AQI
+1,1,2021,0,5,408.8,442.42,160.61,12.95,2.77,43.19,462
+2,1,2021,0,6,404.04,561.95,52.85,5.18,2.6,16.43,
+3,1,2021,,7,225.07,239.04,170.95,10.93,1.4,44.29,264
+31,2,2021,0,1,100.0,150.0,40.0,10.0,1.0,30.0,180
+4,1,2021,1,1,89.55,132.08,153.98,10.42,1.01,49.19,188
+"""
+
+
+def test_rows_without_aqi_or_date_are_dropped(tmp_path):
+    path = tmp_path / "history.csv"
+    path.write_text(CSV)
+    df = load_frame(str(path))
+    assert [d.day for d in df.index] == [1, 3, 4]  # blank AQI and 31 February dropped
+    assert df["AQI"].dtype == np.int16
+    assert df["AQI"].tolist() == [462, 264, 188]
+    assert df["Category"].tolist() == ["Severe", "Poor", "Moderate"]
+    assert df["Holidays"].tolist() == [0, 0, 1]
+    History(df)  # aggregates build on the filtered frame
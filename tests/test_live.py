@@ -0,0 +1,78 @@
+import asyncio
+
+import httpx
+import pytest
+
+from aqi.live import PARAMETERS, IngestWorker, LiveCache, OpenAQSource, configured, normalize
+from aqi.mock_openaq import STATIONS, create_app
+
+
+@pytest.mark.parametrize("value", ["n/a", "", None, "nan", -1, "-3.5", float("inf"), {"v": 1}])
+def test_normalize_skips_unusable_values(value):
+    assert normalize("pm25", value, "µg/m³") is None
+
+
+def test_normalize_coerces_and_converts():
+    assert normalize("pm25", "42.5", "ug/m3") == ("PM2.5", 42.5, "µg/m³")
+    assert normalize("co", "1000", "µg/m³") == ("CO", 1.0, "mg/m³")
+    assert normalize("bc", 3.0, "µg/m³") is None
+
+
+def test_openaq_needs_an_explicit_url():
+    assert not configured("openaq", "")
+    assert configured("openaq", "http://127.0.0.1:8765")
+    assert configured("mypackage.sources:Feed", "")
+    with pytest.raises(ValueError, match="AQI_LIVE_URL"):
+        OpenAQSource(base_url="")
+
+
+def test_poll_skips_bad_records(tmp_path):
+    results = [
+        {"parameter": "pm25", "value": 80, "unit": "µg/m³", "locationId": 1, "date": {"utc": "2026-01-01T00:00:00Z"}},
+        {"parameter": "pm10", "value": "oops", "unit": "µg/m³", "locationId": 1,
+         "date": {"utc": "2026-01-01T00:00:00Z"}},
+        {"parameter": "no2", "value": "12", "unit": "ppb", "locationId": 1, "date": {"utc": "2026-01-01T00:00:00Z"}},
+    ]
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json={"meta": {"found": 3},
+                                                                              "results": results}))
+    source = OpenAQSource(base_url="http://openaq.test")
+    worker = IngestWorker(source, LiveCache(str(tmp_path / "live.db")))
+
+    async def poll():
+        async with httpx.AsyncClient(base_url=source.base_url, transport=transport) as client:
+            return await worker.poll_once(client)
+
+    assert asyncio.run(poll()) == 2
+    latest = worker.cache.latest()
+    assert set(latest) == {"PM2.5", "NO2"}
+    assert latest["NO2"]["value"] == pytest.approx(12 * 1.88)
+
+
+def test_incremental_polls_against_the_mock_api(tmp_path):
+    app = create_app(history_hours=5, speed=0)  # frozen clock: new hours only when the test adds them
+    source = OpenAQSource(base_url="http://mock-openaq", page_size=10)
+    worker = IngestWorker(source, LiveCache(str(tmp_path / "live.db")))
+    per_hour = len(STATIONS) * len(PARAMETERS)
+
+    async def poll():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(base_url=source.base_url, transport=transport) as client:
+            before = app.state.stats["requests"]
+            added = await worker.poll_once(client)
+            return added, app.state.stats["requests"] - before
+
+    added, requests = asyncio.run(poll())
+    assert added == 6 * per_hour  # the 5 history hours plus the current one
+    assert requests == -(-added // source.page_size)  # every page of meta.found was fetched
+    newest = worker.cache.cursor(source.name)
+    assert worker.cache.stats()["readings"] == added
+
+    added, _ = asyncio.run(poll())  # nothing new: only the cursor hour comes back
+    assert added == 0 and worker.fetched == 7 * per_hour
+    assert app.state.stats["date_from"][-1] == newest.replace(" ", "T") + "Z"
+
+    app.state.clock.history_hours += 2
+    added, _ = asyncio.run(poll())
+    assert added == 2 * per_hour
+    assert worker.cache.stats()["readings"] == 8 * per_hour
+    assert worker.cache.cursor(source.name) > newest
@@ -0,0 +1,65 @@
+import threading
+import time
+
+from aqi.logwriter import CsvSink, PredictionLogger, make_row
+
+
+class ListSink:
+    def __init__(self, delay=0.0):
+        self.batches = []
+        self.delay = delay
+
+    def write(self, rows):
+        time.sleep(self.delay)
+        self.batches.append(list(rows))
+
+    def files(self):
+        return []
+
+
+def test_flush_wakes_a_batching_writer():
+    sink = ListSink()
+    logger = PredictionLogger(sink, batch_size=1000, flush_interval=30.0)
+    for i in range(10):
+        logger.log([i])
+    t0 = time.monotonic()
+    assert logger.flush(timeout=1.0)
+    assert time.monotonic() - t0 < 1.0
+    assert [row for batch in sink.batches for row in batch] == [[i] for i in range(10)]
+
+
+def test_writer_still_batches_without_a_flush():
+    sink = ListSink()
+    logger = PredictionLogger(sink, batch_size=1000, flush_interval=0.3)
+    for i in range(50):
+        logger.log([i])
+    time.sleep(0.6)
+    assert len(sink.batches) == 1 and len(sink.batches[0]) == 50
+
+
+def test_flush_waits_for_every_row_across_batches():
+    sink = ListSink(delay=0.01)
+    logger = PredictionLogger(sink, batch_size=20, flush_interval=30.0)
+    thread = threading.Thread(target=lambda: [logger.log([i]) for i in range(200)])
+    thread.start()
+    thread.join()
+    assert logger.flush(timeout=2.0)
+    assert logger.written == 200
+    assert logger.stats()["queued"] == 0
+
+
+def test_flush_times_out_on_a_stuck_sink():
+    logger = PredictionLogger(ListSink(delay=1.0), flush_interval=30.0)
+    logger.log([0])
+    assert not logger.flush(timeout=0.2)
+    assert logger.flush(timeout=2.0)
+
+
+def test_csv_rotation_keeps_every_row(tmp_path):
+    sink = CsvSink(str(tmp_path / "aqi_logs.csv"), max_bytes=500)
+    reading = {"PM2.5": 120.0, "PM10": 180.0, "NO2": 40.0, "SO2": 12.0, "CO": 1.2, "Ozone": 30.0}
+    for batch in range(5):  # several rotations within the same second
+        sink.write([make_row(reading, "Poor", "PM10", "HIGH") for _ in range(10)])
+    files = sink.files()
+    assert len(files) == 5 and files[-1] == sink.path
+    assert sum(sum(1 for _ in open(f)) - 1 for f in files) == 50
@@ -0,0 +1,50 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from aqi import monitor
+from aqi.features import FEATURES
+from aqi.logstore import LogStore
+
+
+def write_dataset(path, scale, seed):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(rng.uniform(0, 300 * scale, size=(400, len(FEATURES))).round(2), columns=FEATURES)
+    df["AQI"] = rng.integers(20, 480, size=len(df))
+    df.to_csv(path, index=False)
+
+
+@pytest.fixture
+def dataset(tmp_path, monkeypatch):
+    path = tmp_path / "final_datasett.csv"
+    write_dataset(path, 1, seed=0)
+    monkeypatch.setattr(monitor, "data_file_path", lambda data_file=None: data_file or str(path))
+    monkeypatch.setattr(monitor, "_baseline", None)
+    monkeypatch.setattr(monitor, "_monitor", None)
+    return path
+
+
+def test_baseline_is_rebuilt_when_the_data_changes(dataset):
+    first = monitor.get_baseline()
+    assert monitor.get_baseline() is first
+    write_dataset(dataset, 3, seed=1)
+    st = os.stat(dataset)
+    os.utime(dataset, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    second = monitor.get_baseline()
+    assert second is not first
+    assert second["version"] == monitor.data_version()
+    assert second["features"]["PM2.5"]["mean"] > first["features"]["PM2.5"]["mean"]
+
+
+def test_monitor_follows_the_baseline(dataset, tmp_path, monkeypatch):
+    store = LogStore(str(tmp_path / "aqi_logs.db"))
+    monkeypatch.setattr("aqi.logwriter.get_log_store", lambda: store)
+    first = monitor.get_monitor()
+    assert monitor.get_monitor() is first
+    write_dataset(dataset, 3, seed=1)
+    os.utime(dataset, ns=(0, os.stat(dataset).st_mtime_ns + 1_000_000_000))
+    second = monitor.get_monitor()
+    assert second is not first
+    assert second.baseline["version"] == monitor.data_version()
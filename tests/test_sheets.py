@@ -0,0 +1,103 @@
+import pytest
+import requests
+
+from aqi.sheets import FakeAPIError, FakeSheetsClient, SheetsSink, is_retryable
+
+
+def make_sink(fail_codes=(), **kwargs):
+    client = FakeSheetsClient(fail_codes)
+    delays = []
+    sink = SheetsSink(lambda: client, sleep=delays.append, **kwargs)
+    return sink, client.sheet1, delays
+
+
+def buffer(sink, n, start=0):
+    for i in range(start, start + n):  # straight into the buffer: no background thread
+        sink._buffer.append([i])
+
+
+def test_rows_go_out_in_batches():
+    sink, sheet, delays = make_sink(batch_size=4)
+    buffer(sink, 10)
+    assert sink.flush() == 10
+    assert sheet.calls == 3
+    assert sheet.rows == [[i] for i in range(10)]
+    assert sink.stats()["batches"] == 3 and not delays
+
+
+def test_transient_errors_back_off_exponentially():
+    sink, sheet, delays = make_sink([429, 503, 500], batch_size=5, base_delay=1.0, max_delay=3.0)
+    buffer(sink, 5)
+    assert sink.flush() == 5
+    assert sheet.rows == [[i] for i in range(5)]
+    assert sink.retries == 3
+    # attempt k waits min(max_delay, base_delay * 2**k), scaled by a jitter in [0.5, 1]
+    for delay, cap in zip(delays, [1.0, 2.0, 3.0]):
+        assert cap / 2 <= delay <= cap
+
+
+def test_exhausted_retries_keep_rows_for_next_flush():
+    sink, sheet, _ = make_sink([503] * 3, batch_size=2, max_retries=2)
+    buffer(sink, 3)
+    assert sink.flush() == 0
+    assert len(sink._buffer) == 3
+    assert sink.flush() == 3
+    assert sheet.rows == [[0], [1], [2]]
+
+
+def test_rejected_batch_does_not_block_later_rows():
+    sink, sheet, delays = make_sink([400], batch_size=2)
+    buffer(sink, 5)
+    assert sink.flush() == 3
+    assert list(sink.dead_letter) == [[0], [1]]
+    assert sheet.rows == [[2], [3], [4]]
+    assert sink.stats()["rejected"] == 2 and not delays
+    buffer(sink, 2, start=5)
+    assert sink.flush() == 2
+
+
+def test_dead_letter_is_bounded():
+    sink, _, _ = make_sink([400, 400], batch_size=3, max_dead_letter=4)
+    buffer(sink, 6)
+    assert sink.flush() == 0
+    assert list(sink.dead_letter) == [[2], [3], [4], [5]]
+
+
+@pytest.mark.parametrize("error, retryable", [
+    (FakeAPIError(429), True),
+    (FakeAPIError(503), True),
+    (FakeAPIError(400), False),
+    (ConnectionError(), True),
+    (requests.exceptions.ConnectionError(), True),
+    (requests.exceptions.ReadTimeout(), True),
+    (ValueError(), False),
+])
+def test_is_retryable(error, retryable):
+    assert is_retryable(error) is retryable
+
+
+def test_http_error_uses_its_status():
+    response = requests.Response()
+    response.status_code = 403
+    assert not is_retryable(requests.exceptions.HTTPError(response=response))
+    response.status_code = 502
+    assert is_retryable(requests.exceptions.HTTPError(response=response))
+
+
+@pytest.mark.parametrize("code", [401, 403])
+def test_auth_error_reauthorizes_once_then_sends(code):
+    client = FakeSheetsClient([code])
+    authorizations = []
+    sink = SheetsSink(lambda: authorizations.append(1) or client, batch_size=5, sleep=lambda s: None)
+    buffer(sink, 5)
+    assert sink.flush() == 5
+    assert client.sheet1.rows == [[i] for i in range(5)]
+    assert len(authorizations) == 2 and not sink.dead_letter
+    assert sink.stats()["reauthorizations"] == 1
+
+
+def test_auth_error_that_persists_is_rejected():
+    sink, sheet, delays = make_sink([401, 401], batch_size=5)
+    buffer(sink, 5)
+    assert sink.flush() == 0
+    assert sheet.calls == 2 and len(sink.dead_letter) == 5 and not delays
@@ -0,0 +1,105 @@
+import os
+import threading
+
+import pytest
+
+from aqi import logwriter
+from aqi.logserver import LogServer, RemoteSink
+from aqi.logstore import LogStore
+from aqi.logwriter import PredictionLogger, make_local_sink, make_row, read_log
+
+READING = {"PM2.5": 120.0, "PM10": 180.0, "NO2": 40.0, "SO2": 12.0, "CO": 1.2, "Ozone": 30.0}
+
+
+def rows(n, day="2026-10-01"):
+    return [make_row(READING, "Poor" if i % 3 else "Severe", "PM10", "HIGH", f"{day} 10:{i // 60:02d}:{i % 60:02d}")
+            for i in range(n)]
+
+
+@pytest.fixture
+def use_logger(monkeypatch):
+    def install(sink):
+        logger = PredictionLogger(sink, batch_size=7, flush_interval=30.0)
+        monkeypatch.setattr(logwriter, "_logger", logger)
+        return logger
+    return install
+
+
+@pytest.mark.parametrize("fmt, name", [("sqlite", "aqi_logs.db"), ("csv", "aqi_logs.csv"), ("arrow", "aqi_logs")])
+def test_logged_rows_read_back(tmp_path, use_logger, fmt, name):
+    logger = use_logger(make_local_sink(fmt, str(tmp_path / name)))
+    for row in rows(25):
+        logger.log(row)
+    df = read_log()  # flushes first
+    assert logger.written == 25
+    assert list(df.columns) == logwriter.LOG_COLUMNS
+    assert len(df) == 25
+    assert df["AQI Category"].value_counts().to_dict() == {"Poor": 16, "Severe": 9}
+    assert df["PM2.5"].astype(float).eq(120.0).all()
+
+
+def test_nothing_logged_reads_as_none(tmp_path, use_logger):
+    use_logger(make_local_sink("csv", str(tmp_path / "aqi_logs.csv")))
+    assert read_log() is None
+
+
+def test_sqlite_daily_counts(tmp_path):
+    sink = make_local_sink("sqlite", str(tmp_path / "aqi_logs.db"))
+    sink.write(rows(6, day="2026-10-01"))
+    sink.write(rows(3, day="2026-10-02"))
+    store = LogStore(sink.path)
+    assert store.count() == 9
+    assert store.category_counts() == {"Poor": 6, "Severe": 3}
+    assert store.category_counts("2026-10-02", "2026-10-02") == {"Poor": 2, "Severe": 1}
+    assert len(store.page(page=2, page_size=4)) == 4
+
+
+@pytest.fixture
+def log_server(tmp_path):
+    address = str(tmp_path / "log.sock")
+    path = str(tmp_path / "aqi_logs.db")
+    servers = []
+
+    def start():
+        if os.path.exists(address):
+            os.unlink(address)
+        server = LogServer(address, make_local_sink("sqlite", path), authkey=b"test")
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield address, path, start
+    for server in servers:
+        server.close()
+
+
+def test_remote_sink_writes_through_the_server(log_server):
+    address, path, start = log_server
+    server = start()
+    sink = RemoteSink(address, "sqlite", path, authkey=b"test")
+    sink.write(rows(10))
+    sink.write(rows(5))
+    assert (server.batches, server.rows) == (2, 15)
+    assert LogStore(path).count() == 15  # acknowledged means written
+    assert sink.files() == [path]
+
+
+def test_remote_sink_reconnects_after_a_server_restart(log_server):
+    address, path, start = log_server
+    first = start()
+    sink = RemoteSink(address, "sqlite", path, authkey=b"test")
+    sink.write(rows(3))
+    first.close()
+    sink._conn.close()  # what the worker sees once the old server's process is gone
+    second = start()
+    sink.write(rows(4))
+    assert second.rows == 4
+    assert LogStore(path).count() == 7
+
+
+def test_remote_sink_reports_server_errors(log_server):
+    address, path, start = log_server
+    start()
+    sink = RemoteSink(address, "sqlite", path, authkey=b"test")
+    with pytest.raises(RuntimeError, match="log server"):
+        sink.write([["not", "a", "row"]])
@@ -0,0 +1 @@
+"""Streamlit pages. Each module exposes ``render()`` and is only imported/executed when selected."""
@@ -0,0 +1,10 @@
+import streamlit as st
+
+
+def render():
+    st.title("ℹ️ About This App")
+    st.markdown("""
+    **Creator**: Alok Tungal  
+    **Purpose**: Predict and analyze Delhi's air quality using AI and real-time data.  
+    **Tech Used**: Python, Streamlit, scikit-learn, SHAP, OpenAQ API
+    """)
@@ -0,0 +1,165 @@
+import json
+import sys
+from datetime import date, timedelta
+
+import streamlit as st
+
+from aqi.labels import emoji_map
+from aqi.logwriter import get_log_store, get_logger, read_log
+from aqi.lazy import lazy_import, import_times, importtime_breakdown
+from aqi.metrics import profiler, timings
+from aqi.registry import registry
+from aqi.render_cache import render_cache
+
+
+def render_log_viewer(store):
+    # Filters, counts and rows are all answered by indexed SQLite queries; only one page is loaded
+    first_ts, last_ts = store.time_bounds()
+    if first_ts is None:
+        st.warning("No predictions logged yet.")
+        return
+    first_day, last_day = date.fromisoformat(first_ts[:10]), date.fromisoformat(last_ts[:10])
+
+    col1, col2 = st.columns(2)
+    with col1:
+        day_range = st.date_input("Date range", (first_day, last_day), key="log_days")
+    with col2:
+        categories = st.multiselect("AQI Category", list(emoji_map), key="log_categories")
+    start_day, end_day = (day_range if len(day_range) == 2 else (day_range[0], day_range[0]))
+    start, end = start_day.isoformat(), (end_day + timedelta(days=1)).isoformat()
+
+    counts = store.category_counts(start_day.isoformat(), end_day.isoformat())
+    if counts:
+        st.bar_chart(counts)
+
+    total = store.count(start, end, categories)
+    col1, col2 = st.columns(2)
+    with col1:
+        page_size = st.selectbox("Rows per page", [25, 50, 100, 250], index=1, key="log_page_size")
+    pages = max(1, -(-total // page_size))
+    # clamp before the widget exists: a bigger page size or a narrower filter can leave it past the end
+    if st.session_state.get("log_page", 1) > pages:
+        st.session_state["log_page"] = pages
+    with col2:
+        page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, key="log_page")
+    st.caption(f"{total:,} matching predictions")
+    st.dataframe(store.page(page, page_size, start, end, categories), use_container_width=True)
+
+
+def render_performance(pd):
+    snapshot = timings.snapshot()
+    if snapshot:
+        st.caption("Time per stage in this process since start (or the last reset), largest total first.")
+        st.dataframe(pd.DataFrame.from_dict(snapshot, orient="index"), use_container_width=True)
+    else:
+        st.info("No timings recorded yet.")
+    col1, col2, col3 = st.columns(3)
+    col1.download_button("⬇️ Prometheus", timings.to_prometheus(), "aqi_metrics.prom", "text/plain")
+    col2.download_button("⬇️ JSON", json.dumps(snapshot, indent=2), "aqi_metrics.json", "application/json")
+    if col3.button("🔄 Reset timings", key="timings_reset"):
+        timings.reset()
+        st.rerun()
+
+    # 🔬 Sampling profiler: samples every thread, so it sees other sessions' reruns too
+    if st.toggle("🔬 Sampling profiler", value=profiler.running, key="profiler_on"):
+        profiler.start()
+        st.caption(f"{profiler.samples:,} samples every {profiler.interval * 1000:.0f} ms. "
+                   "Use the app in another tab, then come back here.")
+        top = profiler.top()
+        if top:
+            st.dataframe(pd.DataFrame(top, columns=["Function", "Self %", "Total %"]), use_container_width=True)
+        col1, col2 = st.columns(2)
+        col1.download_button("⬇️ Collapsed stacks", profiler.collapsed(), "aqi_profile.folded", "text/plain")
+        if col2.button("🧹 Reset samples", key="profiler_reset"):
+            profiler.reset()
+            st.rerun()
+    elif profiler.running:
+        profiler.stop()
+
+
+def render_drift(pd):
+    from aqi.monitor import get_monitor
+
+    monitor = get_monitor()
+    if monitor is None:
+        st.caption("Drift monitoring reads the SQLite log (`AQI_LOG_FORMAT=sqlite`).")
+        return
+    new_rows = monitor.update()  # only rows logged since the last refresh
+    stats = monitor.stats()
+    st.caption(f"{stats['rows']:,} logged predictions vs `{stats['baseline'].split(':')[0]}` "
+               f"(+{new_rows:,} new, updated {stats['updated_at']}).")
+    for level, message in monitor.alerts():
+        (st.error if level == "alert" else st.warning)(f"{'🚨' if level == 'alert' else '⚠️'} {message}")
+    st.dataframe(pd.DataFrame(monitor.feature_report()).set_index("feature"), use_container_width=True)
+    categories = monitor.category_report()
+    st.markdown(f"**Category mix** (PSI {categories['psi']}, {categories['status']})")
+    st.bar_chart(pd.DataFrame(categories["shares"]).set_index("category"))
+    if st.button("🔁 Rebuild from the whole log", key="drift_reset"):
+        monitor.reset()
+        st.success(f"Re-read {monitor.update():,} rows.")
+
+
+def render():
+    pd = lazy_import("pandas")
+
+    st.title("🛠️ Admin Tools")
+
+    if st.toggle("📂 View Log File", key="show_log"):
+        store = get_log_store()
+        if store is not None:
+            render_log_viewer(store)
+        else:
+            df_log = read_log()
+            if df_log is not None:
+                st.dataframe(df_log)
+            else:
+                st.warning("Log file not found. It may have reset.")
+
+    with st.expander("📝 Prediction Log Writer"):
+        st.json(get_logger().stats())
+
+    sheets = sys.modules.get("aqi.sheets")  # only if Sheets logging was used in this process
+    sink = sheets.active_sink() if sheets is not None else None
+    if sink is not None:
+        with st.expander("📄 Google Sheets Sink"):
+            st.json(sink.stats())
+            if st.button("⬆️ Flush to Sheets now", key="sheets_flush"):
+                st.success(f"Sent {sink.flush()} row(s).")
+
+    with st.expander("📡 Drift Monitor"):
+        render_drift(pd)
+
+    with st.expander("🖼️ Render Cache"):
+        st.json(render_cache.stats())
+
+    with st.expander("🎯 Prediction Cache"):
+        from aqi.prediction_cache import prediction_cache
+        st.json(prediction_cache.stats())
+        if st.button("🧹 Clear prediction cache", key="prediction_cache_clear"):
+            prediction_cache.clear()
+            st.success("Prediction cache cleared.")
+
+    with st.expander("📦 Loaded Model Artifacts"):
+        st.dataframe(pd.DataFrame(registry.stats()), use_container_width=True)
+        from aqi.variants import MODEL_VARIANT
+        st.caption(f"Serving variant: `{MODEL_VARIANT or 'full'}` (set `AQI_MODEL_VARIANT`, build with `python -m aqi.variants build`)")
+
+    with st.expander("⏱️ Performance"):
+        render_performance(pd)
+
+    # ⏱️ Startup & import timings
+    with st.expander("⏱️ Startup Import Times"):
+        last_rerun = st.session_state.get("last_rerun_s")
+        if last_rerun is not None:
+            st.caption(f"Previous rerun took {last_rerun:.2f}s.")
+        first_imports = sorted(import_times().items(), key=lambda kv: kv[1], reverse=True)
+        if first_imports:
+            st.dataframe(
+                pd.DataFrame(first_imports, columns=["Module", "First import (s)"]).round(3),
+                use_container_width=True
+            )
+        if st.button("🔬 Profile cold-start imports", key="importtime_profile"):
+            heavy = ["streamlit", "numpy", "pandas", "sklearn", "shap", "matplotlib.pyplot", "seaborn", "qrcode", "PIL.Image", "gspread"]
+            total, rows = importtime_breakdown(heavy)
+            st.caption(f"`python -X importtime` of {len(heavy)} packages: {total:.2f}s wall time")
+            st.dataframe(pd.DataFrame(rows), use_container_width=True)
@@ -0,0 +1,71 @@
+import streamlit as st
+
+from aqi.charts import aqi_heatmap
+from aqi.history import CATEGORIES, FREQUENCIES, METRICS, get_history
+from aqi.labels import emoji_map
+from aqi.lazy import lazy_import
+from aqi.logwriter import get_log_store
+
+
+def render_logged_predictions():
+    # 📝 Predictions made in the app (their own time span), from the log's pre-aggregated daily counts
+    st.markdown("---")
+    st.markdown("### 📝 Logged Predictions")
+    store = get_log_store()
+    if store is None:
+        st.caption("Daily prediction counts need the SQLite log (`AQI_LOG_FORMAT=sqlite`).")
+        return
+    pd = lazy_import("pandas")
+    counts = store.daily_counts()
+    if counts.empty:
+        st.caption("No predictions logged yet.")
+        return
+    counts.index = pd.to_datetime(counts.index)
+    st.bar_chart(counts)
+
+
+def render():
+    st.title("📈 AQI History & Trends")
+    st.markdown("Daily Delhi readings from `final_datasett.csv`, aggregated once and served from cache.")
+
+    # Parsed and rolled up once per process; every widget change below is a lookup
+    history = get_history()
+    first, last = history.bounds
+
+    col1, col2 = st.columns(2)
+    with col1:
+        granularity = st.radio("Granularity", list(FREQUENCIES), index=1, horizontal=True)
+    with col2:
+        metric = st.selectbox("Metric", METRICS)
+    start, end = st.slider(
+        "Date range", min_value=first, max_value=last, value=(first, last), format="YYYY-MM-DD"
+    )
+    freq = FREQUENCIES[granularity]
+
+    # 📊 Range summary (prefix sums, no regrouping)
+    summary = history.summary(start, end)
+    if summary["days"] == 0:
+        st.warning("No readings in this range.")
+        return
+    top_category = max(CATEGORIES, key=summary["categories"].get)
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Days", f"{summary['days']:,}")
+    m2.metric("Mean AQI", f"{summary['mean_aqi']:.0f}")
+    m3.metric("Worst AQI", summary["max_aqi"])
+    m4.metric("Most Common", f"{emoji_map.get(top_category, '')} {top_category}")
+
+    # 📈 Time series
+    st.markdown(f"### 📈 {granularity} Mean {metric}")
+    st.line_chart(history.rollup(freq, start, end, [metric]))
+
+    # 🗂️ Category mix per period
+    st.markdown(f"### 🗂️ Days per AQI Category ({granularity})")
+    st.bar_chart(history.category_counts(freq, start, end))
+
+    # 🗓️ Month x day heatmap
+    st.markdown("### 🗓️ AQI Calendar Heatmap")
+    year = st.selectbox("Year", ["All"] + history.years, index=0)
+    theme = getattr(getattr(st.context, "theme", None), "type", None) or "light"
+    st.image(aqi_heatmap(history, year, theme=theme))
+
+    render_logged_predictions()
@@ -0,0 +1,60 @@
+import streamlit as st
+
+from aqi.features import DISPLAY_NAMES, FEATURES
+from aqi.live import configured, ensure_worker, get_live_cache
+
+LABELS = dict(zip(FEATURES, DISPLAY_NAMES))
+
+
+def render():
+    st.title("📡 Live Delhi AQI Dashboard")
+
+    # The ingestion thread polls the source in the background; this page only reads its local cache
+    worker = ensure_worker()
+    cache = get_live_cache()
+    latest = cache.latest()
+
+    if st.button("🔄 Refresh", key="live_refresh"):
+        latest = cache.latest()
+
+    if not latest and not configured():
+        st.info("📴 Live ingestion is off. Set `AQI_LIVE_URL` to an OpenAQ v2-compatible measurements API "
+                "(for local testing: `python -m aqi.mock_openaq`) to start polling.")
+    elif not latest:
+        st.info("⏳ Waiting for the first readings from the live source...")
+    else:
+        newest = max(r["ts"] for r in latest.values())
+        st.caption(f"Latest readings (UTC): {newest}, averaged over reporting stations")
+        cols = st.columns(3)
+        for i, name in enumerate(FEATURES):
+            reading = latest.get(name)
+            value = f"{reading['value']:.1f} {reading['unit'] or ''}" if reading else "—"
+            cols[i % 3].metric(LABELS[name], value)
+
+        # 🔮 Category for the current readings (needs all six pollutants)
+        if all(name in latest for name in FEATURES):
+            from aqi.inference import predict_cached
+
+            result = predict_cached([{name: latest[name]["value"] for name in FEATURES}])[0]
+            st.success(f"📌 Current AQI Category: {result['emoji']} **{result['category']}**")
+            if result["health"]:
+                st.info(f"**Tip:** {result['health']['tip']}")
+        else:
+            missing = ", ".join(LABELS[n] for n in FEATURES if n not in latest)
+            st.warning(f"Category needs all six pollutants; no recent data for {missing}.")
+
+        # 📈 Last 24 hours
+        st.markdown("### 📈 Last 24 Hours")
+        series = cache.series(hours=24)
+        if not series.empty:
+            pollutant = st.selectbox("Pollutant", [n for n in FEATURES if n in series.columns], key="live_pollutant")
+            st.line_chart(series[[pollutant]])
+
+    with st.expander("⚙️ Ingestion Status"):
+        if worker is None and not configured():
+            st.caption("No live source configured (`AQI_LIVE_URL` is unset).")
+        elif worker is None:
+            st.caption("In-app polling is off (`AQI_LIVE_AUTOSTART=0`); run `python -m aqi.live run` separately.")
+        else:
+            st.json(worker.stats())
+        st.json(cache.stats())
@@ -0,0 +1,272 @@
+import os
+
+import numpy as np
+import streamlit as st
+
+from aqi.charts import comparison_chart
+from aqi.explain import get_explanation_service
+from aqi.labels import get_risk_badge
+from aqi.lazy import lazy_import
+from aqi.logwriter import log_prediction, make_row
+from aqi.cpcb import compute_row
+from aqi.inference import predict_aqi, predict_cached
+from aqi.registry import get_label_encoder
+
+def sheets_logging_enabled():
+    # Only talk to Google Sheets when service-account secrets are configured
+    if os.environ.get("AQI_SHEETS_FAKE") == "1":
+        return True
+    try:
+        return "gspread" in st.secrets
+    except Exception:
+        return False
+
+
+def log_to_sheets(inputs, aqi_category, main_pollutant, risk):
+    if not sheets_logging_enabled():
+        return
+    from aqi.sheets import get_sheets_sink
+    creds = None if os.environ.get("AQI_SHEETS_FAKE") == "1" else st.secrets["gspread"]
+    # Buffered; a background thread sends rows with append_rows in batches
+    get_sheets_sink(creds).add(make_row(inputs, aqi_category, main_pollutant, risk))
+
+
+def remember_prediction(pred_label, values):
+    # Lets the Share page reuse the last prediction instead of running the model again
+    st.session_state["last_prediction"] = {"label": pred_label, "values": list(values)}
+
+
+def render_aqi_numbers(input_data):
+    # Numeric AQI: the regressor's estimate (if deployed) next to the CPCB breakpoint formula
+    cpcb_aqi, cpcb_category, dominant = compute_row(input_data[0])
+    estimate = predict_aqi(input_data)
+    col1, col2 = st.columns(2)
+    if estimate is not None:
+        col1.metric("Estimated AQI (model)", int(estimate[0]))
+    if cpcb_aqi is not None:
+        col2.metric("CPCB AQI (formula)", cpcb_aqi, help=f"{cpcb_category}; highest sub-index: {dominant}")
+
+
+def render_comparison_chart(pm25, pm10, no2, so2, co, ozone):
+    st.markdown("### 📊 Compare Your Pollution Levels with Delhi Averages and WHO Safe Limits")
+
+    # Rendered PNG is cached per (values, theme), so reruns with the same inputs skip matplotlib
+    theme = getattr(getattr(st.context, "theme", None), "type", None) or "light"
+    st.image(comparison_chart([pm25, pm10, no2, so2, co, ozone], theme=theme))
+
+
+def render_batch_prediction():
+    # 📦 Batch Prediction: score a whole file of readings at once
+    st.markdown("---")
+    st.markdown("### 📦 Batch Prediction from File")
+    st.caption("Upload a CSV or Parquet file with PM2.5, PM10, NO2, SO2, CO and Ozone columns (same layout as `final_datasett.csv`).")
+
+    uploaded = st.file_uploader("Upload pollutant readings", type=["csv", "parquet"], key="batch_upload")
+    out_format = st.radio("Output format", ["csv", "parquet"], horizontal=True, key="batch_format")
+    if uploaded is not None and st.button("⚙️ Score File", key="batch_score"):
+        pd = lazy_import("pandas")
+        from aqi.batch import score_file
+        try:
+            scored_bytes, n_rows, category_counts = score_file(uploaded, uploaded.name, fmt=out_format)
+            st.success(f"✅ Scored {n_rows:,} rows.")
+            st.dataframe(pd.DataFrame(sorted(category_counts.items()), columns=["AQI Category", "Rows"]))
+            st.download_button(
+                label="📥 Download Scored File",
+                data=scored_bytes,
+                file_name=f"aqi_scored.{out_format}",
+                mime="text/csv" if out_format == "csv" else "application/octet-stream",
+                key="batch_download"
+            )
+        except ValueError as e:
+            st.error(f"❌ {e}")
+
+
+def render():
+    # Encoder is cached per process and hot-reloaded when the file changes
+    label_encoder = get_label_encoder()
+
+    # Page title
+    st.title("🔮 **Predict Delhi AQI Category**")
+    st.markdown("Enter the pollutant levels below to predict the **Air Quality Index (AQI)** category.")
+
+    # Input form
+    with st.form("aqi_form"):
+        col1, col2 = st.columns(2)
+        with col1:
+            pm25 = st.number_input("PM2.5 (µg/m³)", 0.0, 1000.0, 120.0)
+            no2 = st.number_input("NO₂ (µg/m³)", 0.0, 1000.0, 40.0)
+            co = st.number_input("CO (mg/m³)", 0.0, 50.0, 1.2)
+        with col2:
+            pm10 = st.number_input("PM10 (µg/m³)", 0.0, 1000.0, 180.0)
+            so2 = st.number_input("SO₂ (µg/m³)", 0.0, 1000.0, 10.0)
+            ozone = st.number_input("Ozone (µg/m³)", 0.0, 1000.0, 20.0)
+
+        submitted = st.form_submit_button("🔍 Predict AQI")
+
+    # 🧠 Predict
+    if st.button("🔮 Predict AQI Category"):
+        input_data = np.array([[pm25, pm10, no2, so2, co, ozone]])
+        # Repeated inputs (presets, defaults) are served from the prediction cache
+        result = predict_cached(input_data)[0]
+        pred_label = result["category"]
+        pred_encoded = label_encoder.transform([pred_label])[0]
+        remember_prediction(pred_label, input_data[0])
+
+        emoji = result["emoji"]
+
+        # ✅ Beautiful Output - Light & Dark mode compatible
+        st.success(f"📌 Predicted AQI Category: {emoji} **{pred_label}**")
+        render_aqi_numbers(input_data)
+
+        st.markdown("---")
+        st.markdown("📊 **SHAP Explainability**")
+
+        try:
+            # Explainer is built once per model version; repeated inputs come from its cache
+            shap = lazy_import("shap")
+            plt = lazy_import("matplotlib.pyplot")
+            explainer = get_explanation_service()
+            class_shap, base_value = explainer.explain_row(input_data[0], class_index=pred_encoded)
+
+            fig1, ax1 = plt.subplots(figsize=(10, 4))
+            shap.plots._waterfall.waterfall_legacy(
+                base_value,
+                class_shap,
+                feature_names=explainer.feature_names,
+                features=input_data[0]
+            )
+            st.pyplot(fig1)
+            plt.clf()
+
+        except Exception as e:
+            st.warning(f"⚠️ SHAP explanation failed: {e}")
+
+    st.markdown("### 🧪 Try a Sample AQI Scenario")
+    selected_category = st.selectbox(
+        "Pick Target AQI Category to Auto-Fill Inputs:",
+        ["-- Select --", "Good", "Satisfactory", "Moderate", "Poor", "Very Poor", "Severe"]
+    )
+
+    preset_values = {
+        "Good": [25.0, 40.0, 20.0, 5.0, 0.8, 10.0],
+        "Satisfactory": [60.0, 70.0, 30.0, 8.0, 1.0, 15.0],
+        "Moderate": [110.0, 150.0, 50.0, 15.0, 1.5, 25.0],
+        "Poor": [180.0, 250.0, 80.0, 25.0, 2.0, 35.0],
+        "Very Poor": [310.0, 400.0, 110.0, 40.0, 2.5, 60.0],
+        "Severe": [420.0, 500.0, 150.0, 60.0, 3.0, 90.0]
+    }
+
+    # Set default values
+    default_values = preset_values.get(selected_category, [120.0, 180.0, 40.0, 10.0, 1.2, 20.0])
+
+    col1, col2 = st.columns(2)
+    with col1:
+        pm25 = st.number_input("PM2.5 (µg/m³)", min_value=0.0, value=default_values[0], key="pm25_input")
+        no2 = st.number_input("NO₂ (µg/m³)", min_value=0.0, value=default_values[2], key="no2_input")
+        co = st.number_input("CO (mg/m³)", min_value=0.0, value=default_values[4], key="co_input")
+    with col2:
+        pm10 = st.number_input("PM10 (µg/m³)", min_value=0.0, value=default_values[1], key="pm10_input")
+        so2 = st.number_input("SO₂ (µg/m³)", min_value=0.0, value=default_values[3], key="so2_input")
+        ozone = st.number_input("Ozone (µg/m³)", min_value=0.0, value=default_values[5], key="ozone_input")
+
+    st.markdown("#### 🔁 Choose a Preset AQI Level or Enter Custom Values")
+
+    preset_values = {
+        "Good": [30, 40, 20, 5, 0.4, 10],
+        "Moderate": [90, 110, 40, 10, 1.2, 30],
+        "Poor": [200, 250, 90, 20, 2.0, 50],
+        "Very Poor": [300, 350, 120, 30, 3.5, 70],
+        "Severe": [400, 500, 150, 40, 4.5, 90],
+    }
+
+    selected_level = st.selectbox("Choose Preset AQI Level", list(preset_values.keys()))
+    default_values = preset_values[selected_level]
+    default_values = list(map(float, default_values))  # Fix type mismatch
+
+    col1, col2 = st.columns(2)
+    with col1:
+        pm25 = st.number_input("PM2.5 (µg/m³)", min_value=0.0, value=default_values[0])
+        no2 = st.number_input("NO₂ (µg/m³)", min_value=0.0, value=default_values[2])
+        co = st.number_input("CO (mg/m³)", min_value=0.0, value=default_values[4])
+    with col2:
+        pm10 = st.number_input("PM10 (µg/m³)", min_value=0.0, value=default_values[1])
+        so2 = st.number_input("SO₂ (µg/m³)", min_value=0.0, value=default_values[3])
+        ozone = st.number_input("Ozone (µg/m³)", min_value=0.0, value=default_values[5])
+
+    # 🌍 Show Pollution Summary (Step 3.2)
+    st.markdown("### 📋 Your Entered Pollution Levels:")
+    st.info(f"""
+- **PM2.5:** {pm25} µg/m³
+- **PM10:** {pm10} µg/m³
+- **NO₂:** {no2} µg/m³
+- **SO₂:** {so2} µg/m³
+- **CO:** {co} mg/m³
+- **Ozone:** {ozone} µg/m³
+""")
+
+    # 🎯 Advisory from the CPCB breakpoints (deterministic, no model call)
+    cpcb_aqi, cpcb_category, dominant = compute_row([pm25, pm10, no2, so2, co, ozone])
+    if cpcb_aqi is not None and cpcb_aqi > 300:
+        st.warning(f"⚠️ {cpcb_category} air (CPCB AQI {cpcb_aqi}, driven by {dominant}). Stay indoors if possible.")
+    elif cpcb_aqi is not None and cpcb_aqi <= 50:
+        st.success("✅ Air looks clean today! Great time for a walk.")
+
+    inputs = {
+        "PM2.5": pm25,
+        "PM10": pm10,
+        "NO2": no2,
+        "SO2": so2,
+        "CO": co,
+        "Ozone": ozone
+    }
+
+    # Step 4: Predict AQI
+    if st.button("🔮 Predict AQI Category", key="predict_aqi"):
+        input_data = np.array([[pm25, pm10, no2, so2, co, ozone]])
+        result = predict_cached(input_data)[0]
+        pred_label = result["category"]
+        remember_prediction(pred_label, input_data[0])
+
+        emoji = result["emoji"]
+
+        # ✅ Show Prediction Result
+        st.markdown(f"### 📌 AQI Category: {emoji} **{pred_label}**")
+        render_aqi_numbers(input_data)
+
+        # ✅ Step 5: Health Tips & Recommendations
+        st.markdown("---")
+        st.markdown("🩺 **Health Impact & Recommendations:**")
+
+        if result["health"]:
+            info = result["health"]
+            st.error(f"**Impact:** {info['impact']}")
+            st.info(f"**Tip:** {info['tip']}")
+        else:
+            st.warning("No health tips available for this AQI category.")
+
+        # 📝 Log only actual predictions, not every rerun
+        main_pollutant, risk = result["main_pollutant"], result["risk"]
+        if log_prediction(inputs, pred_label, main_pollutant, risk):
+            st.success("✅ Prediction logged.")
+        else:
+            st.error("❌ Failed to log prediction: log queue is full.")
+        log_to_sheets(inputs, pred_label, main_pollutant, risk)
+
+    render_batch_prediction()
+
+    render_comparison_chart(pm25, pm10, no2, so2, co, ozone)
+
+    # 4. 🧠 Use preset label as AQI category (simulate ML prediction here)
+    aqi_category = selected_level  # You can replace this with your ML model's output if needed
+
+    # 6. 🎯 Display Summary
+    main_pollutant, risk, emoji = get_risk_badge(aqi_category, inputs)
+
+    st.markdown("---")
+    st.markdown(f"""
+### {emoji} Pollution Risk Summary
+- **Risk Level:** `{risk}`
+- **Main Pollutant:** `{main_pollutant}`
+- **AQI Category:** `{aqi_category}`
+""")
+    st.markdown("---")
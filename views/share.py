@@ -0,0 +1,66 @@
+import urllib.parse
+
+import streamlit as st
+
+from aqi.charts import qr_png
+from aqi.labels import emoji_map
+from aqi.reports import PUBLIC_URL as paste_url
+from aqi.reports import URL_PATH, latest_report, report_url
+
+
+def render_prebuilt_reports():
+    # 🗂️ Daily reports are built offline by ``python -m aqi.reports``; only link to the static files here
+    reports = [(title, latest_report(source)) for title, source in
+               [("Latest dashboard predictions", "log"), ("Latest day in the Delhi record", "history")]]
+    reports = [(title, found) for title, found in reports if found]
+    if not reports:
+        return False
+    st.markdown("### 🗂️ Daily Reports")
+    for col, (title, (day, key)) in zip(st.columns(len(reports)), reports):
+        col.markdown(f"**{title}** ({day})  \n[📄 Open report]({report_url(key, base='')}) · "
+                     f"[🔗 Public link]({report_url(key)})")
+        col.markdown(f'<img src="{URL_PATH}/{key}/qr.png" width="200" alt="QR code for the {day} report"><br>'
+                     f'<a href="{URL_PATH}/{key}/qr.png" download="Delhi_AQI_{day}_QR.png">📥 Download QR Code</a>',
+                     unsafe_allow_html=True)
+    return True
+
+
+def render():
+    st.title("📤 Share Delhi AQI")
+
+    # Reuse the last prediction made on the Predict page instead of running the model here
+    last = st.session_state.get("last_prediction")
+    if last:
+        pred_label = last["label"]
+        emoji = emoji_map.get(pred_label, "❓")
+        tweet_text = f"Delhi AQI today is {pred_label} {emoji}. Check pollution levels here: {paste_url} #AQI #AirQuality"
+    else:
+        st.caption("Make a prediction on the **Predict AQI** page to include its category in the post.")
+        tweet_text = f"Check Delhi's air quality here: {paste_url} #AQI #AirQuality"
+
+    # ✅ Optional social media share
+    tweet_url = f"https://twitter.com/intent/tweet?text={urllib.parse.quote(tweet_text)}"
+
+    st.markdown("### 📤 Share on Social Media")
+    st.markdown(f"[🐦 Tweet This Report]({tweet_url})", unsafe_allow_html=True)
+
+    if render_prebuilt_reports():
+        return
+
+    # No reports built yet: fall back to the app link's QR code
+    # QR for the constant app URL is rendered and PNG-encoded once per process
+    byte_im = qr_png(paste_url)
+
+    # Display QR code with updated Streamlit parameter
+    st.image(byte_im, caption="📱 Scan to open the report", width=300)
+
+    # ✅ Show in Streamlit
+    st.markdown("### 📲 Share This AQI Summary via QR Code")
+
+    # Optional: Download QR Code
+    st.download_button(
+        label="📥 Download QR Code",
+        data=byte_im,
+        file_name="Delhi_AQI_QR_Code.png",
+        mime="image/png"
+    )
@@ -0,0 +1,90 @@
+import streamlit as st
+
+from aqi.charts import decision_surface
+from aqi.features import DISPLAY_NAMES, FEATURES
+from aqi.labels import emoji_map
+from aqi.whatif import RANGES, drop_to_leave, sweep
+
+BASELINES = {
+    "Satisfactory": [60.0, 70.0, 30.0, 8.0, 1.0, 15.0],
+    "Moderate": [110.0, 150.0, 50.0, 15.0, 1.5, 25.0],
+    "Poor": [180.0, 250.0, 80.0, 25.0, 2.0, 35.0],
+    "Very Poor": [310.0, 400.0, 110.0, 40.0, 2.5, 60.0],
+    "Severe": [420.0, 500.0, 150.0, 60.0, 3.0, 90.0],
+}
+NONE = "(none)"
+
+
+def label(feature):
+    return DISPLAY_NAMES[FEATURES.index(feature)]
+
+
+def range_inputs(feature, key):
+    lo, hi = RANGES[feature]
+    values = st.slider(f"{label(feature)} range", lo, hi, (lo, hi), key=f"{key}_range_{feature}")
+    steps = st.slider(f"{label(feature)} steps", 10, 200, 100 if key == "x" else 60, key=f"{key}_steps")
+    return values, steps
+
+
+def render():
+    st.title("🧭 What-If Explorer")
+    st.markdown("Sweep one or two pollutants over a range while holding the rest fixed; "
+                "the whole grid is classified in one batched model call.")
+
+    # 📌 Fixed vector
+    baseline = st.selectbox("Start from", list(BASELINES), index=3, key="whatif_baseline")
+    defaults = BASELINES[baseline]
+    cols = st.columns(len(FEATURES))
+    fixed = [col.number_input(label(f), min_value=0.0, value=defaults[i], key=f"whatif_{baseline}_{f}")
+             for i, (col, f) in enumerate(zip(cols, FEATURES))]
+
+    # 📐 Grid
+    col1, col2 = st.columns(2)
+    with col1:
+        x_feature = st.selectbox("Sweep (x axis)", FEATURES, index=0, format_func=label, key="whatif_x")
+        x_range, x_steps = range_inputs(x_feature, "x")
+    with col2:
+        options = [NONE] + [f for f in FEATURES if f != x_feature]
+        y_feature = st.selectbox("Against (y axis)", options, index=min(2, len(options) - 1),
+                                 format_func=lambda f: f if f == NONE else label(f), key="whatif_y")
+        y_feature = None if y_feature == NONE else y_feature
+        y_range, y_steps = range_inputs(y_feature, "y") if y_feature else (None, None)
+
+    if x_range[0] == x_range[1] or (y_feature and y_range[0] == y_range[1]):
+        st.warning("Pick a range wider than a single value.")
+        return
+
+    try:
+        with st.spinner("Classifying grid..."):
+            result = sweep(fixed, x_feature, x_range, x_steps, y_feature, y_range, y_steps)
+    except ValueError as e:
+        st.error(str(e))
+        return
+
+    theme = getattr(getattr(st.context, "theme", None), "type", None) or "light"
+    st.image(decision_surface(result, theme=theme))
+    st.caption(f"{result.codes.size:,} input vectors; ✖ marks the fixed vector.")
+
+    shares = result.shares()
+    metric_cols = st.columns(len(shares))
+    for col, (category, share) in zip(metric_cols, shares.items()):
+        col.metric(f"{emoji_map.get(category, '')} {category}", f"{share:.0%}")
+
+    # 📉 How far each swept pollutant must fall to change the category
+    st.markdown("### 📉 To change the category")
+    for feature in [f for f in (x_feature, y_feature) if f]:
+        current = fixed[FEATURES.index(feature)]
+        category, value, new_category = drop_to_leave(fixed, feature)
+        if value is None:
+            st.markdown(f"- **{label(feature)}**: stays {emoji_map.get(category, '')} **{category}** "
+                        f"even at 0 (others fixed).")
+        else:
+            st.markdown(f"- **{label(feature)}**: from {current:g} down to **{value:.1f}** "
+                        f"({current - value:.1f} lower) turns {emoji_map.get(category, '')} {category} "
+                        f"into {emoji_map.get(new_category, '')} **{new_category}**.")
+
+    if not y_feature:
+        transitions = result.transitions()
+        if transitions:
+            st.markdown("**Category boundaries along the sweep:** " + ", ".join(
+                f"{label(x_feature)} ≈ {x:.1f}: {a} → {b}" for x, a, b in transitions))